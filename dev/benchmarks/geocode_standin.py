@@ -0,0 +1,179 @@
+"""
+Bulk Geocoder Stand-in Test
+Runs src/bulk_geocoder.py against a local stand-in for Nominatim's /search
+endpoint instead of the real service. The stand-in answers with made-up
+but stable coordinates and rejects any request that arrives sooner than
+1/rate seconds after the previous one (HTTP 429), as Nominatim would.
+
+The test geocodes a synthetic installation list with duplicates, case and
+spacing variants and gazetteer places. It stops after --interrupt-after
+upstream lookups, as if the process had died, then starts again from the
+checkpoint. It reports whether the rate was respected and whether any
+place was requested twice, and exits non-zero if either check failed.
+tests/test_bulk_geocoder.py runs the same scenario under pytest.
+
+Usage:
+    python dev/benchmarks/geocode_standin.py                          # Nominatim's 1 request/s, ~20 s
+    python dev/benchmarks/geocode_standin.py --sites 200 --rate 20 --tolerance 0.5   # quicker; 5% is tight at 20/s
+    python dev/benchmarks/geocode_standin.py --serve --port 8766      # stand-in only
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Nominatim-style /search with a minimum interval between requests."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+        if url.path == "/stats":
+            return self._send(200, server.stats())
+        if url.path != "/search":
+            return self._send(404, {"error": "not found"})
+
+        query = parse_qs(url.query).get("q", [""])[0]
+        with server.lock:
+            now = time.monotonic()
+            too_soon = server.last is not None and now - server.last < server.min_interval
+            server.last = now
+            server.queries.append(query)
+            if too_soon:
+                server.rejected += 1
+        if too_soon:
+            return self._send(429, {"error": "Too many requests"})
+        if "nowhere" in query.lower():
+            return self._send(200, [])
+
+        digest = hashlib.sha256(query.casefold().encode("utf-8")).digest()
+        lat = digest[0] / 255 * 120 - 60
+        lon = int.from_bytes(digest[1:3], "big") / 65535 * 360 - 180
+        self._send(200, [{"lat": f"{lat:.5f}", "lon": f"{lon:.5f}", "display_name": f"{query} (stand-in)"}])
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_standin(port, rate, tolerance=0.05):
+    """Serve the stand-in on a background thread; returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinHandler)
+    server.lock = threading.Lock()
+    server.min_interval = (1 - tolerance) / rate
+    server.last = None
+    server.queries = []
+    server.rejected = 0
+    server.stats = lambda: {"requests": len(server.queries), "rejected": server.rejected,
+                            "distinct": len({" ".join(q.casefold().replace(",", " ").split())
+                                                         for q in server.queries})}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_places(n_sites, seed=0):
+    """An installation list with repeats, spelling variants, gazetteer hits and unknown places."""
+    rng = random.Random(seed)
+    streets = ["Main St", "Oak Ave", "Solar Way", "Mesa Dr", "Canal Rd", "Desert View"]
+    towns = ["Gilbert", "Chandler", "Yuma", "Casa Grande", "Kingman", "Sedona", "Prescott"]
+    base = [f"{rng.randrange(100, 9999)} {rng.choice(streets)}, {rng.choice(towns)}, AZ"
+            for _ in range(max(n_sites // 3, 1))]
+    base += ["Phoenix, AZ", "Tucson, AZ", "Nowhere Junction, AZ"]
+    places = []
+    for _ in range(n_sites):
+        place = rng.choice(base)
+        variant = rng.random()
+        if variant < 0.2:
+            place = place.upper()
+        elif variant < 0.4:
+            place = "  " + place.replace(", ", " ,  ") + " "
+        places.append(place)
+    return places
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test the bulk geocoder against a local Nominatim stand-in.")
+    parser.add_argument("--port", type=int, default=8766, help="0 picks a free port")
+    parser.add_argument("--rate", type=float, default=1.0, help="Requests per second the stand-in allows")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="Fraction of 1/rate by which a request may arrive early")
+    parser.add_argument("--sites", type=int, default=60)
+    parser.add_argument("--interrupt-after", type=int, default=None,
+                        help="Upstream lookups before the simulated crash (default: half)")
+    parser.add_argument("--serve", action="store_true", help="Only run the stand-in until interrupted")
+    args = parser.parse_args()
+
+    server = start_standin(args.port, args.rate, args.tolerance)
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    if args.serve:
+        print(f"🛰️ Stand-in Nominatim at {url} ({args.rate:g} req/s); Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    # The test must not touch the shared single-flight result directory
+    os.environ["SOLAR_SINGLEFLIGHT_DIR"] = ""
+    from bulk_geocoder import BulkGeocoder, normalize_place
+
+    places = synthetic_places(args.sites)
+    distinct = len({normalize_place(p) for p in places})
+
+    runs, upstream = [], 0
+    interrupt_after = args.interrupt_after
+    with tempfile.TemporaryDirectory(prefix="geocode-standin-") as directory:
+        checkpoint = os.path.join(directory, "checkpoint.jsonl")
+        for attempt in ("first run", "resumed run"):
+            geocoder = BulkGeocoder(checkpoint, url, args.rate)
+            start = time.perf_counter()
+            sources = {}
+            first_result = None
+            for result in geocoder.geocode(places):
+                first_result = first_result or time.perf_counter() - start
+                sources[result["source"]] = sources.get(result["source"], 0) + 1
+                if result["source"] == "nominatim":
+                    upstream += 1
+                    if attempt == "first run" and upstream == (interrupt_after or max(distinct // 2, 1)):
+                        break       # simulated crash
+            runs.append((attempt, time.perf_counter() - start, first_result, sources))
+
+    stats = server.stats()
+    server.shutdown()
+    server.server_close()
+    print("=" * 70)
+    print("🧭 BULK GEOCODER vs LOCAL STAND-IN")
+    print("=" * 70)
+    print(f"Places:            {len(places):,} ({distinct:,} distinct after normalization)")
+    for attempt, seconds, first, sources in runs:
+        print(f"{attempt + ':':<18} {seconds:.1f} s · first result after {(first or 0) * 1e3:.1f} ms · " +
+              " · ".join(f"{count} {source}" for source, count in sorted(sources.items())))
+    print(f"Upstream requests: {stats['requests']} ({stats['distinct']} distinct places)")
+    print(f"Rejected (429):    {stats['rejected']}")
+    print(f"Repeat requests:   {stats['requests'] - stats['distinct']}")
+    errors = sum(sources.get("error", 0) for _, _, _, sources in runs)
+    if stats["rejected"] or stats["requests"] > stats["distinct"] or errors:
+        sys.exit("❌ The geocoder exceeded the rate limit, repeated a request or failed a lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Import-Time Budget Check
+Measures cold import time of the production modules with `python -X importtime`
+and fails (exit code 1) if a module exceeds its budget or pulls in a heavy
+dependency at import time.
+
+Usage:
+    python dev/benchmarks/import_budget.py
+"""
+
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# module -> (budget in ms, directory to put on sys.path, framework it builds on)
+BUDGETS = {
+    "solar_cooling": (50, os.path.join(REPO_ROOT, "src"), None),
+    "app": (1500, REPO_ROOT, "streamlit"),   # dominated by streamlit itself
+}
+
+# Must only be imported on the code paths that need them, unless the
+# framework a module builds on already imports them
+DEFERRED = ["requests", "pandas", "numpy", "joblib", "sklearn", "plotly.express"]
+
+
+def importtime(module, path):
+    """Return {module name: cumulative microseconds} for one cold import."""
+    code = f"import sys; sys.path.insert(0, {path!r}); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=REPO_ROOT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cum.isdigit():
+            cumulative[name] = int(cum)
+    return cumulative
+
+
+def check(module, budget_ms, path, framework=None):
+    """Print the measurement for one module and return a list of violations."""
+    cumulative = importtime(module, path)
+    elapsed_ms = cumulative[module] / 1000
+    baseline = importtime(framework, path) if framework else {}
+    loaded = [dep for dep in DEFERRED if dep in cumulative and dep not in baseline]
+
+    problems = []
+    if elapsed_ms > budget_ms:
+        problems.append(f"{module}: {elapsed_ms:.1f} ms exceeds the {budget_ms} ms budget")
+    if loaded:
+        problems.append(f"{module}: imports {', '.join(loaded)} at module load")
+
+    status = "✅" if not problems else "❌"
+    print(f"{status} {module:<15} {elapsed_ms:8.1f} ms  (budget {budget_ms} ms)")
+    return problems
+
+
+def main():
+    print("=" * 70)
+    print("⏱️  IMPORT-TIME BUDGET")
+    print("=" * 70)
+
+    problems = []
+    for module, (budget_ms, path, framework) in BUDGETS.items():
+        problems.extend(check(module, budget_ms, path, framework))
+
+    for problem in problems:
+        print(f"   {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
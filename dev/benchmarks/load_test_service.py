@@ -0,0 +1,116 @@
+"""
+Decision Service Load Test
+Starts src/decision_service.py locally and hammers POST /decide from many
+keep-alive connections, then reports requests/s, client-side latency and the
+server's batch-size histogram.
+
+Usage:
+    python dev/benchmarks/load_test_service.py --connections 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+async def http_request(reader, writer, method, path, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = next(
+        int(line.split(b":", 1)[1])
+        for line in head.split(b"\r\n") if line.lower().startswith(b"content-length:")
+    )
+    return head.split(b" ", 2)[1], await reader.readexactly(length)
+
+
+async def client(host, port, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        body = json.dumps({
+            "T_amb": rng.uniform(-10, 50), "G": rng.uniform(0, 1200), "hour": rng.randrange(24)
+        }).encode()
+        start = time.perf_counter()
+        status, _ = await http_request(reader, writer, "POST", "/decide", body)
+        latencies.append(time.perf_counter() - start)
+        if status != b"200":
+            errors.append(status)
+    writer.close()
+
+
+async def run_load(host, port, connections, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, deadline, latencies, errors) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await http_request(reader, writer, "GET", "/metrics.json")
+    writer.close()
+    return latencies, errors, elapsed, json.loads(metrics)
+
+
+async def wait_for_port(host, port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Decision service did not start.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the cooling decision service.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "src", "decision_service.py"),
+         "--host", host, "--port", str(args.port),
+         "--max-batch-size", str(args.max_batch_size), "--max-wait-ms", str(args.max_wait_ms)],
+        cwd=REPO_ROOT,
+    )
+    try:
+        asyncio.run(wait_for_port(host, args.port))
+        latencies, errors, elapsed, metrics = asyncio.run(
+            run_load(host, args.port, args.connections, args.duration)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    batch = metrics["batch_size"]
+    print("=" * 70)
+    print("🚀 DECISION SERVICE LOAD TEST")
+    print("=" * 70)
+    print(f"Connections:      {args.connections}")
+    print(f"Requests:         {len(latencies):,} in {elapsed:.1f} s ({len(latencies) / elapsed:,.0f} req/s)")
+    print(f"Errors:           {len(errors)}")
+    print(f"Client latency:   p50 {latencies[len(latencies) // 2] * 1e3:.2f} ms · "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms")
+    print(f"Mean batch size:  {batch['sum'] / max(batch['count'], 1):.1f} rows "
+          f"({batch['count']:,} model calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Model Zoo Benchmark
+Trains candidate cooling-decision models on one split and compares
+accuracy, single-sample latency, batch throughput, artifact size and load time.
+
+Usage:
+    python dev/benchmarks/model_zoo.py
+    python dev/benchmarks/model_zoo.py --data dev/data_raw/full_training_data.csv --output zoo.csv
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+from solar_cooling import physics_based_check_batch
+
+DEFAULT_DATA = os.path.join(REPO_ROOT, "dev", "data_raw", "full_training_data.csv")
+FEATURE_COLS = ["AmbientTemp_C", "Irradiance_Wm2", "panel_temp", "hour"]
+
+
+# -----------------------------
+# CANDIDATES
+# -----------------------------
+
+class PhysicsRule:
+    """Analytical rule from physics_based_check wrapped as an estimator."""
+
+    def fit(self, X, y=None):
+        return self
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=float)
+        should_cool = physics_based_check_batch(X[:, 0], X[:, 1])[3]
+        return should_cool.astype(int)
+
+
+def build_candidates(X_train, y_train):
+    """Fit every candidate on the same training split."""
+    forest = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42,
+        class_weight='balanced'
+    )
+    forest.fit(X_train, y_train)
+
+    # Distill the forest into one shallow tree trained on the forest's own labels
+    distilled = DecisionTreeClassifier(max_depth=8, random_state=42)
+    distilled.fit(X_train, forest.predict(X_train))
+
+    logistic = make_pipeline(
+        StandardScaler(),
+        LogisticRegression(max_iter=1000, class_weight='balanced')
+    )
+    logistic.fit(X_train, y_train)
+
+    hist_gb = HistGradientBoostingClassifier(random_state=42)
+    hist_gb.fit(X_train, y_train)
+
+    return {
+        "random_forest_100": forest,
+        "distilled_tree": distilled,
+        "logistic_regression": logistic,
+        "hist_gradient_boosting": hist_gb,
+        "physics_rule": PhysicsRule().fit(X_train),
+    }
+
+
+# -----------------------------
+# MEASUREMENTS
+# -----------------------------
+
+def single_sample_latency(model, X, n_samples=500):
+    """Return p50 and p99 latency (ms) of predicting one row at a time."""
+    rng = np.random.default_rng(42)
+    rows = X[rng.integers(0, len(X), size=n_samples)]
+    model.predict(rows[:1])  # warm-up
+
+    timings = np.empty(n_samples)
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        model.predict(row[None, :])
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50) * 1e3, np.percentile(timings, 99) * 1e3
+
+
+def batch_throughput(model, X, min_seconds=0.5):
+    """Return rows per second when predicting the whole array at once."""
+    model.predict(X)
+    rows, start = 0, time.perf_counter()
+    while True:
+        model.predict(X)
+        rows += len(X)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return rows / elapsed
+
+
+def artifact_size_and_load_time(model, repeats=5):
+    """Serialize with joblib and return (size in bytes, median load time in ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        joblib.dump(model, path)
+        size = os.path.getsize(path)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            joblib.load(path)
+            timings.append(time.perf_counter() - start)
+    return size, float(np.median(timings)) * 1e3
+
+
+def run_benchmark(data_path, test_size=0.2, latency_samples=500):
+    """Train all candidates on one split and return a results DataFrame."""
+    df = pd.read_csv(data_path)
+    X = df[FEATURE_COLS].to_numpy(dtype=float)
+    y = df["should_cool"].to_numpy()
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=42, stratify=y
+    )
+
+    print(f"📂 {len(df):,} samples ({len(X_train):,} train / {len(X_test):,} test)")
+    candidates = build_candidates(X_train, y_train)
+
+    results = []
+    for name, model in candidates.items():
+        print(f"⏱️  Measuring {name}...")
+        p50, p99 = single_sample_latency(model, X_test, latency_samples)
+        size, load_ms = artifact_size_and_load_time(model)
+        results.append({
+            "model": name,
+            "accuracy": accuracy_score(y_test, model.predict(X_test)),
+            "p50_latency_ms": p50,
+            "p99_latency_ms": p99,
+            "batch_rows_per_s": batch_throughput(model, X_test),
+            "size_kb": size / 1024,
+            "load_ms": load_ms,
+        })
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candidate cooling-decision models.")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="Labelled training CSV")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--latency-samples", type=int, default=500)
+    parser.add_argument("--output", help="Optional CSV file for the results table")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🤖 MODEL ZOO BENCHMARK - accuracy vs latency vs memory")
+    print("=" * 70)
+
+    results = run_benchmark(args.data, args.test_size, args.latency_samples)
+
+    print("\n" + results.to_string(index=False, float_format=lambda v: f"{v:,.4g}"))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\n✅ Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
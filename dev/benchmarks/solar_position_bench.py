@@ -0,0 +1,90 @@
+"""
+Solar Position Throughput Benchmark
+Times solar_position / clear_sky_grid on a (sites, hours) grid against the
+straightforward formula evaluated element by element on the broadcast grid,
+checks they agree, and feeds the clear-sky result through
+physics_based_check_batch. Exits with code 1 if the fast path falls below
+--target million pairs per second.
+
+Usage:
+    python dev/benchmarks/solar_position_bench.py --sites 1000 --hours 8760
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from solar_cooling import physics_based_check_batch
+from solar_geometry import (
+    clear_sky_ghi, clear_sky_grid, cos_zenith, day_of_year, equation_of_time, hour_of_day, solar_position
+)
+
+
+def naive_cos_zenith(lat, lon, times):
+    """Full formula on the broadcast (sites, times) grid, for comparison."""
+    doy = day_of_year(times)[None, :]
+    solar_hour = hour_of_day(times)[None, :] + lon[:, None] / 15 + equation_of_time(doy) / 60
+    return cos_zenith(lat[:, None], doy, solar_hour)
+
+
+def best_of(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized solar position and clear-sky GHI.")
+    parser.add_argument("--sites", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=8760)
+    parser.add_argument("--target", type=float, default=1.0, help="Minimum M pairs/s for the fast path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-60, 60, args.sites)
+    lon = rng.uniform(-180, 180, args.sites)
+    times = np.datetime64("2023-01-01T00", "h") + np.arange(args.hours)
+    pairs = args.sites * args.hours
+
+    cos_z, _ = solar_position(lat, lon, times, utc=True, azimuth=False)
+    error = np.abs(cos_z - naive_cos_zenith(lat, lon, times)).max()
+
+    rows = [
+        ("naive cos(zenith)", best_of(lambda: naive_cos_zenith(lat, lon, times))),
+        ("solar_position (LST, no azimuth)", best_of(lambda: solar_position(lat, lon, times, azimuth=False))),
+        ("solar_position (UTC, no azimuth)", best_of(lambda: solar_position(lat, lon, times, utc=True, azimuth=False))),
+        ("solar_position (UTC + azimuth)", best_of(lambda: solar_position(lat, lon, times, utc=True))),
+        ("clear_sky_grid (UTC)", best_of(lambda: clear_sky_grid(lat, lon, times, utc=True))),
+    ]
+
+    G = clear_sky_ghi(cos_z)
+    T_amb = np.full_like(G, 35.0)
+    rows.append(("clear-sky → physics_based_check_batch", best_of(lambda: physics_based_check_batch(T_amb, G))))
+
+    print("=" * 70)
+    print("☀️ SOLAR POSITION THROUGHPUT")
+    print("=" * 70)
+    print(f"Grid: {args.sites:,} sites × {args.hours:,} hours = {pairs:,} pairs")
+    print(f"Max |Δ cos(zenith)| vs naive: {error:.2e}\n")
+    for name, seconds in rows:
+        print(f"{name:<40} {seconds * 1e3:8.1f} ms  {pairs / seconds / 1e6:7.1f} M pairs/s")
+    should_cool = physics_based_check_batch(T_amb, G)[3]
+    print(f"\nClear-sky cooling hours at 35 °C ambient: {should_cool.mean():.1%} of pairs")
+
+    fast = pairs / dict(rows)["clear_sky_grid (UTC)"] / 1e6
+    if fast < args.target:
+        print(f"\n❌ clear_sky_grid below target: {fast:.1f} < {args.target:.1f} M pairs/s")
+        sys.exit(1)
+    print(f"\n✅ clear_sky_grid meets the {args.target:.1f} M pairs/s target")
+
+
+if __name__ == "__main__":
+    main()
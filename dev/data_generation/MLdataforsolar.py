@@ -116,6 +116,9 @@ regions = {
 start_date = '20220601'
 end_date = '20220630'
 
+# NASA POWER's marker for missing values
+NASA_FILL_VALUE = -999
+
 print(f"\n📅 Date range: {start_date} to {end_date} (30 days)")
 print(f"📍 Regions: {len(regions)}")
 print(f"📊 Expected samples: {len(regions)} regions × 30 days × 24 hours = {len(regions) * 30 * 24} samples\n")
@@ -161,6 +164,7 @@ for region_key, region_info in regions.items():
         temperature_data = data['properties']['parameter']['T2M']
         
         records_count = 0
+        skipped_count = 0
         
         # Process hourly data
         for hour_str in sorted(irradiance_data.keys()):
@@ -168,8 +172,9 @@ for region_key, region_info in regions.items():
             irradiance = irradiance_data[hour_str]
             temperature = temperature_data.get(hour_str, None)
             
-            # Skip if data is missing
-            if irradiance is None or temperature is None:
+            # Skip if data is missing (NASA POWER marks missing values with -999)
+            if irradiance is None or temperature is None or NASA_FILL_VALUE in (irradiance, temperature):
+                skipped_count += 1
                 continue
             
             all_regions_data.append({
@@ -180,7 +185,10 @@ for region_key, region_info in regions.items():
             })
             records_count += 1
         
-        print(f"   ✅ Successfully fetched {records_count} hours of data\n")
+        print(f"   ✅ Successfully fetched {records_count} hours of data")
+        if skipped_count:
+            print(f"   ⚠️ Skipped {skipped_count} hours with missing values")
+        print()
         
     except requests.exceptions.Timeout:
         print(f"   ⚠️ Request timeout - try again later\n")
@@ -0,0 +1,143 @@
+"""
+Build the offline gazetteer (data/gazetteer.npy + .json) used by
+src/gazetteer.py for place autocomplete and resolution.
+
+Sources, best first:
+- GeoNames city dumps (https://download.geonames.org/export/dump/), e.g.
+  cities15000.txt with admin1CodesASCII.txt and countryInfo.txt for
+  readable labels. Cities below --min-population are skipped, and the
+  ASCII name is indexed alongside the native one.
+- The IANA time zone tables (zone.tab + iso3166.tab) shipped with the OS:
+  one representative city per zone with coordinates but no population.
+  Used when no GeoNames dump is given, so the table can be built offline;
+  the result is marked as a placeholder in its header.
+- The 15 study regions from MLdataforsolar.py, which are always included.
+
+Usage:
+    python dev/data_generation/build_gazetteer.py --geonames cities15000.txt \\
+        --admin1 admin1CodesASCII.txt --countries countryInfo.txt --min-population 15000
+    python dev/data_generation/build_gazetteer.py --zoneinfo /usr/share/zoneinfo
+"""
+
+import argparse
+import ast
+import os
+import sys
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+from gazetteer import DEFAULT_PATH, normalize_name, save_gazetteer  # noqa: E402
+
+
+def read_tsv(path):
+    """Rows of a tab-separated file, skipping '#' comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n").split("\t") for line in f if line.strip() and not line.startswith("#")]
+
+
+def iso6709(text):
+    """Decode zone.tab coordinates like +332654-1120424 into (lat, lon)."""
+    split = max(text.rfind("+"), text.rfind("-"))
+    values = []
+    for part, degrees in ((text[:split], 2), (text[split:], 3)):
+        sign = -1 if part[0] == "-" else 1
+        digits = part[1:]
+        d, rest = int(digits[:degrees]), digits[degrees:]
+        m = int(rest[:2])
+        s = int(rest[2:4]) if len(rest) >= 4 else 0
+        values.append(sign * (d + m / 60 + s / 3600))
+    return tuple(values)
+
+
+def geonames_rows(path, min_population, admin1_path=None, countries_path=None):
+    admin1 = {r[0]: r[1] for r in read_tsv(admin1_path)} if admin1_path else {}
+    countries = {r[0]: r[4] for r in read_tsv(countries_path)} if countries_path else {}
+    rows = []
+    for r in read_tsv(path):
+        name, ascii_name, lat, lon, country, admin_code, population = r[1], r[2], r[4], r[5], r[8], r[10], r[14]
+        if int(population or 0) < min_population:
+            continue
+        region = admin1.get(f"{country}.{admin_code}", admin_code)
+        label = ", ".join(p for p in (name, region, countries.get(country, country)) if p)
+        row = {"name": name, "label": label, "country": country, "admin1": admin_code,
+               "lat": float(lat), "lon": float(lon), "population": int(population)}
+        rows.append(row)
+        if normalize_name(ascii_name) != normalize_name(name):
+            rows.append({**row, "key": normalize_name(ascii_name)})
+    return rows
+
+
+def zoneinfo_rows(zoneinfo_dir):
+    countries = {r[0]: r[1] for r in read_tsv(os.path.join(zoneinfo_dir, "iso3166.tab"))}
+    rows = []
+    for r in read_tsv(os.path.join(zoneinfo_dir, "zone.tab")):
+        country, coordinates, zone = r[0], r[1], r[2]
+        name = zone.rsplit("/", 1)[-1].replace("_", " ")
+        lat, lon = iso6709(coordinates)
+        rows.append({"name": name, "label": f"{name}, {countries.get(country, country)}",
+                     "country": country, "lat": lat, "lon": lon})
+    return rows
+
+
+def study_region_rows():
+    """The regions dict literal from MLdataforsolar.py, read without running the script."""
+    path = os.path.join(REPO_ROOT, "dev", "data_generation", "MLdataforsolar.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    node = next(n.value for n in tree.body
+                if isinstance(n, ast.Assign) and getattr(n.targets[0], "id", None) == "regions")
+    rows = []
+    for region in ast.literal_eval(node).values():
+        name, _, qualifier = region["name"].partition(", ")
+        us_state = len(qualifier) == 2
+        rows.append({"name": name,
+                     "label": f"{name}, {qualifier}, United States" if us_state else region["name"],
+                     "country": "US" if us_state else "", "admin1": qualifier if us_state else "",
+                     "lat": region["latitude"], "lon": region["longitude"]})
+    return rows
+
+
+def merge(rows, preferred, max_degrees=0.5):
+    """Add preferred rows, dropping other rows for the same name within max_degrees of one."""
+    taken = {}
+    for r in preferred:
+        taken.setdefault(normalize_name(r["name"]), []).append((r["lat"], r["lon"]))
+
+    def duplicate(r):
+        return any(abs(r["lat"] - lat) <= max_degrees and abs(r["lon"] - lon) <= max_degrees
+                   for lat, lon in taken.get(normalize_name(r["name"]), ()))
+
+    return preferred + [r for r in rows if not duplicate(r)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer table.")
+    parser.add_argument("--geonames", help="GeoNames citiesNNNN.txt")
+    parser.add_argument("--admin1", help="GeoNames admin1CodesASCII.txt (region names in labels)")
+    parser.add_argument("--countries", help="GeoNames countryInfo.txt (country names in labels)")
+    parser.add_argument("--min-population", type=int, default=15000)
+    parser.add_argument("--zoneinfo", default="/usr/share/zoneinfo", help="Used when --geonames is not given")
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    # Study regions fill gaps in GeoNames, and replace the coarser zone.tab entries
+    if args.geonames:
+        rows = geonames_rows(args.geonames, args.min_population, args.admin1, args.countries)
+        rows = merge(study_region_rows(), rows)
+        source = f"GeoNames {os.path.basename(args.geonames)} (population >= {args.min_population:,})"
+        min_population = args.min_population
+    else:
+        rows = merge(zoneinfo_rows(args.zoneinfo), study_region_rows())
+        source = "IANA zone.tab cities (no population data)"
+        min_population = 0
+    source += " + study regions"
+
+    table = save_gazetteer(args.output, rows, source, min_population, placeholder=not args.geonames)
+    size = os.path.getsize(f"{args.output}.npy") + os.path.getsize(f"{args.output}.json")
+    print(f"✅ {len(table):,} rows from {source}")
+    print(f"💾 Gazetteer written to {args.output}.npy / .json ({size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,15 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from sklearn.utils import resample
 import joblib
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATA_DIR = os.path.join(REPO_ROOT, 'dev', 'data_raw')
+MODEL_DIR = os.path.join(REPO_ROOT, 'models')
+
+sys.path.insert(0, os.path.join(REPO_ROOT, 'src'))
+from model_format import export_compact_model
 
 print("=" * 70)
 print("🤖 SOLAR PANEL COOLING ML MODEL - 5 REGION TRAINING")
@@ -30,7 +39,7 @@ files = {
 
 data_list = []
 for region, file in files.items():
-    df = pd.read_csv(f'/Users/assolabasova/Downloads/SolarProjectSCVfiles/{file}')
+    df = pd.read_csv(os.path.join(DATA_DIR, file))
     df['region'] = region
     data_list.append(df)
 
@@ -168,5 +177,10 @@ print(confusion_matrix(y_test, y_pred))
 # ============================================================================
 # STEP 7: Save model
 # ============================================================================
-joblib.dump(model, 'cooling_decision_model.pkl')
-print("\n✅ Model saved as: cooling_decision_model.pkl")
+os.makedirs(MODEL_DIR, exist_ok=True)
+model_path = os.path.join(MODEL_DIR, 'cooling_decision_model.pkl')
+joblib.dump(model, model_path)
+print(f"\n✅ Model saved as: {model_path}")
+
+export_compact_model(model, os.path.join(MODEL_DIR, 'cooling_decision_model'))
+print("✅ Compact model saved as: models/cooling_decision_model.npy + .json")
@@ -0,0 +1,234 @@
+"""
+Geographic Cooling Benefit Map
+Evaluates a year of cooling benefit for every NASA POWER grid cell in a
+bounding box and writes the result as a raster.
+
+1. The box is split into tiles of TILE_CELLS × TILE_CELLS grid cells.
+2. Each tile's hourly weather is fetched cell by cell from NASA POWER and
+   saved to <cache>/<year>/tile_<row>_<col>.npz (weather_tiles/ at the repo
+   root by default). Tiles already on disk are never refetched, so an
+   interrupted run resumes where it stopped. Tiles are fetched concurrently
+   on a thread pool.
+3. Once every tile is cached, the physics check runs over each tile's
+   (cells, hours) arrays and the layers are assembled into a raster:
+
+    <output>.json   header (format, bounding box, cell size, year, layers)
+    <output>.npy    float32 array shaped (layers, rows, cols), north-up
+
+An --output without a directory is saved in the repo's maps/ directory, which
+is where the app looks for maps.
+
+Layers are the annual net energy gained by cooling (kWh/yr), the number of
+hours cooling pays off, and the peak panel temperature.
+
+Usage:
+    python src/benefit_map.py --bbox 31.3 -114.8 37.0 -109.0 --year 2023 --output arizona_2023
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+import numpy as np
+
+from power_grid import CELL_LAT, CELL_LON, cell_center, cells_in_bbox
+from solar_cooling import fetch_weather_range, physics_based_check_batch
+
+FORMAT_NAME = "solar-cooling-benefit-map"
+FORMAT_VERSION = 1
+LAYERS = ("net_kWh", "cooling_hours", "peak_panel_temp")
+
+TILE_CELLS = 4                  # tile edge in grid cells
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "weather_tiles")
+DEFAULT_MAP_DIR = os.path.join(os.path.dirname(__file__), "..", "maps")
+
+
+# -----------------------------
+# TILES
+# -----------------------------
+
+def plan_tiles(rows, cols, tile_cells=TILE_CELLS):
+    """Split row/column index ranges into tiles; returns [(row_0, col_0, rows, cols)]."""
+    return [(rows[r], cols[c], rows[r:r + tile_cells], cols[c:c + tile_cells])
+            for r in range(0, len(rows), tile_cells)
+            for c in range(0, len(cols), tile_cells)]
+
+
+def tile_path(cache_dir, year, row_0, col_0):
+    return os.path.join(cache_dir, str(year), f"tile_{row_0}_{col_0}.npz")
+
+
+def fetch_tile(rows, cols, year, fetch=fetch_weather_range):
+    """Hourly (cells, hours) temperature and irradiance for every cell of a tile."""
+    T_amb, G = [], []
+    for row in rows:
+        for col in cols:
+            lat, lon = cell_center(row, col)
+            df = fetch(lat, lon, date(year, 1, 1), date(year, 12, 31))
+            T_amb.append(df["Temperature"].to_numpy(dtype=np.float32))
+            G.append(df["Irradiance"].to_numpy(dtype=np.float32))
+    hours = min(len(t) for t in T_amb)
+    return np.stack([t[:hours] for t in T_amb]), np.stack([g[:hours] for g in G])
+
+
+def cache_tile(tile, year, cache_dir, fetch=fetch_weather_range):
+    """Fetch a tile unless it is already on disk; returns (path, fetched)."""
+    row_0, col_0, rows, cols = tile
+    path = tile_path(cache_dir, year, row_0, col_0)
+    if os.path.exists(path):
+        return path, False
+
+    T_amb, G = fetch_tile(rows, cols, year, fetch)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary name first so an interrupted run never leaves a partial tile
+    partial = f"{path}.partial.npz"
+    np.savez(partial, rows=np.array(rows), cols=np.array(cols), T_amb=T_amb, G=G)
+    os.replace(partial, path)
+    return path, True
+
+
+def cache_tiles(tiles, year, cache_dir, fetch=fetch_weather_range, max_workers=8):
+    """Fetch missing tiles concurrently, yielding (tile, fetched, error) as each finishes."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(cache_tile, tile, year, cache_dir, fetch): tile for tile in tiles}
+        for future in as_completed(futures):
+            try:
+                _, fetched = future.result()
+                yield futures[future], fetched, None
+            except Exception as e:
+                yield futures[future], False, str(e)
+
+
+# -----------------------------
+# RASTER
+# -----------------------------
+
+def tile_layers(T_amb, G):
+    """(layers, cells) benefit summary for a tile's weather."""
+    panel_temp, energy_gain, cooling_cost, should_cool, _, _ = physics_based_check_batch(T_amb, G)
+    valid = ~(np.isnan(T_amb) | np.isnan(G))
+    cool = should_cool & valid
+    net_kWh = np.where(cool, energy_gain - cooling_cost, 0.0).sum(axis=1) / 1000
+    peak = np.where(valid, panel_temp, -np.inf).max(axis=1)
+    return np.stack([net_kWh, cool.sum(axis=1), peak])
+
+
+def assemble_raster(rows, cols, tiles, year, cache_dir):
+    """Raster of LAYERS from cached tiles, north-up; cells without a tile are NaN."""
+    raster = np.full((len(LAYERS), len(rows), len(cols)), np.nan, dtype=np.float32)
+    for row_0, col_0, _, _ in tiles:
+        path = tile_path(cache_dir, year, row_0, col_0)
+        if not os.path.exists(path):
+            continue
+        with np.load(path) as tile:
+            layers = tile_layers(tile["T_amb"].astype(float), tile["G"].astype(float))
+            tile_rows, tile_cols = tile["rows"], tile["cols"]
+        r = tile_rows - rows[0]
+        c = tile_cols - cols[0]
+        raster[:, r[:, None], c[None, :]] = layers.reshape(len(LAYERS), len(r), len(c))
+    return raster[:, ::-1]
+
+
+def save_map(base_path, raster, rows, cols, year):
+    """Write <base>.npy and its <base>.json header."""
+    north, west = cell_center(rows[-1], cols[0])
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "year": year,
+        "layers": list(LAYERS),
+        "shape": list(raster.shape),
+        "north": north,
+        "west": west,
+        "lat_step": CELL_LAT,
+        "lon_step": CELL_LON,
+        "complete": bool(np.isfinite(raster[0]).all()),
+    }
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    np.save(f"{base_path}.npy", raster)
+    with open(f"{base_path}.json", "w") as f:
+        json.dump(header, f, indent=1)
+
+
+def load_map(base_path, mmap_mode="r"):
+    """Return (header, raster, lats, lons) for a saved map; lats run north to south."""
+    base = os.path.splitext(base_path)[0] if base_path.endswith((".json", ".npy")) else base_path
+    with open(f"{base}.json") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"{base}.json is not a {FORMAT_NAME} header.")
+    raster = np.load(f"{base}.npy", mmap_mode=mmap_mode)
+    _, n_rows, n_cols = raster.shape
+    lats = header["north"] - header["lat_step"] * np.arange(n_rows)
+    lons = header["west"] + header["lon_step"] * np.arange(n_cols)
+    return header, raster, lats, lons
+
+
+def list_maps(map_dir=DEFAULT_MAP_DIR):
+    """Base paths of the maps saved in a directory."""
+    if not os.path.isdir(map_dir):
+        return []
+    return sorted(os.path.join(map_dir, name[:-5]) for name in os.listdir(map_dir)
+                  if name.endswith(".json") and os.path.exists(os.path.join(map_dir, name[:-5] + ".npy")))
+
+
+def resolve_output(output, map_dir=DEFAULT_MAP_DIR):
+    """A bare map name goes into map_dir; a path with a directory is kept as given."""
+    return output if os.path.dirname(output) else os.path.join(map_dir, output)
+
+
+def build_map(bbox, year, output, cache_dir=DEFAULT_CACHE_DIR, fetch=fetch_weather_range,
+              max_workers=8, progress=None):
+    """Cache every tile of a bounding box and write the raster; returns (raster, failed tiles)."""
+    rows, cols = cells_in_bbox(*bbox)
+    tiles = plan_tiles(rows, cols)
+    failed = []
+    for done, (tile, fetched, error) in enumerate(cache_tiles(tiles, year, cache_dir, fetch, max_workers), 1):
+        if error:
+            failed.append((tile[0], tile[1], error))
+        if progress:
+            progress(done, len(tiles), tile, fetched, error)
+
+    raster = assemble_raster(rows, cols, tiles, year, cache_dir)
+    save_map(output, raster, rows, cols, year)
+    return raster, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map the annual cooling benefit over a lat/lon box.")
+    parser.add_argument("--bbox", nargs=4, type=float, required=True, metavar=("SOUTH", "WEST", "NORTH", "EAST"))
+    parser.add_argument("--year", type=int, default=2023)
+    parser.add_argument("--output", default="benefit_map", help="Map name (saved in maps/) or base path")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent tile fetches")
+    args = parser.parse_args()
+    args.output = resolve_output(args.output)
+
+    rows, cols = cells_in_bbox(*args.bbox)
+    print(f"🌞 {len(rows)} × {len(cols)} cells in {len(plan_tiles(rows, cols))} tiles · {args.year}")
+
+    def progress(done, total, tile, fetched, error):
+        status = f"❌ {error}" if error else ("fetched" if fetched else "cached")
+        print(f"   [{done}/{total}] tile {tile[0]},{tile[1]}: {status}")
+
+    start = time.perf_counter()
+    raster, failed = build_map(tuple(args.bbox), args.year, args.output, args.cache_dir,
+                               max_workers=args.workers, progress=progress)
+    seconds = time.perf_counter() - start
+
+    net = raster[0]
+    print("=" * 70)
+    print(f"🗺️ BENEFIT MAP · {np.isfinite(net).sum()}/{net.size} cells · {seconds:.1f} s")
+    print("=" * 70)
+    if np.isfinite(net).any():
+        print(f"Net gain: {np.nanmin(net):.2f} – {np.nanmax(net):.2f} kWh/yr per panel")
+    if failed:
+        print(f"⚠️ {len(failed)} tile(s) failed; rerun the same command to retry them")
+    print(f"💾 Map written to {args.output}.npy / {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Bulk Multi-Site Analysis
+Scores many installation sites over a date range: deduplicated, rate-limited
+geocoding (bulk_geocoder), concurrent NASA POWER fetches and one vectorized
+physics + ML pass per site.
+Results are yielded as each site finishes so callers can stream them.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from bulk_geocoder import BulkGeocoder, normalize_place
+from data_quality import QUALITY_MISSING
+from site_index import SiteIndex
+from solar_cooling import (
+    fetch_weather_range,
+    physics_based_check_batch,
+    predict_from_model_batch,
+)
+
+PLACE_COLUMNS = ("place", "location", "address", "city")
+NAME_COLUMNS = ("site", "name", "site_id")
+RESULT_COLUMNS = [
+    "site", "place", "lat", "lon", "weather_lat", "weather_lon",
+    "hours", "missing_hours", "cooling_hours", "cooling_pct",
+    "net_gain_Wh", "peak_panel_temp", "ml_agreement", "error",
+]
+
+
+def _pick_column(columns, candidates):
+    lowered = {c.lower(): c for c in columns}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def read_sites(source):
+    """Read a sites CSV into a list of dicts with site, place, lat and lon keys.
+
+    The file needs either a place/location/address/city column or lat and lon
+    columns; an optional site/name column labels each row.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(source)
+    place_col = _pick_column(df.columns, PLACE_COLUMNS)
+    name_col = _pick_column(df.columns, NAME_COLUMNS)
+    lat_col = _pick_column(df.columns, ("lat", "latitude"))
+    lon_col = _pick_column(df.columns, ("lon", "lng", "longitude"))
+    if place_col is None and (lat_col is None or lon_col is None):
+        raise ValueError("Sites file needs a place/location/address column or lat and lon columns.")
+
+    sites = []
+    for i, row in enumerate(df.to_dict("records")):
+        place = row.get(place_col) if place_col else None
+        lat = row.get(lat_col) if lat_col else None
+        lon = row.get(lon_col) if lon_col else None
+        has_coords = lat is not None and lon is not None and pd.notna(lat) and pd.notna(lon)
+        sites.append({
+            "site": str(row[name_col]) if name_col else str(place if place_col else i),
+            "place": None if place is None or pd.isna(place) else str(place),
+            "lat": float(lat) if has_coords else None,
+            "lon": float(lon) if has_coords else None,
+        })
+    return sites
+
+
+def geocode_sites(sites, geocoder=None, progress=None):
+    """Fill in lat/lon for sites that only have a place, geocoding each distinct place once.
+
+    geocoder is a BulkGeocoder (a fresh in-memory one by default); progress,
+    if given, is called as progress(done, total, result) for each distinct place.
+    """
+    geocoder = geocoder or BulkGeocoder()
+    by_key = {}
+    for site in sites:
+        if site["lat"] is None and site["place"]:
+            by_key.setdefault(normalize_place(site["place"]), []).append(site)
+
+    places = [members[0]["place"] for members in by_key.values()]
+    for done, result in enumerate(geocoder.geocode(places), 1):
+        if result["lat"] is not None:
+            for site in by_key[result["key"]]:
+                site["lat"], site["lon"] = result["lat"], result["lon"]
+        if progress:
+            progress(done, len(by_key), result)
+    return sites
+
+
+def score_weather(weather, model=None):
+    """Summarize one site's hourly weather with the batch physics and ML decisions."""
+    missing = 0
+    if "Quality" in weather:
+        # Hours NASA POWER could not provide even after gap filling are left out
+        usable = weather["Quality"].to_numpy() != QUALITY_MISSING
+        missing = int((~usable).sum())
+        weather = weather[usable]
+
+    T_amb = weather["Temperature"].to_numpy(dtype=float)
+    G = weather["Irradiance"].to_numpy(dtype=float)
+    panel_temp, energy_gain, cooling_cost, should_cool, _, _ = physics_based_check_batch(T_amb, G)
+    if model is None or not len(T_amb):
+        prediction, error = None, "Model file not found" if model is None else "No usable hours"
+    else:
+        prediction, error = predict_from_model_batch(T_amb, G, weather["Hour"].to_numpy(), model=model)
+
+    net_gain = energy_gain - cooling_cost
+    return {
+        "hours": len(T_amb),
+        "missing_hours": missing,
+        "cooling_hours": int(should_cool.sum()),
+        "cooling_pct": float(should_cool.mean() * 100) if len(T_amb) else 0.0,
+        "net_gain_Wh": float(net_gain[should_cool].sum()),
+        "peak_panel_temp": float(panel_temp.max()) if len(T_amb) else None,
+        "ml_agreement": None if error else float((prediction == should_cool).mean()),
+    }
+
+
+def analyze_sites(sites, start_date, end_date, fetch=fetch_weather_range, model=None, max_workers=8,
+                  reuse_km=0.0):
+    """Yield one result dict per site, in completion order.
+
+    Sites at the same coordinates share a single fetch, as do sites within
+    reuse_km of an earlier site's fetch point (weather_lat/weather_lon say
+    which). At most 2 * max_workers fetches are in flight, and hourly arrays
+    are dropped once a site is scored, so memory stays flat however many
+    sites are passed in.
+    """
+    index = SiteIndex()
+    by_cell = {}
+    for site in sites:
+        if site["lat"] is None:
+            yield {**_site_fields(site), "error": "Could not geocode location"}
+            continue
+        lat, lon, _, _ = index.resolve(round(site["lat"], 4), round(site["lon"], 4), max_km=reuse_km)
+        index.add(lat, lon)
+        by_cell.setdefault((lat, lon), []).append(site)
+
+    cells = iter(by_cell.items())
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+
+        def submit_next():
+            cell = next(cells, None)
+            if cell is not None:
+                (lat, lon), members = cell
+                pending[pool.submit(fetch, lat, lon, start_date, end_date)] = cell
+
+        for _ in range(2 * max_workers):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                (lat, lon), members = pending.pop(future)
+                try:
+                    summary = score_weather(future.result(), model)
+                    summary["error"] = None
+                except Exception as e:
+                    summary = {"error": str(e)}
+                for site in members:
+                    yield {**_site_fields(site), "weather_lat": lat, "weather_lon": lon, **summary}
+                submit_next()
+
+
+def _site_fields(site):
+    return {"site": site["site"], "place": site["place"], "lat": site["lat"], "lon": site["lon"]}
@@ -0,0 +1,263 @@
+"""
+Bulk Geocoder
+Geocodes an installation list of thousands of addresses without breaking
+Nominatim's usage policy (at most 1 request per second):
+
+1. Inputs are normalized ("  Phoenix,AZ " == "phoenix, az") and deduplicated.
+2. Places already in the checkpoint or the offline gazetteer are answered at
+   once.
+3. The rest are looked up one by one, each after taking a token from a
+   token bucket shared by every BulkGeocoder in the process using the same
+   endpoint.
+
+Every upstream answer, including "not found", is appended to a JSONL
+checkpoint as soon as it arrives, so a restarted run resumes where the last
+one stopped; failed lookups are not recorded and are retried next run.
+Records carry the endpoint they came from, and only records from the
+geocoder's own endpoint are used, so answers from a test stand-in never
+leak into real results.
+Results are yielded as a stream, one dict per distinct place.
+
+Usage:
+    python src/bulk_geocoder.py sites.csv --output geocoded.csv          # data/cache/geocode_cache.jsonl
+    python src/bulk_geocoder.py sites.csv --url http://127.0.0.1:8766/search --rate 20   # own checkpoint
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from solar_cooling import GEOCODE_URL, get_coordinates, get_gazetteer
+
+NOMINATIM_RATE = 1.0        # requests per second allowed by the Nominatim usage policy
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "geocode_cache.jsonl")
+RESULT_FIELDS = ["place", "key", "lat", "lon", "label", "source", "error"]
+
+
+def normalize_place(place):
+    """Canonical form used to deduplicate place strings ("  Phoenix,AZ " == "phoenix, az")."""
+    place = re.sub(r"\s*,\s*", ", ", str(place).strip())
+    return re.sub(r"\s+", " ", place).casefold()
+
+
+# -----------------------------
+# RATE LIMITING
+# -----------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, holding at most capacity."""
+
+    def __init__(self, rate=NOMINATIM_RATE, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is free and take it; returns the seconds waited."""
+        start = time.monotonic()
+        with self._lock:        # waiters queue on the lock, so tokens go out in order
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                time.sleep((1 - self._tokens) / self.rate)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def shared_bucket(url, rate=NOMINATIM_RATE):
+    """The process-wide bucket for an endpoint, so concurrent runs share its rate limit."""
+    with _buckets_lock:
+        if url not in _buckets:
+            _buckets[url] = TokenBucket(rate)
+        bucket = _buckets[url]
+    if bucket.rate != rate:
+        raise ValueError(f"{url} is already limited to {bucket.rate:g} requests/s in this process, not {rate:g}.")
+    return bucket
+
+
+# -----------------------------
+# CHECKPOINT
+# -----------------------------
+
+def default_checkpoint(url=GEOCODE_URL):
+    """Checkpoint path for an endpoint: SOLAR_GEOCODE_CHECKPOINT or DEFAULT_CHECKPOINT for
+    Nominatim, and a separate file next to it for any other endpoint.
+    """
+    path = os.path.normpath(os.environ.get("SOLAR_GEOCODE_CHECKPOINT") or DEFAULT_CHECKPOINT)
+    if url == GEOCODE_URL:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]}{ext}"
+
+
+class Checkpoint:
+    """Append-only JSONL log of one endpoint's finished lookups, keyed by normalized place.
+
+    Records from other endpoints in the same file are ignored. With path
+    None the log is kept in memory only.
+    """
+
+    def __init__(self, path=None, url=GEOCODE_URL):
+        self.path = path
+        self.url = url
+        self.results = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            # A crash mid-write left a torn last line; drop it so appends start clean
+            with open(self.path, "r+b") as f:
+                f.truncate(len(complete))
+        for line in complete.decode("utf-8").splitlines():
+            if line.strip():
+                record = json.loads(line)
+                if record.get("url") == self.url:
+                    self.results[record["key"]] = record
+
+    def get(self, key):
+        with self._lock:
+            return self.results.get(key)
+
+    def record(self, result):
+        """Store a finished lookup and, with a path, append it to the log."""
+        record = {"url": self.url, **{field: result[field] for field in ("key", "place", "lat", "lon", "label")}}
+        with self._lock:
+            self.results[record["key"]] = record
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def __len__(self):
+        return len(self.results)
+
+
+# -----------------------------
+# BULK GEOCODING
+# -----------------------------
+
+class BulkGeocoder:
+    """Deduplicating, rate-limited, resumable geocoder; safe to share between threads."""
+
+    def __init__(self, checkpoint=None, url=GEOCODE_URL, rate=NOMINATIM_RATE, offline=True):
+        self.checkpoint = Checkpoint(checkpoint, url)
+        self.url = url
+        self.bucket = shared_bucket(url, rate)
+        self.offline = offline
+
+    def _result(self, key, place, coords, source, error=None):
+        lat, lon, label = coords if coords else (None, None, None)
+        return {"place": place, "key": key, "lat": lat, "lon": lon, "label": label,
+                "source": source, "error": error}
+
+    def _from_checkpoint(self, key, place):
+        cached = self.checkpoint.get(key)
+        if cached is None:
+            return None
+        coords = (cached["lat"], cached["lon"], cached["label"]) if cached["lat"] is not None else None
+        return self._result(key, place, coords, "checkpoint")
+
+    def geocode(self, places):
+        """Yield one result dict per distinct place: cached answers first, then upstream ones.
+
+        source is "checkpoint", "gazetteer", "nominatim" or "error"; lat and
+        lon are None for places that weren't found or failed.
+        """
+        gazetteer = get_gazetteer() if self.offline else None
+        seen, queued = set(), []
+        for place in places:
+            if place is None or not str(place).strip():
+                continue
+            key = normalize_place(place)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            cached = self._from_checkpoint(key, place)
+            if cached is not None:
+                yield cached
+                continue
+            match = gazetteer.resolve(place) if gazetteer is not None else None
+            if match is not None:
+                yield self._result(key, place, match, "gazetteer")
+                continue
+            queued.append((key, place))
+
+        if queued:
+            import requests  # noqa: F401  (so the first token isn't spent on the lazy import)
+
+        for key, place in queued:
+            cached = self._from_checkpoint(key, place)  # another session may have looked it up meanwhile
+            if cached is not None:
+                yield cached
+                continue
+            self.bucket.acquire()
+            try:
+                result = self._result(key, place, get_coordinates(place, offline=False, url=self.url), "nominatim")
+            except Exception as e:
+                yield self._result(key, place, None, "error", str(e))
+                continue
+            self.checkpoint.record(result)
+            yield result
+
+
+def main():
+    from bulk_analysis import read_sites
+
+    parser = argparse.ArgumentParser(description="Geocode the places in a sites CSV, resumably and rate-limited.")
+    parser.add_argument("sites", help="CSV with a place/location/address/city column")
+    parser.add_argument("--checkpoint", help=f"JSONL progress log, resumed if it exists "
+                                             "(default: data/cache/geocode_cache.jsonl, or a per-endpoint file with --url)")
+    parser.add_argument("--url", default=GEOCODE_URL, help="Nominatim-compatible search endpoint")
+    parser.add_argument("--rate", type=float, default=NOMINATIM_RATE, help="Upstream requests per second")
+    parser.add_argument("--offline", action=argparse.BooleanOptionalAction, default=True,
+                        help="Answer from the offline gazetteer where possible")
+    parser.add_argument("--output", help="Write one CSV row per distinct place")
+    args = parser.parse_args()
+
+    places = [site["place"] for site in read_sites(args.sites) if site["place"]]
+    geocoder = BulkGeocoder(args.checkpoint or default_checkpoint(args.url), args.url, args.rate, args.offline)
+    distinct = len({normalize_place(p) for p in places})
+    print(f"📍 {len(places):,} places · {distinct:,} distinct · {len(geocoder.checkpoint):,} in checkpoint")
+
+    start = time.perf_counter()
+    results, sources = [], {}
+    for result in geocoder.geocode(places):
+        results.append(result)
+        sources[result["source"]] = sources.get(result["source"], 0) + 1
+        if result["source"] in ("nominatim", "error"):
+            where = f"{result['lat']:.4f}, {result['lon']:.4f}" if result["lat"] is not None else "not found"
+            print(f"   {len(results):>6}/{distinct} {result['place']}: {result['error'] or where}")
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(results):,} places in {elapsed:.1f} s · " +
+          " · ".join(f"{count:,} {source}" for source, count in sorted(sources.items())))
+    if args.output:
+        import csv
+
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Climatology Store
+"Typical July 2 pm in Tucson" doesn't need a NASA POWER request. This module
+builds, offline, the distribution of ambient temperature and irradiance for
+every (grid cell, month, hour of day), plus how often physics_based_check
+says cooling pays off, and serves lookups from a memory-mapped array.
+
+A store is a pair of files sharing one base path, like the compact model:
+    <base>.json   header (format, fields, years, cell keys)
+    <base>.npy    float32 array shaped (cells, 12 months, 24 hours, fields)
+
+Cells are NASA POWER grid cells (power_grid). Weather comes from the tiles
+cached by benefit_map.py for each year, or from the stored region CSVs.
+
+Usage:
+    python src/climatology.py build --bbox 31.3 -114.8 37.0 -109.0 --years 2019 2020 2021 2022 2023
+    python src/climatology.py build --regions
+    python src/climatology.py query --lat 32.22 --lon -110.97 --month 7 --hour 14
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from power_grid import N_COLS, cell_center, cell_index
+from solar_cooling import physics_based_check_batch
+
+FORMAT_NAME = "solar-cooling-climatology"
+FORMAT_VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "climatology")
+
+QUANTILES = (10, 50, 90)
+FIELDS = (
+    "samples",
+    "T_p10", "T_p50", "T_p90",
+    "G_p10", "G_p50", "G_p90",
+    "p_cool",               # share of samples where cooling pays off
+    "net_gain_mean",        # W, counting hours without cooling as 0
+)
+
+
+def cell_key(row, col):
+    return row * N_COLS + col
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+
+def cell_statistics(times, T_amb, G):
+    """(cells, 12, 24, FIELDS) statistics for (cells, hours) weather stamped by times."""
+    times = np.asarray(times, dtype="datetime64[h]")
+    month = (times.astype("datetime64[M]") - times.astype("datetime64[Y]")).astype(int)
+    hour = (times - times.astype("datetime64[D]")).astype(int)
+    group = month * 24 + hour
+
+    _, energy_gain, cooling_cost, should_cool, _, _ = physics_based_check_batch(T_amb, G)
+    valid = ~(np.isnan(T_amb) | np.isnan(G))
+    net = np.where(should_cool, energy_gain - cooling_cost, 0.0)
+
+    stats = np.full((T_amb.shape[0], 12 * 24, len(FIELDS)), np.nan, dtype=np.float32)
+    stats[..., 0] = 0
+    for g in np.unique(group):
+        columns = group == g
+        ok = valid[:, columns]
+        count = ok.sum(axis=1)
+        T_g = np.where(ok, T_amb[:, columns], np.nan)
+        G_g = np.where(ok, G[:, columns], np.nan)
+        has = count > 0
+        if not has.any():
+            continue
+        stats[has, g, 0] = count[has]
+        stats[has, g, 1:4] = np.nanpercentile(T_g[has], QUANTILES, axis=1).T
+        stats[has, g, 4:7] = np.nanpercentile(G_g[has], QUANTILES, axis=1).T
+        stats[has, g, 7] = (should_cool[:, columns] & ok)[has].sum(axis=1) / count[has]
+        stats[has, g, 8] = np.where(ok, net[:, columns], 0.0)[has].sum(axis=1) / count[has]
+    return stats.reshape(T_amb.shape[0], 12, 24, len(FIELDS))
+
+
+def save_store(base_path, cells, stats, years, source):
+    """Write <base>.npy and its <base>.json header; cells is a list of (row, col)."""
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "fields": list(FIELDS),
+        "quantiles": list(QUANTILES),
+        "years": sorted(years),
+        "source": source,
+        "cells": [cell_key(row, col) for row, col in cells],
+    }
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    np.save(f"{base_path}.npy", stats.astype(np.float32))
+    with open(f"{base_path}.json", "w") as f:
+        json.dump(header, f)
+
+
+def build_from_regions(pattern=None):
+    """Statistics for the stored region CSVs; returns (cells, stats, years)."""
+    from regions import REGION_COORDINATES
+    from sensitivity import load_regions
+
+    regions, times, T_amb, G = load_regions(pattern)
+    cells = [cell_index(*REGION_COORDINATES[r]) for r in regions]
+    # Regions can share a cell; keep the first
+    first = sorted({cell: i for i, cell in reversed(list(enumerate(cells)))}.values())
+    stats = cell_statistics(times, T_amb[first], G[first])
+    years = sorted({int(str(t)[:4]) for t in times[[0, -1]]})
+    return [cells[i] for i in first], stats, years
+
+
+def build_from_tiles(bbox, years, cache_dir, fetch=None, max_workers=8):
+    """Statistics for every cell in a box from benefit_map's per-year tile cache (fetching missing tiles)."""
+    from benefit_map import cache_tiles, plan_tiles, tile_path
+    from power_grid import cells_in_bbox
+    from solar_cooling import fetch_weather_range
+
+    rows, cols = cells_in_bbox(*bbox)
+    tiles = plan_tiles(rows, cols)
+    for year in years:
+        for tile, _, error in cache_tiles(tiles, year, cache_dir, fetch or fetch_weather_range, max_workers):
+            if error:
+                raise RuntimeError(f"Tile {tile[0]},{tile[1]} for {year} failed: {error}")
+
+    cells, parts = [], []
+    for row_0, col_0, tile_rows, tile_cols in tiles:
+        T_years, G_years, t_years = [], [], []
+        for year in years:
+            with np.load(tile_path(cache_dir, year, row_0, col_0)) as tile:
+                T_years.append(tile["T_amb"].astype(float))
+                G_years.append(tile["G"].astype(float))
+            t_years.append(np.datetime64(f"{year}-01-01T00", "h") + np.arange(T_years[-1].shape[1]))
+        parts.append(cell_statistics(np.concatenate(t_years), np.concatenate(T_years, axis=1),
+                                     np.concatenate(G_years, axis=1)))
+        cells += [(row, col) for row in tile_rows for col in tile_cols]
+    return cells, np.concatenate(parts), list(years)
+
+
+# -----------------------------
+# LOOKUP
+# -----------------------------
+
+class Climatology:
+    """Memory-mapped climatology store with O(1) cell lookups."""
+
+    def __init__(self, header, stats):
+        self.header = header
+        self.stats = stats
+        self.index = {key: i for i, key in enumerate(header["cells"])}
+        self.fields = header["fields"]
+
+    def typical(self, lat, lon, month, hour):
+        """Statistics for the cell containing (lat, lon) at a month (1-12) and hour, or None."""
+        row, col = cell_index(lat, lon)
+        i = self.index.get(cell_key(row, col))
+        if i is None:
+            return None
+        values = self.stats[i, month - 1, hour]
+        if not values[0] > 0:
+            return None
+        result = dict(zip(self.fields, values.tolist()))
+        result["cell"] = cell_center(row, col)
+        result["years"] = self.header["years"]
+        return result
+
+    def __len__(self):
+        return len(self.index)
+
+
+def load_store(base_path=DEFAULT_PATH, mmap_mode="r"):
+    """Open a climatology store; raises FileNotFoundError if it hasn't been built."""
+    with open(f"{base_path}.json") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"{base_path}.json is not a {FORMAT_NAME} header.")
+    return Climatology(header, np.load(f"{base_path}.npy", mmap_mode=mmap_mode))
+
+
+def main():
+    from benefit_map import DEFAULT_CACHE_DIR
+
+    parser = argparse.ArgumentParser(description="Build or query the offline climatology store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the store")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--bbox", nargs=4, type=float, metavar=("SOUTH", "WEST", "NORTH", "EAST"))
+    source.add_argument("--regions", action="store_true", help="Use the region CSVs in dev/data_raw")
+    build.add_argument("--years", nargs="+", type=int, default=[2019, 2020, 2021, 2022, 2023])
+    build.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    build.add_argument("--workers", type=int, default=8)
+    build.add_argument("--output", default=DEFAULT_PATH)
+
+    query = sub.add_parser("query", help="Look up typical conditions")
+    query.add_argument("--lat", type=float, required=True)
+    query.add_argument("--lon", type=float, required=True)
+    query.add_argument("--month", type=int, required=True)
+    query.add_argument("--hour", type=int, required=True)
+    query.add_argument("--store", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        if args.regions:
+            cells, stats, years = build_from_regions()
+            source = "dev/data_raw region CSVs"
+        else:
+            cells, stats, years = build_from_tiles(tuple(args.bbox), args.years, args.cache_dir,
+                                                   max_workers=args.workers)
+            source = f"NASA POWER tiles {tuple(args.bbox)}"
+        save_store(args.output, cells, stats, years, source)
+        size = os.path.getsize(f"{args.output}.npy") + os.path.getsize(f"{args.output}.json")
+        covered = (stats[..., 0] > 0).any(axis=2).sum()
+        print(f"✅ {len(cells)} cells · {covered} cell-months with data · {years[0]}–{years[-1]} · "
+              f"{size / 1024:.0f} KB · {time.perf_counter() - start:.1f} s")
+        print(f"💾 Store written to {args.output}.npy / {args.output}.json")
+        return
+
+    start = time.perf_counter()
+    store = load_store(args.store)
+    opened = time.perf_counter()
+    result = store.typical(args.lat, args.lon, args.month, args.hour)
+    answered = time.perf_counter()
+    if result is None:
+        print("❌ No climatology for this cell, month and hour; use a live fetch for a specific date.")
+        return
+    lat, lon = result["cell"]
+    print(f"📍 Cell {lat:.2f}, {lon:.3f} · month {args.month} · {args.hour}:00 · "
+          f"{result['samples']:.0f} samples ({result['years'][0]}–{result['years'][-1]})")
+    print(f"🌡️ Ambient:    {result['T_p10']:.1f} / {result['T_p50']:.1f} / {result['T_p90']:.1f} °C (p10/p50/p90)")
+    print(f"☀️ Irradiance: {result['G_p10']:.0f} / {result['G_p50']:.0f} / {result['G_p90']:.0f} W/m²")
+    print(f"💧 Cooling pays off {result['p_cool']:.0%} of the time · mean net gain {result['net_gain_mean']:+.2f} W")
+    print(f"⚡ open {(opened - start) * 1e3:.2f} ms · lookup {(answered - opened) * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Weather Data Quality
+Detects NASA POWER fill values (-999), NaNs, implausible readings and
+missing hours across whole (sites, hours) arrays, fills short gaps and flags
+the rest.
+
+- Temperature gaps are interpolated linearly between the neighbouring hours.
+- Irradiance gaps interpolate the clear-sky index of the neighbouring sunlit
+  hours and rescale by each missing hour's extraterrestrial irradiance, so a
+  filled morning hour ramps up with the sun instead of being a straight line.
+- Missing night hours (no extraterrestrial irradiance) are known to be 0
+  whatever the gap length, so they are filled before gaps are measured.
+- Gaps longer than MAX_FILL_HOURS are left as NaN and flagged QUALITY_MISSING.
+
+Usage:
+    python src/data_quality.py dev/data_raw/*_data.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from solar_geometry import day_of_year, extraterrestrial_horizontal_mean, hour_of_day
+
+FILL_VALUE = -999.0
+MAX_FILL_HOURS = 3
+
+# Readings outside these ranges are treated as missing
+PLAUSIBLE_TEMPERATURE = (-90.0, 60.0)      # °C
+PLAUSIBLE_IRRADIANCE = (0.0, 1500.0)       # W/m²
+
+# Per-hour flags
+QUALITY_OK = 0
+QUALITY_FILLED = 1
+QUALITY_MISSING = 2
+
+# Hours whose extraterrestrial mean is below this (W/m²) carry no clear-sky information
+MIN_EXTRATERRESTRIAL = 20.0
+
+
+# -----------------------------
+# DETECTION
+# -----------------------------
+
+def missing_mask(values, plausible, fill_value=FILL_VALUE):
+    """True where a value is NaN, the NASA POWER fill value, or outside the plausible range."""
+    values = np.asarray(values, dtype=float)
+    low, high = plausible
+    with np.errstate(invalid="ignore"):
+        return np.isnan(values) | (values == fill_value) | (values < low) | (values > high)
+
+
+def run_lengths(mask):
+    """Length of the run of True each element belongs to (0 where False), along the last axis."""
+    mask = np.asarray(mask, dtype=bool)
+    rows = mask.reshape(-1, mask.shape[-1])
+    # A False column between rows keeps runs from spilling into the next site
+    flat = np.concatenate([rows, np.zeros((rows.shape[0], 1), dtype=bool)], axis=1).ravel()
+
+    edges = np.diff(np.concatenate([[False], flat]).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = np.zeros(flat.shape, dtype=np.int64)
+    lengths[flat] = np.repeat(ends - starts, ends - starts)
+    return lengths.reshape(rows.shape[0], -1)[:, :-1].reshape(mask.shape)
+
+
+def reindex_hourly(times, *columns, start=None, end=None):
+    """Insert NaN hours so times runs contiguously from start to end (inclusive).
+
+    start and end default to the first and last of times; pass the requested
+    range so hours missing at either edge are flagged too. Readings outside it
+    are dropped. Returns (full_times, missing_hour_mask, *columns) with the
+    hour axis last.
+    """
+    times = np.asarray(times, dtype="datetime64[h]")
+    start = times.min() if start is None else np.datetime64(start, "h")
+    end = times.max() if end is None else np.datetime64(end, "h")
+    full = np.arange(start, end + np.timedelta64(1, "h"), dtype="datetime64[h]")
+    inside = (times >= start) & (times <= end)
+    position = (times[inside] - start).astype(int)
+
+    absent = np.ones(len(full), dtype=bool)
+    absent[position] = False
+    out = []
+    for column in columns:
+        column = np.asarray(column, dtype=float)[..., inside]
+        filled = np.full(column.shape[:-1] + (len(full),), np.nan)
+        filled[..., position] = column
+        out.append(filled)
+    return (full, absent, *out)
+
+
+# -----------------------------
+# FILLING
+# -----------------------------
+
+def interpolate_missing(values, mask):
+    """Linearly interpolate masked entries from the nearest valid neighbours on each side.
+
+    Entries with a valid neighbour on one side only take that neighbour's value;
+    entries with none stay NaN.
+    """
+    n = values.shape[-1]
+    index = np.arange(n)
+
+    before = np.where(mask, -1, index)
+    np.maximum.accumulate(before, axis=-1, out=before)
+    after = np.where(mask, n, index)
+    after = np.minimum.accumulate(after[..., ::-1], axis=-1)[..., ::-1]
+
+    has_before, has_after = before >= 0, after < n
+    before = np.where(has_before, before, after)
+    after = np.where(has_after, after, before)
+    safe_before, safe_after = np.clip(before, 0, n - 1), np.clip(after, 0, n - 1)
+
+    left = np.take_along_axis(values, safe_before, axis=-1)
+    right = np.take_along_axis(values, safe_after, axis=-1)
+    span = np.maximum(after - before, 1)
+    interpolated = left + (right - left) * (index - before) / span
+    interpolated = np.where(has_before | has_after, interpolated, np.nan)
+    return np.where(mask, interpolated, values)
+
+
+def fill_gaps(times, T_amb, G, lat, max_gap_hours=MAX_FILL_HOURS):
+    """Fill short gaps in contiguous hourly arrays; return (T_amb, G, flags).
+
+    T_amb and G are (hours,) or (sites, hours) with one latitude per site.
+    flags holds QUALITY_OK / QUALITY_FILLED / QUALITY_MISSING per hour.
+    """
+    times = np.asarray(times, dtype="datetime64[h]")
+    T_amb = np.asarray(T_amb, dtype=float)
+    G = np.asarray(G, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    if T_amb.ndim > 1:
+        lat = lat.reshape(-1, 1)
+
+    T_bad = missing_mask(T_amb, PLAUSIBLE_TEMPERATURE)
+    G_bad = missing_mask(G, PLAUSIBLE_IRRADIANCE)
+
+    T_filled = interpolate_missing(np.where(T_bad, np.nan, T_amb), T_bad)
+
+    # Interpolate the clear-sky index between sunlit hours, then rescale
+    start = hour_of_day(times)
+    reference = extraterrestrial_horizontal_mean(lat, day_of_year(times), start, start + 1)
+    sunlit = reference > MIN_EXTRATERRESTRIAL
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(sunlit & ~G_bad, G / reference, np.nan)
+    k = np.clip(interpolate_missing(k, np.isnan(k)), 0.0, 1.0)
+    G_filled = np.where(G_bad, np.where(sunlit, np.nan_to_num(k) * reference, 0.0), G)
+
+    # Night hours are filled with 0 above, so only sunlit hours count towards a gap
+    G_gap = G_bad & sunlit
+    T_long = T_bad & (run_lengths(T_bad) > max_gap_hours)
+    G_long = G_gap & (run_lengths(G_gap) > max_gap_hours)
+    T_filled = np.where(T_long | np.isnan(T_filled), np.nan, T_filled)
+    G_filled = np.where(G_long, np.nan, G_filled)
+
+    flags = np.where(T_bad | G_bad, QUALITY_FILLED, QUALITY_OK).astype(np.int8)
+    flags[np.isnan(T_filled) | np.isnan(G_filled)] = QUALITY_MISSING
+    return T_filled, G_filled, flags
+
+
+def clean_weather_frame(df, lat, max_gap_hours=MAX_FILL_HOURS, start_date=None, end_date=None):
+    """Gap-fill a fetch_weather_range frame, adding a Quality column of per-hour flags.
+
+    With start_date and end_date the frame covers every hour of those days,
+    including any the response left out at either end.
+    """
+    import pandas as pd
+
+    start = None if start_date is None else np.datetime64(start_date, "D")
+    end = None if end_date is None else np.datetime64(end_date, "D") + np.timedelta64(1, "D") - np.timedelta64(1, "h")
+    times, absent, T_amb, G = reindex_hourly(
+        df["Timestamp"].to_numpy().astype("datetime64[h]"),
+        df["Temperature"].to_numpy(dtype=float),
+        df["Irradiance"].to_numpy(dtype=float),
+        start=start, end=end,
+    )
+    T_amb, G, flags = fill_gaps(times, T_amb, G, lat, max_gap_hours)
+
+    timestamps = pd.to_datetime(times)
+    return pd.DataFrame({
+        "Timestamp": timestamps,
+        "Hour": timestamps.hour,
+        "Temperature": T_amb,
+        "Irradiance": G,
+        "Quality": flags,
+    })
+
+
+# -----------------------------
+# REPORTING
+# -----------------------------
+
+def quality_report(times, T_amb, G, sites=None, absent=None, max_gap_hours=MAX_FILL_HOURS):
+    """Per-site data quality summary for (sites, hours) arrays, as a DataFrame.
+
+    absent marks hours missing from the source entirely (see reindex_hourly).
+    """
+    import pandas as pd
+
+    T_amb, G = np.atleast_2d(T_amb), np.atleast_2d(G)
+    with np.errstate(invalid="ignore"):
+        fill_values = (T_amb == FILL_VALUE) | (G == FILL_VALUE)
+    bad = missing_mask(T_amb, PLAUSIBLE_TEMPERATURE) | missing_mask(G, PLAUSIBLE_IRRADIANCE)
+    gaps = run_lengths(bad)
+    long_gap = bad & (gaps > max_gap_hours)
+
+    n_hours = T_amb.shape[-1]
+    sites = list(sites) if sites is not None else list(range(T_amb.shape[0]))
+    return pd.DataFrame({
+        "site": sites,
+        "first_hour": np.datetime_as_string(np.asarray(times, dtype="datetime64[h]")[0]),
+        "hours": n_hours,
+        "absent_hours": 0 if absent is None else int(np.sum(absent)),
+        "fill_values": fill_values.sum(axis=-1),
+        "bad_hours": bad.sum(axis=-1),
+        "longest_gap_h": gaps.max(axis=-1),
+        "fillable_hours": (bad & ~long_gap).sum(axis=-1),
+        "unfilled_hours": long_gap.sum(axis=-1),
+        "coverage_pct": np.round(100 * (1 - long_gap.sum(axis=-1) / n_hours), 2),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report NASA POWER fill values and gaps in hourly CSVs.")
+    parser.add_argument("files", nargs="+", help="Region CSVs (Hour, Irradiance_Wm2, AmbientTemp_C)")
+    parser.add_argument("--max-gap-hours", type=int, default=MAX_FILL_HOURS)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from resample import read_hourly
+
+    reports = []
+    for path in args.files:
+        times, T_amb, G = read_hourly(path)
+        times, absent, T_amb, G = reindex_hourly(times, T_amb, G)
+        site = os.path.basename(path).replace("_data.csv", "")
+        reports.append(quality_report(times, T_amb, G, [site], absent, args.max_gap_hours))
+
+    print("=" * 70)
+    print("🔎 WEATHER DATA QUALITY")
+    print("=" * 70)
+    print(pd.concat(reports, ignore_index=True).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
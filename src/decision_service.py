@@ -0,0 +1,309 @@
+"""
+Cooling Decision HTTP Service
+Machine-to-machine JSON API around physics_based_check + predict_from_model.
+
+Concurrent requests are coalesced into micro-batches (up to --max-batch-size
+rows, waiting at most --max-wait-ms for the batch to fill) so the physics and
+the model always run on arrays. Built on asyncio streams from the standard
+library; no web framework is needed.
+
+Endpoints:
+    POST /decide    {"T_amb": 38.5, "G": 910, "hour": 14}
+                    or {"inputs": [{...}, {...}]}
+    GET  /health    liveness plus whether the model is loaded
+    GET  /metrics   Prometheus text: per-endpoint latency, batch sizes, stage timings
+    GET  /metrics.json  the same histograms as JSON
+
+Usage:
+    python src/decision_service.py --port 8080 --max-batch-size 64 --max-wait-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+
+from metrics import REGISTRY
+from solar_cooling import get_model, physics_based_check_batch, predict_from_model_batch
+
+MAX_BODY_BYTES = 1 << 20
+ROUTES = ("/decide", "/health", "/metrics", "/metrics.json")
+REQUIRED_FIELDS = ("T_amb", "G", "hour")
+
+
+class BadRequest(Exception):
+    """Raised for malformed input; reported to the client as HTTP 400."""
+
+
+# -----------------------------
+# DECISION LOGIC
+# -----------------------------
+
+def decide_batch(rows, model=None):
+    """Score a list of {"T_amb", "G", "hour"} dicts in one vectorized pass."""
+    import numpy as np
+
+    T_amb = np.array([row["T_amb"] for row in rows], dtype=float)
+    G = np.array([row["G"] for row in rows], dtype=float)
+    hour = np.array([row["hour"] for row in rows], dtype=float)
+
+    panel_temp, energy_gain, cooling_cost, should_cool, P_unc, P_cool = physics_based_check_batch(T_amb, G)
+    prediction = None
+    if model is not None:
+        prediction, _ = predict_from_model_batch(T_amb, G, hour, model=model)
+
+    results = []
+    for i in range(len(rows)):
+        ml = None if prediction is None else int(prediction[i])
+        results.append({
+            "should_cool": bool(should_cool[i]),
+            "panel_temp": float(panel_temp[i]),
+            "energy_gain": float(energy_gain[i]),
+            "cooling_cost": float(cooling_cost[i]),
+            "P_unc": float(P_unc[i]),
+            "P_cool": float(P_cool[i]),
+            "ml_prediction": ml,
+            "agreement": None if ml is None else ml == int(should_cool[i]),
+        })
+    return results
+
+
+def parse_inputs(body):
+    """Validate a /decide body and return (rows, is_batch)."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise BadRequest("Body must be JSON.")
+
+    is_batch = isinstance(payload, dict) and "inputs" in payload
+    rows = payload["inputs"] if is_batch else [payload]
+    if not isinstance(rows, list) or not rows:
+        raise BadRequest("'inputs' must be a non-empty list.")
+
+    for row in rows:
+        if not isinstance(row, dict):
+            raise BadRequest("Each input must be an object.")
+        missing = [f for f in REQUIRED_FIELDS if f not in row]
+        if missing:
+            raise BadRequest(f"Missing field(s): {', '.join(missing)}")
+        for field in REQUIRED_FIELDS:
+            value = row[field]
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value):
+                raise BadRequest(f"'{field}' must be a finite number.")
+        if not 0 <= row["hour"] < 24:
+            raise BadRequest("'hour' must be in [0, 24).")
+    return rows, is_batch
+
+
+# -----------------------------
+# MICRO-BATCHING
+# -----------------------------
+
+class MicroBatcher:
+    """Coalesces rows from concurrent requests into one decide_batch call."""
+
+    def __init__(self, model=None, max_batch_size=64, max_wait_ms=2.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = REGISTRY.histogram(
+            "solar_service_batch_size", "Rows per model call",
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+        )
+        self._queue = None
+        self._worker = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._worker.cancel()
+
+    async def submit(self, rows):
+        """Queue rows and wait for their results."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                size += len(item[0])
+
+            rows = [row for item_rows, _ in batch for row in item_rows]
+            self.batch_sizes.observe(len(rows))
+            try:
+                # In a worker thread, so a large batch doesn't stall every connection
+                results = await loop.run_in_executor(None, decide_batch, rows, self.model)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            start = 0
+            for item_rows, future in batch:
+                if not future.done():
+                    future.set_result(results[start:start + len(item_rows)])
+                start += len(item_rows)
+
+
+# -----------------------------
+# HTTP SERVER
+# -----------------------------
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class DecisionService:
+    """Minimal HTTP/1.1 keep-alive server exposing the cooling decision."""
+
+    def __init__(self, model=None, max_batch_size=64, max_wait_ms=2.0):
+        self.batcher = MicroBatcher(model, max_batch_size, max_wait_ms)
+        self.latency = {
+            route: REGISTRY.histogram("solar_http_request_duration_seconds", "HTTP request latency", route=route)
+            for route in ROUTES + ("other",)
+        }
+        self.started = time.time()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                start = time.perf_counter()
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = (request_line.split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                # The body can't be skipped reliably after a bad length, so those close the connection
+                if length < 0:
+                    status, payload = 400, {"error": "Content-Length must be a non-negative integer."}
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, payload = 413, {"error": "Body too large."}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.route(method, path.split("?")[0], body)
+
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), "text/plain; version=0.0.4"
+                else:
+                    try:
+                        data = json.dumps(payload, allow_nan=False).encode()
+                    except ValueError:
+                        status = 500
+                        data = json.dumps({"error": "Result is not finite."}).encode()
+                    content_type = "application/json"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                route = path.split("?")[0]
+                self.latency[route if route in ROUTES else "other"].observe(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/decide":
+            if method != "POST":
+                return 405, {"error": "Use POST."}
+            try:
+                rows, is_batch = parse_inputs(body)
+            except BadRequest as e:
+                return 400, {"error": str(e)}
+            try:
+                results = await self.batcher.submit(rows)
+            except Exception as e:
+                return 500, {"error": str(e)}
+            return 200, ({"results": results} if is_batch else results[0])
+
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "model_loaded": self.batcher.model is not None,
+                "uptime_s": round(time.time() - self.started, 1),
+            }
+
+        if path == "/metrics":
+            return 200, REGISTRY.render_prometheus()
+
+        if path == "/metrics.json":
+            return 200, {
+                "latency_seconds": {p: h.snapshot() for p, h in self.latency.items() if h.snapshot()["count"]},
+                "batch_size": self.batcher.batch_sizes.snapshot(),
+            }
+
+        return 404, {"error": f"No route for {path}"}
+
+    async def serve(self, host, port):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        print(f"🌞 Decision service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve cooling decisions over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--model", help="Model path (default: compact artifact, else legacy pickle)")
+    args = parser.parse_args()
+
+    try:
+        model = get_model(args.model)
+    except FileNotFoundError:
+        print("⚠️ Model file not found. Serving physics-only decisions.")
+        model = None
+
+    service = DecisionService(model, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
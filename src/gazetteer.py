@@ -0,0 +1,214 @@
+"""
+Offline Gazetteer
+Resolves and autocompletes place names from a bundled table, so typing a
+city doesn't cost a Nominatim round trip (get_coordinates only falls back
+to Nominatim for places the table doesn't know).
+
+The table is a pair of files sharing one base path, like the compact model:
+    <base>.json   header (format, source, key width, row count)
+    <base>.npy    structured array sorted by normalized name, then by
+                  population (largest first)
+
+Lookups are binary searches on the memory-mapped key column: a prefix maps
+to one contiguous slice, and an exact name to a (usually tiny) one.
+Build the table with dev/data_generation/build_gazetteer.py. The bundled
+table is a placeholder built from the IANA time zone cities (no population,
+so most towns miss and go to Nominatim); its header has "placeholder": true.
+
+Usage:
+    python src/gazetteer.py "phoe"
+    python src/gazetteer.py "Tucson, AZ" --resolve
+    python src/gazetteer.py --bench
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+
+import numpy as np
+
+FORMAT_NAME = "solar-cooling-gazetteer"
+FORMAT_VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "gazetteer")
+
+KEY_WIDTH = 40
+LABEL_WIDTH = 72
+DTYPE = np.dtype([
+    ("key", f"S{KEY_WIDTH}"),           # normalized name, UTF-8
+    ("label", f"S{LABEL_WIDTH}"),       # display name, UTF-8
+    ("country", "S2"),
+    ("admin1", "S20"),
+    ("lat", "f4"),
+    ("lon", "f4"),
+    ("population", "i4"),
+])
+
+# Qualifiers people type for countries that don't match the ISO code or name
+COUNTRY_ALIASES = {"usa": "us", "united states of america": "us", "america": "us", "uk": "gb",
+                   "england": "gb", "scotland": "gb", "wales": "gb"}
+
+
+def normalize_name(text):
+    """Lowercase ASCII form used for keys: accents stripped, punctuation to spaces."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return re.sub(r"[^0-9a-z]+", " ", text).strip()
+
+
+def _encode(text, width):
+    return text.encode("utf-8")[:width]
+
+
+class Gazetteer:
+    """Sorted-array place index with prefix completion and qualified resolution."""
+
+    def __init__(self, header, table):
+        self.header = header
+        self.table = table
+        self.keys = table["key"]
+
+    @property
+    def placeholder(self):
+        """True for the small offline-built table that stands in until a GeoNames build is installed."""
+        return bool(self.header.get("placeholder", False))
+
+    def _range(self, key, prefix):
+        key = _encode(key, KEY_WIDTH)
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        hi = int(np.searchsorted(self.keys, key + b"\xff" if prefix else key, side="right"))
+        return lo, hi
+
+    def complete(self, text, limit=8):
+        """Up to limit labels starting with text, most populous first."""
+        key = normalize_name(text.split(",")[0])
+        if not key:
+            return []
+        lo, hi = self._range(key, prefix=True)
+        if hi - lo > 4 * limit:
+            population = self.table["population"][lo:hi]
+            rows = lo + np.argpartition(-population, 4 * limit)[:4 * limit]
+        else:
+            rows = np.arange(lo, hi)
+        rows = rows[np.lexsort((self.keys[rows], -self.table["population"][rows]))]
+
+        labels = []
+        for label in self.table["label"][rows]:
+            label = label.decode("utf-8")
+            if label not in labels:
+                labels.append(label)
+            if len(labels) == limit:
+                break
+        return labels
+
+    def resolve(self, place):
+        """(lat, lon, label) for "name[, region][, country]", or None if no entry matches."""
+        name, *qualifiers = [normalize_name(part) for part in str(place).split(",")]
+        qualifiers = [COUNTRY_ALIASES.get(q, q) for q in qualifiers if q]
+        if not name:
+            return None
+        lo, hi = self._range(name, prefix=False)
+        for row in self.table[lo:hi]:       # most populous first
+            if all(self._matches(row, q) for q in qualifiers):
+                return float(row["lat"]), float(row["lon"]), row["label"].decode("utf-8")
+        return None
+
+    @staticmethod
+    def _matches(row, qualifier):
+        if qualifier in (row["country"].decode().lower(), row["admin1"].decode().lower()):
+            return True
+        parts = [normalize_name(p) for p in row["label"].decode("utf-8").split(",")[1:]]
+        return qualifier in parts
+
+    def __len__(self):
+        return len(self.table)
+
+
+def load_gazetteer(base_path=DEFAULT_PATH, mmap_mode="r"):
+    """Open a gazetteer table; raises FileNotFoundError if it hasn't been built."""
+    with open(f"{base_path}.json") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"{base_path}.json is not a {FORMAT_NAME} header.")
+    return Gazetteer(header, np.load(f"{base_path}.npy", mmap_mode=mmap_mode))
+
+
+def save_gazetteer(base_path, rows, source, min_population=0, placeholder=False):
+    """Sort rows (dicts with DTYPE fields, key optional) and write <base>.npy + <base>.json."""
+    table = np.zeros(len(rows), dtype=DTYPE)
+    for i, row in enumerate(rows):
+        table[i] = (
+            _encode(row.get("key") or normalize_name(row["name"]), KEY_WIDTH),
+            _encode(row["label"], LABEL_WIDTH),
+            row.get("country", "").encode("ascii", "ignore")[:2],
+            row.get("admin1", "").encode("ascii", "ignore")[:20],
+            row["lat"], row["lon"], row.get("population", 0),
+        )
+    table = table[np.lexsort((table["label"], -table["population"], table["key"]))]
+
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "source": source,
+        "min_population": min_population,
+        "rows": len(table),
+        "placeholder": placeholder,
+    }
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    np.save(f"{base_path}.npy", table)
+    with open(f"{base_path}.json", "w") as f:
+        json.dump(header, f, indent=1)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Autocomplete or resolve a place from the offline gazetteer.")
+    parser.add_argument("text", nargs="?", help="Place or prefix")
+    parser.add_argument("--resolve", action="store_true", help="Resolve to coordinates instead of completing")
+    parser.add_argument("--bench", action="store_true", help="Measure memory and lookup latency")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    gazetteer = load_gazetteer(args.path)
+    opened = time.perf_counter() - start
+    print(f"📚 {len(gazetteer):,} rows from {gazetteer.header['source']} · "
+          f"{gazetteer.table.nbytes / 1024:.0f} KB mapped · opened in {opened * 1e3:.2f} ms")
+    if gazetteer.placeholder:
+        print("⚠️ Placeholder table: rebuild from GeoNames for full coverage (see build_gazetteer.py)")
+
+    if args.bench:
+        labels = [label.decode("utf-8") for label in gazetteer.table["label"]]
+        names = [label.split(",")[0] for label in labels]
+        rng = np.random.default_rng(0)
+        picks = rng.integers(0, len(names), 2000)
+        prefixes = [names[i][:int(rng.integers(1, len(names[i]) + 1))] for i in picks]
+        for what, calls in (("complete", [(gazetteer.complete, p) for p in prefixes]),
+                            ("resolve", [(gazetteer.resolve, labels[i]) for i in picks])):
+            times = []
+            for fn, arg in calls:
+                t = time.perf_counter()
+                fn(arg)
+                times.append(time.perf_counter() - t)
+            times.sort()
+            print(f"⚡ {what:<8} p50 {times[len(times) // 2] * 1e6:6.0f} µs · "
+                  f"p99 {times[int(len(times) * 0.99)] * 1e6:6.0f} µs")
+        return
+
+    if not args.text:
+        parser.error("Pass a place or prefix, or --bench.")
+    start = time.perf_counter()
+    result = gazetteer.resolve(args.text) if args.resolve else gazetteer.complete(args.text)
+    seconds = time.perf_counter() - start
+    if args.resolve:
+        print(f"📍 {result[2]}: {result[0]:.4f}, {result[1]:.4f}" if result else "❌ Not in the gazetteer")
+    else:
+        for label in result:
+            print(f"   {label}")
+    print(f"⚡ {seconds * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Streaming Batch Scorer
+Scores a CSV or Parquet file of (T_amb, G, hour[, site]) rows in fixed-size
+chunks with the vectorized physics check and batch ML prediction, writing
+decisions incrementally so memory stays flat regardless of input size.
+
+Usage:
+    python src/inference/batch_score.py input.csv decisions.csv
+    python src/inference/batch_score.py input.parquet decisions.parquet --chunk-size 200000 --workers 4
+
+Parquet input/output needs pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+from solar_cooling import (COMPACT_MODEL_PATH, MODEL_PATH, get_model, physics_based_check_batch,
+                           predict_from_model_batch)
+
+# Accepted input column names, including the ones used in the training data
+COLUMN_ALIASES = {
+    "T_amb": ("T_amb", "AmbientTemp_C", "Temperature", "T2M"),
+    "G": ("G", "Irradiance_Wm2", "Irradiance", "ALLSKY_SFC_SW_DWN"),
+    "hour": ("hour", "Hour"),
+}
+
+# Columns added to each row; prefixed so they never replace the input's own columns
+OUTPUT_COLUMNS = ("physics_panel_temp", "physics_energy_gain", "physics_cooling_cost",
+                  "physics_net_gain", "physics_should_cool", "ml_prediction")
+
+
+# -----------------------------
+# READING & WRITING
+# -----------------------------
+
+def _is_parquet(path):
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("❌ Parquet files need pyarrow: pip install pyarrow")
+    return pq
+
+
+def iter_chunks(path, chunk_size):
+    """Yield DataFrames of at most chunk_size rows from a CSV or Parquet file."""
+    import pandas as pd
+
+    if _is_parquet(path):
+        parquet_file = _require_pyarrow().ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file as they arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._csv_header_written = False
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = _require_pyarrow().ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="a" if self._csv_header_written else "w",
+                      header=not self._csv_header_written, index=False)
+            self._csv_header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+# -----------------------------
+# SCORING
+# -----------------------------
+
+def resolve_columns(columns):
+    """Map the canonical T_amb/G/hour names onto the file's column names."""
+    resolved = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        match = next((c for c in aliases if c in columns), None)
+        if match is None:
+            raise ValueError(f"Input has no {canonical} column (expected one of {', '.join(aliases)})")
+        resolved[canonical] = match
+    return resolved
+
+
+def resolve_model_path(model_path=None):
+    """model_path, or the default model under the repository root whatever the working directory."""
+    if model_path:
+        return model_path
+    compact = os.path.join(REPO_ROOT, COMPACT_MODEL_PATH)
+    if os.path.exists(f"{compact}.npy"):
+        return compact
+    return os.path.join(REPO_ROOT, MODEL_PATH)
+
+
+def score_chunk(df, model_path=None, physics_only=False):
+    """Add the OUTPUT_COLUMNS physics and ML decision columns to one chunk.
+
+    Raises ValueError if the input already has one of them, rather than
+    overwriting it. Without a model at model_path (and unless physics_only)
+    a warning is issued and ml_prediction is left out.
+    """
+    existing = [c for c in OUTPUT_COLUMNS if c in df.columns]
+    if existing:
+        raise ValueError(f"Input already has output column(s) {', '.join(existing)}; refusing to overwrite them")
+    columns = resolve_columns(df.columns)
+    T_amb = df[columns["T_amb"]].to_numpy(dtype=float)
+    G = df[columns["G"]].to_numpy(dtype=float)
+    hour = df[columns["hour"]].to_numpy(dtype=float) % 100   # accepts YYYYMMDDHH stamps too
+
+    panel_temp, energy_gain, cooling_cost, should_cool, _, _ = physics_based_check_batch(T_amb, G)
+    prediction = None
+    if not physics_only:
+        path = resolve_model_path(model_path)
+        try:
+            prediction, _ = predict_from_model_batch(T_amb, G, hour, model=get_model(path))
+        except FileNotFoundError:
+            warnings.warn(f"No model at {path}; scoring with the physics check only")
+
+    out = df.copy()
+    out["physics_panel_temp"] = panel_temp
+    out["physics_energy_gain"] = energy_gain
+    out["physics_cooling_cost"] = cooling_cost
+    out["physics_net_gain"] = energy_gain - cooling_cost
+    out["physics_should_cool"] = should_cool
+    if prediction is not None:
+        out["ml_prediction"] = prediction
+    return out
+
+
+def score_file(input_path, output_path, chunk_size=100_000, workers=1, model_path=None):
+    """Stream input_path through score_chunk into output_path; return (rows, seconds)."""
+    model_path = resolve_model_path(model_path)
+    try:
+        get_model(model_path)
+        physics_only = False
+    except FileNotFoundError:
+        print(f"⚠️ No model at {model_path}; writing physics decisions only (no ml_prediction column)",
+              file=sys.stderr)
+        physics_only = True
+
+    writer = ChunkWriter(output_path)
+    rows, start = 0, time.perf_counter()
+
+    def emit(scored):
+        nonlocal rows
+        writer.write(scored)
+        rows += len(scored)
+        elapsed = time.perf_counter() - start
+        print(f"   {rows:,} rows scored ({rows / elapsed:,.0f} rows/s)", end="\r", flush=True)
+
+    try:
+        if workers <= 1:
+            for chunk in iter_chunks(input_path, chunk_size):
+                emit(score_chunk(chunk, model_path, physics_only))
+        else:
+            # Keep at most 2 chunks per worker in flight and write them in input order
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight = deque()
+                for chunk in iter_chunks(input_path, chunk_size):
+                    in_flight.append(pool.submit(score_chunk, chunk, model_path, physics_only))
+                    if len(in_flight) >= 2 * workers:
+                        emit(in_flight.popleft().result())
+                while in_flight:
+                    emit(in_flight.popleft().result())
+    finally:
+        writer.close()
+
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of weather rows in chunks.")
+    parser.add_argument("input", help="CSV or Parquet file with T_amb, G and hour columns")
+    parser.add_argument("output", help="Destination .csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size (1 = in-process)")
+    parser.add_argument("--model", help="Model path (default: the repo's compact artifact, else its legacy pickle)")
+    args = parser.parse_args()
+
+    print(f"🌞 Scoring {args.input} → {args.output}")
+    rows, seconds = score_file(args.input, args.output, args.chunk_size, args.workers, args.model)
+    print(f"\n✅ {rows:,} rows in {seconds:.2f} s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Lightweight Metrics
+Thread-safe counters and fixed-bucket histograms, a registry that renders them
+in Prometheus text format, and a `timed` decorator / context manager for
+per-stage timing.
+
+Timing is on by default; set SOLAR_METRICS=0 (or call disable()) to turn it
+off, which reduces each instrumented call to a single flag check.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Upper bounds in seconds, from 100 µs to 10 s
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class _State:
+    enabled = os.environ.get("SOLAR_METRICS", "1") != "0"
+
+
+def enable():
+    _State.enabled = True
+
+
+def disable():
+    _State.enabled = False
+
+
+def is_enabled():
+    return _State.enabled
+
+
+class Counter:
+    """Monotonic, thread-safe counter."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+
+class Histogram:
+    """Cumulative-bucket histogram; buckets default to latencies in seconds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        with self._lock:
+            counts, total = list(self._counts), self._count
+        if total == 0:
+            return None
+        rank, running = q * total, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            if running >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        """Return count, sum, p50/p99 and cumulative bucket counts as a plain dict."""
+        with self._lock:
+            counts, total, value_sum = list(self._counts), self._count, self._sum
+
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else repr(bound)] = running
+
+        return {
+            "count": total,
+            "sum": value_sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+
+# -----------------------------
+# REGISTRY & PROMETHEUS EXPORT
+# -----------------------------
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Registry:
+    """Named metric families, each holding one child metric per label set."""
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, factory, name, help_text, labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.setdefault(name, {"type": kind, "help": help_text, "children": {}})
+            if family["type"] != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family['type']}")
+            if key not in family["children"]:
+                family["children"][key] = factory()
+            return family["children"][key]
+
+    def counter(self, name, help_text="", **labels):
+        return self._get("counter", Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get("histogram", lambda: Histogram(buckets), name, help_text, labels)
+
+    def families(self):
+        """Return {name: (type, {label tuple: metric})} for display code."""
+        with self._lock:
+            return {name: (f["type"], dict(f["children"])) for name, f in self._families.items()}
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for name, (kind, children) in sorted(self.families().items()):
+            help_text = self._families[name]["help"]
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in sorted(children.items()):
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+                    continue
+                snap = metric.snapshot()
+                for bound, count in snap["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {snap['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {snap['count']}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = "solar_stage_duration_seconds"
+STAGE_CALLS = "solar_stage_calls_total"
+
+
+# -----------------------------
+# STAGE TIMING
+# -----------------------------
+
+class timed:
+    """Time a stage into the registry, as a decorator or a context manager.
+
+        @timed("physics")
+        def physics_based_check(...): ...
+
+        with timed("weather_parse"):
+            df = pd.DataFrame(...)
+
+    Records solar_stage_duration_seconds{stage=...} and
+    solar_stage_calls_total{stage=..., outcome="ok"|"error"}.
+    """
+
+    def __init__(self, stage, registry=REGISTRY):
+        self.stage = stage
+        self.registry = registry
+        self._starts = threading.local()
+        self._metrics = None
+
+    def _record(self, seconds, ok):
+        if self._metrics is None:
+            self._metrics = (
+                self.registry.histogram(STAGE_SECONDS, "Time spent per request-path stage", stage=self.stage),
+                self.registry.counter(STAGE_CALLS, "Calls per request-path stage", stage=self.stage, outcome="ok"),
+                self.registry.counter(STAGE_CALLS, "Calls per request-path stage", stage=self.stage, outcome="error"),
+            )
+        histogram, ok_calls, error_calls = self._metrics
+        histogram.observe(seconds)
+        (ok_calls if ok else error_calls).inc()
+
+    def __enter__(self):
+        if _State.enabled:
+            stack = getattr(self._starts, "stack", None)
+            if stack is None:
+                stack = self._starts.stack = []
+            stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = getattr(self._starts, "stack", None)
+        if stack:
+            self._record(time.perf_counter() - stack.pop(), exc_type is None)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                self._record(time.perf_counter() - start, ok)
+        return wrapper
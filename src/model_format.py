@@ -0,0 +1,261 @@
+"""
+Compact Model Artifact Format
+Array-based export of tree ensembles that loads with np.load(mmap_mode='r')
+and predicts without importing scikit-learn.
+
+An artifact is a pair of files sharing one base path:
+    <base>.json   version header (format, feature names, classes, tree offsets)
+    <base>.npy    structured node table, one record per node for all trees
+
+Node records are 9 bytes: int8 feature, float32 threshold, and narrow
+tree-local child indexes. Leaves have feature == -1 and pack P(class 1) into
+the threshold slot, so no space is spent on per-node value arrays.
+
+Usage:
+    python src/model_format.py models/cooling_decision_model.pkl
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+FORMAT_NAME = "solar-cooling-forest"
+FORMAT_VERSION = 1
+LEGACY_SUFFIXES = (".pkl", ".joblib")
+
+
+# -----------------------------
+# EXPORT
+# -----------------------------
+
+def _float32_at_or_below(values):
+    """Largest float32 <= each float64 value, so `x <= t` is unchanged for float32 x."""
+    values = np.asarray(values, dtype=np.float64)
+    narrowed = values.astype(np.float32)
+    too_high = narrowed.astype(np.float64) > values
+    narrowed[too_high] = np.nextafter(narrowed[too_high], np.float32(-np.inf))
+    return narrowed
+
+
+def _node_dtype(max_nodes):
+    child_type = "<i2" if max_nodes < np.iinfo(np.int16).max else "<i4"
+    return np.dtype([
+        ("feature", "i1"),
+        ("threshold", "<f4"),
+        ("left", child_type),
+        ("right", child_type),
+    ])
+
+
+def export_compact_model(model, base_path):
+    """Write a fitted binary RandomForest/DecisionTree classifier as <base>.json + <base>.npy."""
+    trees = getattr(model, "estimators_", None) or [model]
+    if not all(hasattr(tree, "tree_") for tree in trees):
+        raise TypeError(f"Unsupported model type: {type(model).__name__}")
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary classifiers can be exported.")
+    if model.n_features_in_ > np.iinfo(np.int8).max:
+        raise ValueError("Too many features for the int8 feature index.")
+
+    structures = [tree.tree_ for tree in trees]
+    nodes = np.zeros(sum(t.node_count for t in structures),
+                     dtype=_node_dtype(max(t.node_count for t in structures)))
+
+    offsets, start = [], 0
+    for t in structures:
+        end = start + t.node_count
+        leaf = t.children_left == -1
+        counts = t.value[:, 0, :]
+        leaf_value = counts[:, 1] / counts.sum(axis=1)
+
+        block = nodes[start:end]
+        block["feature"] = np.where(leaf, -1, t.feature)
+        block["threshold"] = np.where(leaf, leaf_value.astype(np.float32),
+                                      _float32_at_or_below(t.threshold))
+        block["left"] = t.children_left
+        block["right"] = t.children_right
+
+        offsets.append(start)
+        start = end
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is None:
+        feature_names = [f"x{i}" for i in range(model.n_features_in_)]
+
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "model_type": type(model).__name__,
+        "feature_names": [str(f) for f in feature_names],
+        "classes": np.asarray(model.classes_).tolist(),
+        "n_trees": len(structures),
+        "max_depth": int(max(t.max_depth for t in structures)),
+        "tree_offsets": offsets,
+    }
+
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    np.save(f"{base_path}.npy", nodes)
+    with open(f"{base_path}.json", "w") as f:
+        json.dump(header, f, indent=1)
+    return header
+
+
+# -----------------------------
+# LOAD & PREDICT
+# -----------------------------
+
+class CompactForest:
+    """Read-only tree ensemble backed by a memory-mapped node table."""
+
+    def __init__(self, header, nodes):
+        self.header = header
+        self.nodes = nodes
+        self.feature_names_in_ = np.array(header["feature_names"], dtype=object)
+        self.classes_ = np.array(header["classes"])
+        self.n_features_in_ = len(header["feature_names"])
+
+        # Absolute child table where leaves point back at themselves, so every
+        # tree can be stepped max_depth times without masking finished rows
+        index = np.arange(len(nodes))
+        tree_start = np.repeat(header["tree_offsets"], np.diff(header["tree_offsets"] + [len(nodes)]))
+        leaf = nodes["feature"] < 0
+        left = np.where(leaf, index, nodes["left"] + tree_start)
+        right = np.where(leaf, index, nodes["right"] + tree_start)
+        self._children = np.column_stack([left, right]).ravel().astype(np.int32)
+        self._feature = np.where(leaf, 0, nodes["feature"]).astype(np.int32)
+        self._threshold = np.asarray(nodes["threshold"])
+        self._roots = np.asarray(header["tree_offsets"], dtype=np.int32)[:, None]
+
+    def _as_array(self, X):
+        if hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)].to_numpy()
+        X = np.asarray(X, dtype=np.float32)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def predict_proba(self, X, block_size=4096):
+        X = self._as_array(X)
+        p1 = np.empty(len(X))
+        # Rows are traversed in blocks so the (n_trees, block) working arrays stay in cache
+        for start in range(0, len(X), block_size):
+            block = X[start:start + block_size]
+            n = len(block)
+            columns = np.ascontiguousarray(block.T).ravel()
+            rows = np.arange(n, dtype=np.int32)
+            node = np.repeat(self._roots, n, axis=1)
+
+            for _ in range(self.header["max_depth"]):
+                x = columns[self._feature[node] * n + rows]
+                node = self._children[2 * node + (x > self._threshold[node])]
+
+            p1[start:start + n] = self._threshold[node].mean(axis=0, dtype=np.float64)
+        return np.column_stack([1 - p1, p1])
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        return self.classes_[(proba[:, 1] > proba[:, 0]).astype(int)]
+
+
+def _base_path(path):
+    for suffix in (".npy", ".json"):
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def load_compact_model(path, mmap_mode="r"):
+    """Load a compact artifact by its base path (or either of its two files)."""
+    base = _base_path(path)
+    with open(f"{base}.json") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"{base}.json is not a {FORMAT_NAME} header.")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format version: {header.get('version')}")
+    return CompactForest(header, np.load(f"{base}.npy", mmap_mode=mmap_mode))
+
+
+def load_legacy_model(path):
+    """Load a joblib-pickled scikit-learn model."""
+    import joblib
+    return joblib.load(path)
+
+
+def load_model(path):
+    """Load either format, dispatching on the file extension."""
+    if path.endswith(LEGACY_SUFFIXES):
+        return load_legacy_model(path)
+    return load_compact_model(path)
+
+
+# -----------------------------
+# SIZE & LOAD-TIME REPORT
+# -----------------------------
+
+_COLD_LOAD_SNIPPET = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+from model_format import load_model
+load_model({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_load_seconds(path, repeats=3):
+    """Median load time in a fresh interpreter, including imports the loader needs."""
+    src = os.path.dirname(os.path.abspath(__file__))
+    snippet = _COLD_LOAD_SNIPPET.format(src=src, path=path)
+    timings = [
+        float(subprocess.run([sys.executable, "-c", snippet], check=True,
+                             capture_output=True, text=True).stdout)
+        for _ in range(repeats)
+    ]
+    return float(np.median(timings))
+
+
+def _random_features(model, n=20000, seed=0):
+    """Plausible (T_amb, G, hour, panel_temp) rows in the model's feature order."""
+    rng = np.random.default_rng(seed)
+    T_amb = rng.uniform(-10, 50, n)
+    G = rng.uniform(0, 1200, n)
+    columns = {
+        "AmbientTemp_C": T_amb,
+        "Irradiance_Wm2": G,
+        "hour": rng.integers(0, 24, n).astype(float),
+        "panel_temp": T_amb + (25 / 800) * G + rng.normal(0, 2, n),
+    }
+    return np.column_stack([columns[f] for f in model.feature_names_in_])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a pickled model to the compact format.")
+    parser.add_argument("model", help="Legacy joblib pickle, e.g. models/cooling_decision_model.pkl")
+    parser.add_argument("--output", help="Base path for the compact artifact (default: pickle path without .pkl)")
+    args = parser.parse_args()
+
+    base = args.output or os.path.splitext(args.model)[0]
+    legacy = load_legacy_model(args.model)
+    export_compact_model(legacy, base)
+    compact = load_compact_model(base)
+
+    import pandas as pd
+    X = pd.DataFrame(_random_features(legacy), columns=legacy.feature_names_in_)
+    agreement = np.mean(legacy.predict(X) == compact.predict(X))
+
+    legacy_size = os.path.getsize(args.model)
+    compact_size = os.path.getsize(f"{base}.npy") + os.path.getsize(f"{base}.json")
+
+    print("📦 Model artifact comparison")
+    print(f"   Legacy pickle : {legacy_size / 1024:10.1f} KB   cold load {cold_load_seconds(args.model) * 1e3:8.1f} ms")
+    print(f"   Compact arrays: {compact_size / 1024:10.1f} KB   cold load {cold_load_seconds(base) * 1e3:8.1f} ms")
+    print(f"   Prediction agreement on {len(X):,} random inputs: {agreement:.2%}")
+    print(f"✅ Compact model written to {base}.npy / {base}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+NASA POWER Grid Cells
+NASA POWER serves its meteorology (T2M) from the MERRA-2 grid: cells of
+0.5° latitude × 0.625° longitude centred on -90, -89.5, ... and -180,
+-179.375, ... Every point inside a cell gets the same series, so cells are
+the natural unit for caching and mapping. (Irradiance comes from a coarser
+1° grid, so cells sharing a 1° box share irradiance as well.)
+
+A cell is identified by its integer (row, col) index from the south pole and
+the antimeridian.
+"""
+
+import math
+
+CELL_LAT = 0.5
+CELL_LON = 0.625
+N_ROWS = int(180 / CELL_LAT) + 1        # centres at both poles
+N_COLS = int(360 / CELL_LON)
+EARTH_RADIUS_KM = 6371.0
+
+
+def cell_index(lat, lon):
+    """(row, col) of the grid cell containing a point."""
+    row = int(round((lat + 90) / CELL_LAT))
+    col = int(round((lon + 180) / CELL_LON)) % N_COLS
+    return min(max(row, 0), N_ROWS - 1), col
+
+
+def cell_center(row, col):
+    """(lat, lon) of a cell centre."""
+    return -90 + row * CELL_LAT, -180 + (col % N_COLS) * CELL_LON
+
+
+def snap(lat, lon):
+    """Centre of the grid cell containing a point."""
+    return cell_center(*cell_index(lat, lon))
+
+
+def cells_in_bbox(south, west, north, east):
+    """Row and column index ranges of the cells whose centres cover a bounding box."""
+    row_0, col_0 = cell_index(south, west)
+    row_1, col_1 = cell_index(north, east)
+    if col_1 < col_0:
+        raise ValueError("Bounding boxes crossing the antimeridian are not supported.")
+    return range(row_0, row_1 + 1), range(col_0, col_1 + 1)
+
+
+def distance_km(lat_a, lon_a, lat_b, lon_b):
+    """Great-circle distance in km between two points."""
+    lat_a, lon_a, lat_b, lon_b = map(math.radians, (lat_a, lon_a, lat_b, lon_b))
+    h = (math.sin((lat_b - lat_a) / 2) ** 2
+         + math.cos(lat_a) * math.cos(lat_b) * math.sin((lon_b - lon_a) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
@@ -0,0 +1,240 @@
+"""
+Electricity Pricing & Economic Value
+Turns the Wh gained by cooling into dollars under time-of-use tariffs and
+reports the annual value and simple payback of the cooling kit per panel.
+
+A tariff is a dict with a base import rate, an optional export rate and
+period overrides by month, day type and hour:
+
+    {
+        "name": "tou",
+        "rate": 0.22,               # $/kWh bought from the grid
+        "export": 0.06,             # $/kWh paid for exported energy (default: rate, i.e. net metering)
+        "periods": [
+            {"months": [6, 7, 8, 9], "days": "weekday", "hours": [16, 21], "rate": 0.48},
+        ],
+        "export_periods": [],
+    }
+
+Later periods override earlier ones; hours are [start, end) in 0-24. Each
+tariff is compiled into a month x (weekday, weekend) x hour table, so
+pricing a year of hours is one integer index per hour and one fancy-index
+per tariff. Dollar values for every panel and tariff come from a single
+(panels, hours) x (tariffs, hours) contraction.
+
+Energy is valued at self_consumption x import + (1 - self_consumption) x
+export: cooling produces more PV output, and the pump draws from it.
+Weather stamps from NASA POWER are local solar time, which is within about
+an hour of the clock time tariffs are written in; the difference is ignored.
+
+Usage:
+    python src/pricing.py --cost 180 --self-consumption 0.5
+    python src/pricing.py --fleet fleet.csv --tariffs tariffs.json --output value.csv
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from solar_cooling import PARAMETER_NAMES, physics_based_check_batch
+
+HOURS_PER_YEAR = 8760
+DEFAULT_KIT_COST = 150.0        # $ per panel for pump, nozzles and controller
+DEFAULT_SELF_CONSUMPTION = 1.0
+
+WEEKDAY, WEEKEND = 0, 1
+DAY_TYPES = {"all": (WEEKDAY, WEEKEND), "weekday": (WEEKDAY,), "weekend": (WEEKEND,)}
+
+# Example schedules; pass --tariffs for real ones
+TARIFFS = {
+    "flat": {"rate": 0.16},
+    "tou_summer_peak": {
+        "rate": 0.24,
+        "export": 0.08,
+        "periods": [
+            {"months": [6, 7, 8, 9], "hours": [0, 24], "rate": 0.27},
+            {"months": [6, 7, 8, 9], "days": "weekday", "hours": [16, 21], "rate": 0.52},
+            {"months": [1, 2, 3, 4, 5, 10, 11, 12], "days": "weekday", "hours": [16, 21], "rate": 0.38},
+        ],
+    },
+    "net_billing": {
+        "rate": 0.21,
+        "export": 0.04,
+        "export_periods": [
+            {"months": [6, 7, 8, 9], "days": "weekday", "hours": [17, 20], "rate": 0.30},
+        ],
+    },
+}
+
+
+# -----------------------------
+# TARIFF TABLES
+# -----------------------------
+
+def rate_table(tariff, kind="import"):
+    """Compile a tariff into a (12 months, 2 day types, 24 hours) array of $/kWh."""
+    if kind == "import":
+        base, periods = tariff["rate"], tariff.get("periods", [])
+    else:
+        base, periods = tariff.get("export", tariff["rate"]), tariff.get("export_periods", [])
+
+    table = np.full((12, 2, 24), float(base))
+    for period in periods:
+        months = np.asarray(period.get("months", range(1, 13))) - 1
+        days = DAY_TYPES[period.get("days", "all")]
+        start, end = period.get("hours", (0, 24))
+        hours = np.arange(start, end) % 24 if end > start else np.r_[start:24, 0:end]
+        table[np.ix_(months, days, hours)] = period["rate"]
+    return table
+
+
+def tariff_tables(tariffs, self_consumption=DEFAULT_SELF_CONSUMPTION):
+    """Stack the value of one kWh for each tariff into a (tariffs, 12 * 2 * 24) array."""
+    tables = [self_consumption * rate_table(t) + (1 - self_consumption) * rate_table(t, "export")
+              for t in tariffs.values()]
+    return np.stack(tables).reshape(len(tables), -1)
+
+
+def time_index(times):
+    """Flat month/day-type/hour index into a compiled tariff table for each timestamp."""
+    times = np.asarray(times, dtype="datetime64[h]")
+    month = (times.astype("datetime64[M]") - times.astype("datetime64[Y]")).astype(int)
+    days = times.astype("datetime64[D]")
+    weekend = ((days.astype(int) + 3) % 7 >= 5).astype(int)     # 1970-01-01 was a Thursday
+    hour = (times - days).astype(int)
+    return (month * 2 + weekend) * 24 + hour
+
+
+def hourly_rates(tariffs, times, self_consumption=DEFAULT_SELF_CONSUMPTION):
+    """$/kWh for each tariff at each timestamp, shaped (tariffs, hours)."""
+    return tariff_tables(tariffs, self_consumption)[:, time_index(times)]
+
+
+def load_tariffs(path):
+    """Tariffs from a JSON file: either {name: tariff} or a list of tariffs with "name" keys."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {t["name"]: t for t in data}
+    return data
+
+
+# -----------------------------
+# VALUE
+# -----------------------------
+
+def net_cooling_energy(T_amb, G, **overrides):
+    """Net Wh gained by cooling in each hour the controller cools, shaped like the weather."""
+    _, energy_gain, cooling_cost, should_cool, _, _ = physics_based_check_batch(T_amb, G, **overrides)
+    return np.where(should_cool, energy_gain - cooling_cost, 0.0)
+
+
+def annual_value(net_Wh, rates, hours=None):
+    """Dollar value per (panel, tariff), scaled to a year when the weather covers fewer hours."""
+    net_Wh = np.atleast_2d(net_Wh)
+    value = np.einsum("ph,th->pt", net_Wh, rates, optimize=True) / 1000
+    hours = hours or net_Wh.shape[-1]
+    return value * (HOURS_PER_YEAR / hours)
+
+
+def payback_years(annual_dollars, kit_cost=DEFAULT_KIT_COST):
+    """Simple payback in years; inf where cooling never pays for itself."""
+    annual_dollars = np.asarray(annual_dollars, dtype=float)
+    kit_cost = np.asarray(kit_cost, dtype=float)
+    if kit_cost.ndim == 1 and annual_dollars.ndim == 2:
+        kit_cost = kit_cost[:, None]
+    with np.errstate(divide="ignore"):
+        return np.where(annual_dollars > 0, kit_cost / annual_dollars, np.inf)
+
+
+def fleet_value(T_amb, G, times, tariffs, site_index=None, kit_cost=DEFAULT_KIT_COST,
+                self_consumption=DEFAULT_SELF_CONSUMPTION, **overrides):
+    """Annual $ value and payback for each panel under each tariff; each (panels, tariffs).
+
+    T_amb and G are (sites, hours); site_index maps panels to sites (default
+    one panel per site). Panel parameter overrides may be (panels,) arrays.
+    """
+    T_amb, G = np.atleast_2d(T_amb), np.atleast_2d(G)
+    if site_index is not None:
+        T_amb, G = T_amb[site_index], G[site_index]
+    overrides = {name: (np.asarray(v, dtype=float)[:, None] if np.ndim(v) == 1 else v)
+                 for name, v in overrides.items()}
+
+    net_Wh = net_cooling_energy(T_amb, G, **overrides)
+    value = annual_value(net_Wh, hourly_rates(tariffs, times, self_consumption))
+    return value, payback_years(value, kit_cost)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annual $ value and payback of panel cooling under tariffs.")
+    parser.add_argument("--data", help="Glob of region CSVs (default: dev/data_raw/*_data.csv)")
+    parser.add_argument("--fleet", help="CSV with a region column and optional panel parameter / cost columns")
+    parser.add_argument("--tariffs", help="JSON tariff file (default: built-in examples)")
+    parser.add_argument("--cost", type=float, default=DEFAULT_KIT_COST, help="Cooling kit cost per panel ($)")
+    parser.add_argument("--self-consumption", type=float, default=DEFAULT_SELF_CONSUMPTION,
+                        help="Share of PV output used on site (valued at the import rate)")
+    parser.add_argument("--panels", type=int, default=2000, help="Panels priced together for timing")
+    parser.add_argument("--output", help="CSV for per-panel results")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from sensitivity import load_regions
+
+    regions, times, T_amb, G = load_regions(args.data)
+    tariffs = load_tariffs(args.tariffs) if args.tariffs else TARIFFS
+
+    if args.fleet:
+        fleet = pd.read_csv(args.fleet)
+        unknown = set(fleet["region"]) - set(regions)
+        if unknown:
+            raise SystemExit(f"❌ No weather for region(s): {', '.join(sorted(unknown))}")
+    else:
+        fleet = pd.DataFrame({"region": regions})
+    site_index = fleet["region"].map({r: i for i, r in enumerate(regions)}).to_numpy()
+    overrides = {name: fleet[name].to_numpy() for name in PARAMETER_NAMES if name in fleet}
+    kit_cost = fleet["cost"].to_numpy() if "cost" in fleet else args.cost
+
+    value, payback = fleet_value(T_amb, G, times, tariffs, site_index, kit_cost,
+                                 args.self_consumption, **overrides)
+
+    print("=" * 70)
+    print(f"💵 COOLING VALUE · {len(fleet):,} panels × {len(tariffs)} tariffs "
+          f"(annualized from {len(times):,} hours)")
+    print("=" * 70)
+    print(f"{'panel':<14}" + "".join(f"{name:>20}" for name in tariffs))
+    for i, region in enumerate(fleet["region"][:20]):
+        cells = []
+        for t in range(len(tariffs)):
+            years = f"{payback[i, t]:.0f} y" if np.isfinite(payback[i, t]) else "never"
+            cells.append(f"${value[i, t]:.2f}/yr · {years}")
+        print(f"{region:<14}" + "".join(f"{c:>20}" for c in cells))
+
+    if len(times) < HOURS_PER_YEAR:
+        print(f"\n⚠️ Weather covers {len(times):,} hours; values are scaled to {HOURS_PER_YEAR:,} h/yr "
+              f"and only see the tariff periods in those hours.")
+
+    # Timing on a synthetic fleet over a full year of hours
+    reps = -(-HOURS_PER_YEAR // len(times))
+    year = np.datetime64(str(times[0])[:4], "h") + np.arange(HOURS_PER_YEAR)
+    panel_sites = np.arange(args.panels) % len(regions)
+    year_T = np.tile(T_amb, reps)[:, :HOURS_PER_YEAR]
+    year_G = np.tile(G, reps)[:, :HOURS_PER_YEAR]
+    start = time.perf_counter()
+    fleet_value(year_T, year_G, year, tariffs, panel_sites, args.cost, args.self_consumption,
+                beta=np.linspace(0.004, 0.006, args.panels))
+    seconds = time.perf_counter() - start
+    print(f"\n⚡ {args.panels:,} panels × {HOURS_PER_YEAR:,} h × {len(tariffs)} tariffs in {seconds:.2f} s")
+
+    if args.output:
+        table = fleet.copy()
+        for t, name in enumerate(tariffs):
+            table[f"{name}_annual_usd"] = value[:, t]
+            table[f"{name}_payback_years"] = payback[:, t]
+        table.to_csv(args.output, index=False)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+On-Demand Profiling
+Runs a callable under cProfile and returns the raw profile (marshalled pstats,
+loadable by `python -m pstats`, snakeviz or flameprof) plus a top-N summary.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+
+def profile_call(fn, *args, **kwargs):
+    """Call fn under cProfile and return (result, profile dict)."""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    return result, {
+        "captured_at": time.time(),
+        "wall_seconds": elapsed,
+        "raw": marshal.dumps(stats.stats),
+        "top": top_functions(stats),
+    }
+
+
+def top_functions(stats, limit=25):
+    """Rows of (function, calls, total s, cumulative s) sorted by cumulative time."""
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{name} ({_short_path(filename)}:{line})",
+            "calls": calls,
+            "tottime_s": total,
+            "cumtime_s": cumulative,
+        })
+    rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+    return rows[:limit]
+
+
+def _short_path(filename):
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:]) if len(parts) > 1 else filename
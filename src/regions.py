@@ -0,0 +1,25 @@
+"""
+Weather Regions
+Coordinates of the regions whose hourly weather is stored in dev/data_raw,
+shared by the sensitivity sweep, the setpoint optimizer and the climatology
+builder.
+"""
+
+# (latitude, longitude) of the dev/data_raw regions, as fetched by MLdataforsolar.py
+REGION_COORDINATES = {
+    "mount_vernon": (40.3934, -82.4857),
+    "phoenix": (33.4484, -112.0740),
+    "miami": (25.7617, -80.1918),
+    "riyadh": (24.7136, 46.6753),
+    "seattle": (47.6062, -122.3321),
+    "las_vegas": (36.1699, -115.1398),
+    "houston": (29.7604, -95.3698),
+    "denver": (39.7392, -104.9903),
+    "los_angeles": (34.0522, -118.2437),
+    "chicago": (41.8781, -87.6298),
+    "el_paso": (31.7619, -106.4850),
+    "fresno": (36.7378, -119.7871),
+    "tucson": (32.2226, -110.9747),
+    "palm_springs": (33.8303, -116.5453),
+    "las_cruces": (32.3199, -106.7637),
+}
@@ -0,0 +1,213 @@
+"""
+Sub-Hourly Weather Resampling
+Turns hourly NASA POWER series (from fetch_weather_range / fetch_weather_day
+or the dev/data_raw region CSVs) into per-minute or per-second series for
+simulating the pump controller at its own resolution.
+
+- Temperature: monotone piecewise-cubic (PCHIP) through the hourly values, so
+  the curve never overshoots between hours.
+- Irradiance: NASA POWER values are hourly means. Each hour's clear-sky
+  index (value / extraterrestrial horizontal mean) is interpolated across
+  hour centres and multiplied by the instantaneous extraterrestrial
+  irradiance, giving smooth sunrise/sunset ramps and exact zeros at night.
+  Samples are then rescaled so every hour keeps its original mean. An hour
+  with irradiance but no sun at any of its sample times (a coarse step at
+  sunrise or sunset) is spread evenly over the hour instead of dropped.
+
+resample_chunks() is a generator that yields a few hours at a time, so a year
+at 1 s resolution for many sites is never held in memory at once.
+
+Usage:
+    python src/resample.py dev/data_raw/phoenix_data.csv phoenix_1min.csv --lat 33.45 --step 60
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from solar_geometry import (
+    day_of_year, extraterrestrial_horizontal, extraterrestrial_horizontal_mean, hour_of_day
+)
+
+# Below this hourly extraterrestrial mean (W/m²) the clear-sky index is too
+# noisy to trust and is taken from the nearest hour with more sun
+MIN_EXTRATERRESTRIAL = 20.0
+
+
+# -----------------------------
+# INPUT
+# -----------------------------
+
+def read_hourly(source):
+    """Return (times, T_amb, G) arrays from a fetch_weather_range frame or a region CSV."""
+    import pandas as pd
+
+    df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
+    if "Timestamp" in df.columns:
+        times = pd.to_datetime(df["Timestamp"])
+    else:
+        times = pd.to_datetime(df["Hour"].astype(str), format="%Y%m%d%H")
+    T_amb = df["Temperature" if "Temperature" in df.columns else "AmbientTemp_C"]
+    G = df["Irradiance" if "Irradiance" in df.columns else "Irradiance_Wm2"]
+    return (times.to_numpy().astype("datetime64[h]"),
+            T_amb.to_numpy(dtype=float), G.to_numpy(dtype=float))
+
+
+# -----------------------------
+# INTERPOLATION KERNELS
+# -----------------------------
+
+def pchip_slopes(y):
+    """Fritsch-Carlson slopes for unit-spaced knots along the last axis."""
+    delta = np.diff(y, axis=-1)
+    d = np.zeros_like(y)
+
+    left, right = delta[..., :-1], delta[..., 1:]
+    same_sign = left * right > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonic = 2.0 / (1.0 / left + 1.0 / right)
+    d[..., 1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    # One-sided three-point ends, limited so they stay shape-preserving
+    for end, d0, d1 in ((0, delta[..., 0], delta[..., min(1, delta.shape[-1] - 1)]),
+                        (-1, delta[..., -1], delta[..., max(-2, -delta.shape[-1])])):
+        slope = (3 * d0 - d1) / 2
+        slope = np.where(np.sign(slope) != np.sign(d0), 0.0, slope)
+        slope = np.where((np.sign(d0) != np.sign(d1)) & (np.abs(slope) > 3 * np.abs(d0)), 3 * d0, slope)
+        d[..., end] = slope
+    return d
+
+
+def hermite(y, d, t):
+    """Evaluate the cubic Hermite spline (y, d) at fractional knot positions t."""
+    n = y.shape[-1]
+    t = np.clip(t, 0, n - 1)
+    i = np.minimum(t.astype(int), n - 2)
+    s = t - i
+    s2, s3 = s * s, s * s * s
+    return ((2 * s3 - 3 * s2 + 1) * y[..., i] + (s3 - 2 * s2 + s) * d[..., i]
+            + (-2 * s3 + 3 * s2) * y[..., i + 1] + (s3 - s2) * d[..., i + 1])
+
+
+def linear(y, t):
+    """Linear interpolation of y at fractional knot positions t (clamped at the ends)."""
+    n = y.shape[-1]
+    t = np.clip(t, 0, n - 1)
+    i = np.minimum(t.astype(int), n - 2)
+    s = t - i
+    return y[..., i] * (1 - s) + y[..., i + 1] * s
+
+
+def _fill_nearest(values):
+    """Replace NaNs along the last axis with the previous valid value, else the next one."""
+    n = values.shape[-1]
+    valid = ~np.isnan(values)
+    idx = np.where(valid, np.arange(n), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    forward = np.take_along_axis(values, idx, axis=-1)
+
+    idx = np.where(valid, np.arange(n), n - 1)
+    idx = np.minimum.accumulate(idx[..., ::-1], axis=-1)[..., ::-1]
+    backward = np.take_along_axis(values, idx, axis=-1)
+
+    filled = np.where(np.isnan(forward), backward, forward)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def clear_sky_index(times, G, lat):
+    """Hourly irradiance divided by the hour's extraterrestrial horizontal mean."""
+    doy, start = day_of_year(times), hour_of_day(times)
+    reference = extraterrestrial_horizontal_mean(lat, doy, start, start + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(reference > MIN_EXTRATERRESTRIAL, G / reference, np.nan)
+    return np.clip(_fill_nearest(k), 0.0, 1.0)
+
+
+# -----------------------------
+# RESAMPLING
+# -----------------------------
+
+def resample_chunks(times, T_amb, G, lat, step_seconds=60, chunk_hours=24):
+    """Yield (fine_times, T_amb, G) blocks covering chunk_hours of input each.
+
+    times is a contiguous hourly datetime64 array; T_amb and G are (hours,)
+    or (sites, hours) with one latitude per site. Output covers every input
+    hour, from the first stamp up to one step before the hour after the last.
+    """
+    if 3600 % step_seconds:
+        raise ValueError("step_seconds must divide an hour evenly.")
+    times = np.asarray(times, dtype="datetime64[h]")
+    if len(times) < 2 or np.any(np.diff(times) != np.timedelta64(1, "h")):
+        raise ValueError("Hourly series must be contiguous with at least two hours; "
+                         "fill gaps with data_quality first.")
+
+    T_amb, G = np.asarray(T_amb, dtype=float), np.asarray(G, dtype=float)
+    single_site = T_amb.ndim == 1
+    T_amb, G = np.atleast_2d(T_amb), np.atleast_2d(G)
+    lat = np.asarray(lat, dtype=float).reshape(-1, 1)
+
+    # Hourly knots are small; compute them once for the whole series
+    slopes = pchip_slopes(T_amb)
+    k = clear_sky_index(times, G, lat)
+
+    per_hour = 3600 // step_seconds
+    offsets = np.arange(per_hour) * (step_seconds / 3600)
+    for first in range(0, len(times), chunk_hours):
+        last = min(first + chunk_hours, len(times))
+        position = (np.arange(first, last)[:, None] + offsets).ravel()
+        fine_times = times[0].astype("datetime64[s]") + np.round(position * 3600).astype("timedelta64[s]")
+
+        T_fine = hermite(T_amb, slopes, position)
+
+        # Clear-sky index is an hourly mean, so its knots sit at hour centres
+        G_fine = linear(k, position - 0.5) * extraterrestrial_horizontal(
+            lat, day_of_year(fine_times), hour_of_day(fine_times)
+        )
+        blocks = G_fine.reshape(G_fine.shape[0], last - first, per_hour)
+        mean = blocks.mean(axis=-1, keepdims=True)
+        hourly = G[:, first:last, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scaled = blocks * (hourly / mean)
+        # A flat hour keeps the energy of an hour whose shape has no sunlit sample
+        G_fine = np.where(mean > 0, scaled, np.broadcast_to(hourly, blocks.shape)).reshape(G_fine.shape)
+
+        if single_site:
+            yield fine_times, T_fine[0], G_fine[0]
+        else:
+            yield fine_times, T_fine, G_fine
+
+
+def resample(times, T_amb, G, lat, step_seconds=60):
+    """Materialize resample_chunks into whole arrays (for a day or two of data)."""
+    parts = list(resample_chunks(times, T_amb, G, lat, step_seconds))
+    return (np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts], axis=-1),
+            np.concatenate([p[2] for p in parts], axis=-1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resample an hourly weather CSV to sub-hourly steps.")
+    parser.add_argument("input", help="Region CSV (Hour, Irradiance_Wm2, AmbientTemp_C) or Timestamp/Temperature/Irradiance CSV")
+    parser.add_argument("output", help="Destination CSV")
+    parser.add_argument("--lat", type=float, required=True, help="Site latitude in degrees")
+    parser.add_argument("--step", type=int, default=60, help="Output step in seconds (must divide 3600)")
+    parser.add_argument("--chunk-hours", type=int, default=24)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    times, T_amb, G = read_hourly(args.input)
+    print(f"🌞 Resampling {len(times):,} hours → {args.step} s steps")
+    start, rows = time.perf_counter(), 0
+    for fine_times, T_fine, G_fine in resample_chunks(times, T_amb, G, args.lat, args.step, args.chunk_hours):
+        pd.DataFrame({"Timestamp": fine_times, "Temperature": T_fine, "Irradiance": G_fine}).to_csv(
+            args.output, mode="a" if rows else "w", header=not rows, index=False
+        )
+        rows += len(fine_times)
+    seconds = time.perf_counter() - start
+    print(f"✅ {rows:,} rows in {seconds:.2f} s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Panel & Pump Sensitivity Sweep
+Evaluates how the cooling benefit changes with beta, NOCT, eta_ref,
+T_target, pump_power_rated and pump_efficiency, against the stored hourly
+weather of every region in dev/data_raw.
+
+Configurations come from a parameter grid or a Latin hypercube sample. They
+are evaluated in batches on a process pool; the weather arrays are placed
+once in shared memory and attached read-only by every worker, and each
+batch of configurations is a single broadcast call to
+physics_based_check_batch.
+
+Outputs:
+- a tidy table with one row per (configuration, region)
+- a tornado ranking: each parameter swung to the ends of its range with the
+  others at their defaults, plus Spearman rank correlations over the sweep
+
+Usage:
+    python src/sensitivity.py --lhs 2000 --workers 4 --output sweep.csv --tornado tornado.csv
+    python src/sensitivity.py --grid beta=0.004,0.005,0.006 NOCT=42,45,48
+"""
+
+import argparse
+import glob
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from solar_cooling import panel_parameters, physics_based_check_batch
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "dev", "data_raw")
+
+# Swept parameters and the range each is varied over
+PARAMETER_RANGES = {
+    "beta": (0.003, 0.006),
+    "NOCT": (40.0, 50.0),
+    "eta_ref": (0.15, 0.22),
+    "T_target": (30.0, 40.0),
+    "pump_power_rated": (1.0, 4.0),
+    "pump_efficiency": (0.6, 0.95),
+}
+SWEPT = tuple(PARAMETER_RANGES)
+
+BATCH_CONFIGS = 32          # configurations per physics call / pool task
+
+
+# -----------------------------
+# WEATHER
+# -----------------------------
+
+def load_regions(pattern=None):
+    """Stack the region CSVs into (regions, hours) arrays; returns (names, times, T_amb, G)."""
+    from resample import read_hourly
+
+    paths = sorted(p for p in glob.glob(pattern or os.path.join(DATA_DIR, "*_data.csv"))
+                   if not os.path.basename(p).startswith("full_training"))
+    names, temps, irradiance = [], [], []
+    for path in paths:
+        times, T_amb, G = read_hourly(path)
+        names.append(os.path.basename(path).replace("_data.csv", ""))
+        temps.append(T_amb)
+        irradiance.append(G)
+
+    # The region files cover the same period; trim to the shortest
+    hours = min(len(t) for t in temps)
+    return (names, times[:hours],
+            np.stack([t[:hours] for t in temps]), np.stack([g[:hours] for g in irradiance]))
+
+
+def share_array(array):
+    """Copy an array into a new shared memory block; returns (block, descriptor)."""
+    block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+_worker_arrays = {}
+
+
+def _attach(descriptors):
+    """Pool initializer: map the shared weather arrays read-only."""
+    for key, (name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        _worker_arrays[key] = (block, array)
+
+
+# -----------------------------
+# CONFIGURATIONS
+# -----------------------------
+
+def grid_configs(grid):
+    """Every combination of {parameter: [values]}; unlisted parameters stay at their defaults."""
+    defaults = panel_parameters()
+    names = list(grid)
+    return [{**{p: defaults[p] for p in SWEPT}, **dict(zip(names, values))}
+            for values in itertools.product(*(grid[n] for n in names))]
+
+
+def latin_hypercube(n, ranges=PARAMETER_RANGES, seed=0):
+    """n configurations with each parameter's range split into n strata, one sample per stratum."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        strata = (rng.permutation(n) + rng.random(n)) / n
+        columns[name] = low + strata * (high - low)
+    return [{name: float(columns[name][i]) for name in ranges} for i in range(n)]
+
+
+def tornado_configs(ranges=PARAMETER_RANGES):
+    """Baseline plus each parameter at the low and high end of its range."""
+    defaults = panel_parameters()
+    baseline = {p: defaults[p] for p in ranges}
+    configs = [baseline]
+    for name, (low, high) in ranges.items():
+        configs += [{**baseline, name: low}, {**baseline, name: high}]
+    return configs
+
+
+# -----------------------------
+# EVALUATION
+# -----------------------------
+
+def evaluate(configs, T_amb, G):
+    """Cooling hours and net Wh per (configuration, region) for a batch of configurations."""
+    params = {name: np.array([c[name] for c in configs])[:, None, None] for name in configs[0]}
+    _, energy_gain, cooling_cost, should_cool, _, _ = physics_based_check_batch(T_amb, G, **params)
+    net = np.where(should_cool, energy_gain - cooling_cost, 0.0)
+    return should_cool.sum(axis=-1), net.sum(axis=-1)
+
+
+def _evaluate_shared(configs):
+    return evaluate(configs, _worker_arrays["T_amb"][1], _worker_arrays["G"][1])
+
+
+def run_sweep(configs, T_amb, G, workers=1, batch=BATCH_CONFIGS):
+    """Evaluate every configuration; returns (cooling_hours, net_Wh), each (configs, regions)."""
+    batches = [configs[i:i + batch] for i in range(0, len(configs), batch)]
+    if workers <= 1:
+        results = [evaluate(b, T_amb, G) for b in batches]
+    else:
+        blocks = {}
+        try:
+            for key, array in (("T_amb", T_amb), ("G", G)):
+                blocks[key] = share_array(np.ascontiguousarray(array, dtype=float))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=({k: d for k, (_, d) in blocks.items()},)) as pool:
+                results = list(pool.map(_evaluate_shared, batches))
+        finally:
+            for block, _ in blocks.values():
+                block.close()
+                block.unlink()
+
+    return (np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results]))
+
+
+# -----------------------------
+# REPORTING
+# -----------------------------
+
+def tidy_table(configs, regions, cooling_hours, net_Wh, hours):
+    """One row per (configuration, region)."""
+    import pandas as pd
+
+    n_configs, n_regions = net_Wh.shape
+    table = pd.DataFrame({
+        "config": np.repeat(np.arange(n_configs), n_regions),
+        "region": np.tile(regions, n_configs),
+    })
+    for name in configs[0]:
+        table[name] = np.repeat([c[name] for c in configs], n_regions)
+    table["cooling_hours"] = cooling_hours.ravel()
+    table["net_Wh"] = net_Wh.ravel()
+    table["net_Wh_per_day"] = net_Wh.ravel() / (hours / 24)
+    return table
+
+
+def spearman_correlation(X, y):
+    """Spearman rank correlation of each column of X with y, with tied values sharing their average rank.
+
+    Columns that never vary (e.g. a parameter left out of a grid) get 0.
+    """
+    import pandas as pd
+
+    rx = pd.DataFrame(np.asarray(X, dtype=float)).rank().to_numpy()
+    ry = pd.Series(np.asarray(y, dtype=float)).rank().to_numpy()
+    rx = rx - rx.mean(axis=0)
+    ry = ry - ry.mean()
+    denom = np.sqrt((rx ** 2).sum(axis=0) * (ry ** 2).sum())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = (rx * ry[:, None]).sum(axis=0) / denom
+    return np.where(denom > 0, rho, 0.0)
+
+
+def tornado(net_total, configs, sweep_net=None, sweep_configs=None, ranges=PARAMETER_RANGES):
+    """Rank parameters by the swing in total net Wh between the ends of their ranges.
+
+    net_total holds the tornado_configs() results. When a sweep is given, the
+    Spearman rank correlation of each parameter with total net Wh is added.
+    """
+    import pandas as pd
+
+    rows = []
+    for i, (name, (low, high)) in enumerate(ranges.items()):
+        at_low, at_high = net_total[1 + 2 * i], net_total[2 + 2 * i]
+        rows.append({"parameter": name, "low": low, "high": high, "net_Wh_at_low": at_low,
+                     "net_Wh_at_high": at_high, "swing_Wh": abs(at_high - at_low)})
+    table = pd.DataFrame(rows)
+    table["baseline_net_Wh"] = net_total[0]
+
+    if sweep_net is not None and len(sweep_configs) > 2:
+        X = np.array([[c[name] for name in ranges] for c in sweep_configs])
+        table["spearman_rho"] = spearman_correlation(X, sweep_net)
+    return table.sort_values("swing_Wh", ascending=False).reset_index(drop=True)
+
+
+def parse_grid(specs):
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in PARAMETER_RANGES:
+            raise SystemExit(f"❌ Unknown parameter {name!r} (choose from {', '.join(PARAMETER_RANGES)})")
+        grid[name] = [float(v) for v in values.split(",")]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep panel/pump parameters against stored regional weather.")
+    parser.add_argument("--grid", nargs="+", metavar="NAME=V1,V2", help="Parameter grid")
+    parser.add_argument("--lhs", type=int, default=0, help="Latin hypercube sample size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", help="Glob of region CSVs (default: dev/data_raw/*_data.csv)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", default="sensitivity_sweep.csv")
+    parser.add_argument("--tornado", default="sensitivity_tornado.csv")
+    args = parser.parse_args()
+
+    regions, _, T_amb, G = load_regions(args.data)
+    configs = grid_configs(parse_grid(args.grid)) if args.grid else []
+    configs += latin_hypercube(args.lhs, seed=args.seed) if args.lhs else []
+    if not configs:
+        parser.error("Pass --grid and/or --lhs.")
+
+    print(f"🌞 {len(configs):,} configurations × {len(regions)} regions × {T_amb.shape[1]:,} hours")
+    start = time.perf_counter()
+    cooling_hours, net_Wh = run_sweep(configs, T_amb, G, args.workers)
+    seconds = time.perf_counter() - start
+    _, tornado_net = run_sweep(tornado_configs(), T_amb, G)
+
+    tidy_table(configs, regions, cooling_hours, net_Wh, T_amb.shape[1]).to_csv(args.output, index=False)
+    ranking = tornado(tornado_net.sum(axis=1), tornado_configs(), net_Wh.sum(axis=1), configs)
+    ranking.to_csv(args.tornado, index=False)
+
+    print("=" * 70)
+    print("🌪️ SENSITIVITY RANKING (total net Wh over all regions)")
+    print("=" * 70)
+    print(f"Baseline: {ranking['baseline_net_Wh'][0]:,.0f} Wh")
+    for _, row in ranking.iterrows():
+        rho = f"  ρ={row['spearman_rho']:+.2f}" if "spearman_rho" in row else ""
+        print(f"{row['parameter']:<18} {row['net_Wh_at_low']:>10,.0f} → {row['net_Wh_at_high']:>10,.0f} Wh"
+              f"  (swing {row['swing_Wh']:,.0f}){rho}")
+    print(f"\n⚡ {len(configs) * T_amb.size / seconds:,.0f} config-hours/s with {args.workers} worker(s)")
+    print(f"💾 {args.output}, {args.tornado}")
+
+
+if __name__ == "__main__":
+    main()
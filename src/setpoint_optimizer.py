@@ -0,0 +1,185 @@
+"""
+Controller Setpoint Optimizer
+Searches (threshold, target, min_runtime, hysteresis band) for the pump
+controller against stored hourly weather per region and returns, for each
+site, the Pareto front of net energy gained versus pump starts.
+
+The thresholds in the code base were never tuned: T_threshold is 45 °C in
+solar_cooling.py and 43 °C in MLdataforsolar.py, and the Arduino stages fire
+at 25/40/60 °C. This tool replays the controller at sub-hourly resolution on
+weather resampled with resample.py:
+
+- The panel relaxes towards its uncooled equilibrium (T_amb + (NOCT-20)/800·G)
+  with time constant HEAT_TIME_CONSTANT. While the pump runs, it relaxes
+  towards the coolant, which is at ambient temperature, with
+  COOL_TIME_CONSTANT instead (about 95 % in the 6 minutes quoted for a
+  cooling cycle). The panel never gets below ambient, so a target under
+  ambient only keeps the pump running without gaining anything.
+- The pump starts when the panel exceeds threshold + band/2 and stops once it
+  has run min_runtime and the panel is at or below target - band/2.
+- Net energy is the PV output gained over the same panel left uncooled
+  (with the same thermal lag) minus pump energy, using the
+  physics_based_check efficiency model.
+
+Every candidate setpoint is replayed at once: the state is a
+(setpoints, regions) array advanced one time step per NumPy operation.
+
+Usage:
+    python src/setpoint_optimizer.py --step 300 --output pareto.csv
+"""
+
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+
+from regions import REGION_COORDINATES
+from resample import resample_chunks
+from sensitivity import load_regions
+from solar_cooling import A_panel, NOCT, T_target, T_threshold, beta, eta_ref, min_runtime, pump_power_Wh
+
+HEAT_TIME_CONSTANT = 8.0    # minutes, uncooled panel tracking its equilibrium
+COOL_TIME_CONSTANT = 2.0    # minutes, panel pulled to ambient while pumping
+
+# Default search space
+THRESHOLDS = np.arange(28.0, 65.0, 2.0)
+TARGETS = np.arange(20.0, 57.0, 2.0)
+MIN_RUNTIMES = (2.0, 6.0, 10.0, 15.0, 30.0, 45.0, 60.0, 90.0)    # minutes
+BANDS = (0.0, 2.0, 4.0, 6.0, 8.0, 10.0)                          # °C
+
+# Setpoints currently in use, evaluated for comparison
+CURRENT_SETPOINTS = {
+    "solar_cooling.py": (T_threshold, T_target, min_runtime, 0.0),
+    "MLdataforsolar.py": (43.0, T_target, min_runtime, 0.0),
+}
+
+
+# -----------------------------
+# CONTROLLER REPLAY
+# -----------------------------
+
+def pv_power(panel_temp, G):
+    """PV output (W) at a panel temperature, as in physics_based_check."""
+    return np.maximum(eta_ref * (1 - beta * (panel_temp - 25)), 0) * G * A_panel
+
+
+def replay(T_amb, G, setpoints, step_minutes):
+    """Replay the controller for each setpoint; returns (net_Wh, starts, pump_hours), each (setpoints, regions).
+
+    T_amb and G are (regions, steps); setpoints is a (n, 4) array of
+    (threshold, target, min_runtime minutes, band).
+    """
+    setpoints = np.asarray(setpoints, dtype=float)
+    threshold, target, runtime, band = (setpoints[:, i, None] for i in range(4))
+    on_above = threshold + band / 2
+    off_at = target - band / 2
+    min_steps = np.ceil(runtime / step_minutes)
+
+    equilibrium = T_amb + ((NOCT - 20) / 800) * G
+    heat = 1 - math.exp(-step_minutes / HEAT_TIME_CONSTANT)
+    cool = 1 - math.exp(-step_minutes / COOL_TIME_CONSTANT)
+
+    shape = (len(setpoints), T_amb.shape[0])
+    panel = np.broadcast_to(equilibrium[:, 0], shape).copy()
+    uncooled = equilibrium[:, 0].copy()
+    pumping = np.zeros(shape, dtype=bool)
+    run_steps = np.zeros(shape)
+    starts = np.zeros(shape, dtype=np.int64)
+    on_steps = np.zeros(shape, dtype=np.int64)
+    gained = np.zeros(shape)
+
+    for t in range(T_amb.shape[1]):
+        eq_t, G_t = equilibrium[:, t], G[:, t]
+
+        start = ~pumping & (panel > on_above)
+        stop = pumping & (run_steps >= min_steps) & (panel <= off_at)
+        pumping = (pumping | start) & ~stop
+        starts += start
+        run_steps = np.where(pumping, run_steps + 1, 0)
+        on_steps += pumping
+
+        # The coolant is at ambient temperature, so pumping can't take the panel below it
+        panel += np.where(pumping, (T_amb[:, t] - panel) * cool, (eq_t - panel) * heat)
+        uncooled += (eq_t - uncooled) * heat
+        gained += pv_power(panel, G_t) - pv_power(uncooled, G_t)
+
+    hours = step_minutes / 60
+    pump_hours = on_steps * hours
+    return gained * hours - pump_hours * pump_power_Wh, starts, pump_hours
+
+
+def pareto_front(net_Wh, starts):
+    """Indices of setpoints not beaten on both net energy (higher) and starts (fewer)."""
+    order = np.lexsort((-net_Wh, starts))
+    front, best = [], -np.inf
+    for i in order:
+        if net_Wh[i] > best:
+            front.append(i)
+            best = net_Wh[i]
+    return np.array(front, dtype=int)
+
+
+def search_space(thresholds=THRESHOLDS, targets=TARGETS, runtimes=MIN_RUNTIMES, bands=BANDS):
+    """All (threshold, target, min_runtime, band) combinations with target below threshold."""
+    return np.array([c for c in itertools.product(thresholds, targets, runtimes, bands) if c[1] < c[0]])
+
+
+def resample_regions(regions, times, T_amb, G, step_seconds):
+    """Resample (regions, hours) weather to step_seconds using each region's latitude."""
+    missing = [r for r in regions if r not in REGION_COORDINATES]
+    if missing:
+        raise ValueError(f"No coordinates for region(s): {', '.join(missing)}")
+    lat = [REGION_COORDINATES[r][0] for r in regions]
+    parts = list(resample_chunks(times, T_amb, G, lat, step_seconds, chunk_hours=24 * 7))
+    return np.concatenate([p[1] for p in parts], axis=1), np.concatenate([p[2] for p in parts], axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find Pareto-optimal pump controller setpoints per region.")
+    parser.add_argument("--data", help="Glob of region CSVs (default: dev/data_raw/*_data.csv)")
+    parser.add_argument("--step", type=int, default=300, help="Replay step in seconds (must divide 3600)")
+    parser.add_argument("--output", default="setpoint_pareto.csv")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    regions, times, T_amb, G = load_regions(args.data)
+    T_fine, G_fine = resample_regions(regions, times, T_amb, G, args.step)
+    step_minutes = args.step / 60
+
+    candidates = search_space()
+    current = np.array(list(CURRENT_SETPOINTS.values()))
+    setpoints = np.concatenate([current, candidates])
+
+    print(f"🌞 {len(setpoints):,} setpoints × {len(regions)} regions × {T_fine.shape[1]:,} steps of {args.step} s")
+    start = time.perf_counter()
+    net_Wh, starts, pump_hours = replay(T_fine, G_fine, setpoints, step_minutes)
+    seconds = time.perf_counter() - start
+
+    rows = []
+    print("=" * 70)
+    print("🎛️ SETPOINT PARETO FRONTS (net Wh vs pump starts)")
+    print("=" * 70)
+    for r, region in enumerate(regions):
+        front = pareto_front(net_Wh[:, r], starts[:, r])
+        for i in front:
+            threshold, target, runtime, band = setpoints[i]
+            rows.append({"region": region, "threshold": threshold, "target": target, "min_runtime": runtime,
+                         "band": band, "net_Wh": net_Wh[i, r], "starts": starts[i, r],
+                         "pump_hours": pump_hours[i, r]})
+        best = front[-1]
+        baseline = ", ".join(f"{net_Wh[j, r]:.0f} Wh / {starts[j, r]} starts" for j in range(len(current)))
+        print(f"{region:<14} best {net_Wh[best, r]:7.0f} Wh / {starts[best, r]:4d} starts "
+              f"(T_on {setpoints[best, 0]:.0f}, target {setpoints[best, 1]:.0f}, "
+              f"run {setpoints[best, 2]:.0f} min, band {setpoints[best, 3]:.0f}) · "
+              f"{len(front)} on front · current: {baseline}")
+
+    pd.DataFrame(rows).to_csv(args.output, index=False)
+    print(f"\n⚡ {net_Wh.size * T_fine.shape[1] / seconds:,.0f} controller-steps/s · {seconds:.1f} s")
+    print(f"💾 Pareto fronts written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Single-Flight Request Coalescing
+When many sessions ask for the same place and date at the same moment (a
+shared link, a class demo), only one upstream request should go out.
+
+SingleFlight.do(key, fn) runs fn once per key at a time:
+
+- Threads: the first caller runs fn; concurrent callers with the same key
+  wait for it and share the result (or the exception).
+- Processes on one host (calls made with a JSON codec only): callers with
+  the same key serialize on an fcntl lock on <dir>/<key hash>.lock. A
+  process that finds the lock taken registers a .waiting file and blocks.
+  When the running call finishes and sees waiters, it writes the encoded
+  result to <key hash>.json, and each waiter decodes that instead of
+  calling upstream. Only calls in flight are shared: an uncontended call
+  writes nothing, and a waiter never reads a result older than its wait.
+
+The directory is private to the user: created with mode 0700 and used only
+if it is a real directory owned by the user that nobody else can access.
+Without fcntl (Windows), with SOLAR_SINGLEFLIGHT_DIR set to "", or when the
+directory isn't private, only threads are coalesced.
+
+Every call is counted in solar_singleflight_calls_total{lookup, outcome}, with
+outcome "executed", "coalesced_thread" or "coalesced_process".
+"""
+
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from metrics import REGISTRY, is_enabled
+
+try:
+    import fcntl
+except ImportError:         # Windows: coalesce within the process only
+    fcntl = None
+
+SINGLE_FLIGHT_CALLS = "solar_singleflight_calls_total"
+STALE_SECONDS = 300.0       # lock, waiting and result files untouched this long are pruned
+
+
+def _count(name, outcome):
+    if is_enabled():
+        REGISTRY.counter(SINGLE_FLIGHT_CALLS, "Upstream lookups by single-flight outcome",
+                         lookup=name, outcome=outcome).inc()
+
+
+def default_directory():
+    """Per-user coordination directory under the system temp directory."""
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"solar-cooling-singleflight-{user}")
+
+
+def ensure_private_directory(directory):
+    """Create directory with mode 0700 if needed; True only if it is ours and closed to others."""
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    try:
+        info = os.lstat(directory)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid()
+            and not info.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+
+def _open_locked(path, blocking):
+    """Open and flock path; None if not blocking and another process holds the lock.
+
+    Retries when the file was pruned between opening and locking it, so
+    every holder locks the file currently at path.
+    """
+    while True:
+        f = open(path, "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return None
+        try:
+            current = os.fstat(f.fileno()).st_ino == os.stat(path).st_ino
+        except FileNotFoundError:
+            current = False
+        if current:
+            return f
+        f.close()
+
+
+class _Flight:
+    """One in-progress call that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key across threads and processes."""
+
+    def __init__(self, directory=None):
+        self._requested_directory = directory
+        self._directory = None
+        self._checked = False
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._pruned = 0.0
+
+    @property
+    def directory(self):
+        """The private coordination directory, or None if processes aren't coalesced."""
+        with self._lock:
+            if not self._checked:
+                directory = self._requested_directory
+                if directory is None:
+                    directory = os.environ.get("SOLAR_SINGLEFLIGHT_DIR", default_directory())
+                if directory and fcntl is not None and ensure_private_directory(directory):
+                    self._directory = directory
+                self._checked = True
+            return self._directory
+
+    def do(self, key, fn, name="call", share=None, codec=None):
+        """Return fn(), running it at most once at a time per key.
+
+        share, if given, is applied to the result handed to threads that
+        waited on another thread's call (e.g. DataFrame.copy, so they can't
+        mutate each other's result). codec, an (encode, decode) pair mapping
+        the result to and from JSON-serializable data, enables coalescing
+        with other processes.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            _count(name, "coalesced_thread")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return share(flight.result) if share else flight.result
+
+        try:
+            result, outcome = self._run(key, fn, codec)
+            flight.result = result
+        except BaseException as e:
+            flight.error = e
+            _count(name, "executed")
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        _count(name, outcome)
+        return result
+
+    def _run(self, key, fn, codec):
+        """Run fn under the per-key file lock, or take the result of the call we waited on."""
+        directory = self.directory if codec is not None else None
+        if directory is None:
+            return fn(), "executed"
+
+        import hashlib
+
+        base = os.path.join(directory, hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32])
+        started = time.time()
+        waiting = None
+        lock_file = _open_locked(f"{base}.lock", blocking=False)
+        if lock_file is None:
+            waiting = f"{base}.{os.getpid()}.waiting"
+            open(waiting, "w").close()
+            lock_file = _open_locked(f"{base}.lock", blocking=True)
+        try:
+            if waiting:
+                try:
+                    os.remove(waiting)
+                except FileNotFoundError:   # pruned during a very long wait
+                    pass
+                shared = self._read_result(f"{base}.json", key, started, codec)
+                if shared is not None:
+                    return shared[0], "coalesced_process"
+            os.utime(f"{base}.lock")
+            result = fn()
+            if self._has_waiters(base):
+                self._write_result(f"{base}.json", key, result, codec)
+            return result, "executed"
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+            self._prune(directory)
+
+    @staticmethod
+    def _has_waiters(base):
+        prefix = os.path.basename(base) + "."
+        return any(entry.name.startswith(prefix) and entry.name.endswith(".waiting")
+                   for entry in os.scandir(os.path.dirname(base)))
+
+    @staticmethod
+    def _read_result(path, key, started, codec):
+        import json
+
+        try:
+            if os.path.getmtime(path) < started:
+                return None
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("key") != repr(key):
+            return None
+        return (codec[1](stored["result"]),)
+
+    @staticmethod
+    def _write_result(path, key, result, codec):
+        import json
+
+        partial = f"{path}.{os.getpid()}.partial"
+        try:
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump({"key": repr(key), "result": codec[0](result)}, f)
+            os.replace(partial, path)
+        except (OSError, TypeError, ValueError):
+            # Waiters find no fresh result and make the call themselves
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _prune(self, directory):
+        """Delete files untouched for STALE_SECONDS, at most once per STALE_SECONDS."""
+        now = time.time()
+        if now - self._pruned < STALE_SECONDS:
+            return
+        self._pruned = now
+        for entry in os.scandir(directory):
+            try:
+                if now - entry.stat().st_mtime <= STALE_SECONDS:
+                    continue
+                if not entry.name.endswith(".lock"):
+                    os.remove(entry.path)
+                    continue
+                # Only unlink a lock nobody holds; holders re-check the inode (_open_locked)
+                lock_file = _open_locked(entry.path, blocking=False)
+                if lock_file is not None:
+                    os.remove(entry.path)
+                    lock_file.close()
+            except OSError:
+                pass
+
+
+def coalesced_counts(registry=REGISTRY):
+    """{lookup: {outcome: count}} from the single-flight counters."""
+    _, counters = registry.families().get(SINGLE_FLIGHT_CALLS, (None, {}))
+    counts = {}
+    for labels, counter in counters.items():
+        labels = dict(labels)
+        counts.setdefault(labels["lookup"], {})[labels["outcome"]] = counter.value
+    return counts
@@ -0,0 +1,98 @@
+"""
+Spatial Index of Cached Weather
+"Phoenix, AZ", "Tempe, AZ" and "Scottsdale" geocode to points a few km apart
+that NASA POWER serves from the same or adjacent grid cells, yet each used
+to trigger its own weather request. SiteIndex remembers where weather has
+been fetched and, for a new point, returns the nearest fetched point within
+a configurable distance so its weather can be reused.
+
+Points are hashed into NASA POWER grid cells (power_grid), so a query only
+looks at the few cells that can hold a point within max_km. Each entry is
+stored under a key (e.g. the date fetched), and only entries with the same
+key match. Entries can expire after ttl seconds, and the oldest are dropped
+beyond max_entries, so a long-lived index stays in step with the weather
+cache it points into.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from power_grid import CELL_LAT, CELL_LON, EARTH_RADIUS_KM, N_COLS, N_ROWS, cell_center, cell_index, distance_km
+
+DEFAULT_REUSE_KM = 10.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+class SiteIndex:
+    """Grid hash of fetched points, safe to share between threads."""
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cells = {}            # (row, col) -> {key: {(lat, lon): None}}
+        self._added = OrderedDict()     # (cell, key, (lat, lon)) -> time added, oldest first
+        self._lock = threading.Lock()
+
+    def add(self, lat, lon, key=None):
+        """Record that weather for key has been fetched at (lat, lon); re-adding renews it."""
+        cell = cell_index(lat, lon)
+        with self._lock:
+            self._cells.setdefault(cell, {}).setdefault(key, {})[(lat, lon)] = None
+            entry = (cell, key, (lat, lon))
+            self._added.pop(entry, None)
+            self._added[entry] = time.monotonic()
+            self._evict()
+
+    def _evict(self):
+        """Drop expired entries and the oldest beyond max_entries; call with the lock held."""
+        now = time.monotonic()
+        while self._added:
+            (cell, key, point), added = next(iter(self._added.items()))
+            expired = self.ttl is not None and now - added > self.ttl
+            if not expired and (self.max_entries is None or len(self._added) <= self.max_entries):
+                break
+            del self._added[(cell, key, point)]
+            points = self._cells[cell][key]
+            del points[point]
+            if not points:
+                del self._cells[cell][key]
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+    def nearest(self, lat, lon, key=None, max_km=DEFAULT_REUSE_KM):
+        """Closest fetched (lat, lon, distance_km) for key within max_km, or None."""
+        row, col = cell_index(lat, lon)
+        row_rings = math.ceil(max_km / (CELL_LAT * KM_PER_DEGREE))
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + row_rings * CELL_LAT, 90.0))), 1e-6)
+        col_rings = min(math.ceil(max_km / (CELL_LON * KM_PER_DEGREE * cos_lat)), N_COLS // 2)
+
+        best = None
+        with self._lock:
+            self._evict()
+            for r in range(max(row - row_rings, 0), min(row + row_rings, N_ROWS - 1) + 1):
+                for c in range(col - col_rings, col + col_rings + 1):
+                    for p_lat, p_lon in self._cells.get((r, c % N_COLS), {}).get(key, ()):
+                        d = distance_km(lat, lon, p_lat, p_lon)
+                        if d <= max_km and (best is None or d < best[2]):
+                            best = (p_lat, p_lon, d)
+        return best
+
+    def resolve(self, lat, lon, key=None, max_km=DEFAULT_REUSE_KM):
+        """Point to fetch or reuse for a query: (lat, lon, distance_km, reused)."""
+        match = self.nearest(lat, lon, key, max_km)
+        if match is None:
+            return lat, lon, 0.0, False
+        return (*match, True)
+
+    def __len__(self):
+        with self._lock:
+            self._evict()
+            return len(self._added)
+
+
+def describe_cell(lat, lon):
+    """Human-readable NASA POWER cell for a point, e.g. 'cell 33.50, -111.875'."""
+    c_lat, c_lon = cell_center(*cell_index(lat, lon))
+    return f"cell {c_lat:.2f}, {c_lon:.3f}"
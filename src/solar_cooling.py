@@ -1,11 +1,16 @@
 """
 Solar Panel Cooling Optimization Module
 Contains all core logic for cooling decision analysis
+
+Heavy dependencies (requests, numpy, pandas, the model loader) are imported
+inside the functions that use them, so importing this module is cheap.
 """
 
-import requests
-import pandas as pd
-import joblib
+import os
+import threading
+
+from metrics import timed
+from single_flight import SingleFlight
 
 # -----------------------------
 # CONFIGURATION
@@ -13,6 +18,9 @@ import joblib
 BASE_URL = "https://power.larc.nasa.gov/api/temporal/hourly/point"
 GEOCODE_URL = "https://nominatim.openstreetmap.org/search"
 
+MODEL_PATH = "models/cooling_decision_model.pkl"
+COMPACT_MODEL_PATH = "models/cooling_decision_model"   # .json header + .npy nodes
+
 # -----------------------------
 # PANEL & PUMP CONSTANTS
 # -----------------------------
@@ -27,49 +35,149 @@ pump_efficiency = 0.85
 pump_power_Wh = pump_power_rated / pump_efficiency
 min_runtime = 6             # minutes
 
+# Loaded models keyed by path, shared by every caller in the process
+_model_cache = {}
+_model_lock = threading.Lock()
+_warm_thread = None
+_gazetteer = []             # [Gazetteer or None] once loaded
+_gazetteer_lock = threading.Lock()      # separate from _model_lock, so lookups don't wait for a model load
+
+# Concurrent identical geocode/weather requests share one upstream call
+_single_flight = SingleFlight()
+
+
+def get_gazetteer():
+    """The bundled offline gazetteer, loaded once per process (None if it isn't built)."""
+    from gazetteer import load_gazetteer
+
+    with _gazetteer_lock:
+        if not _gazetteer:
+            try:
+                _gazetteer.append(load_gazetteer())
+            except FileNotFoundError:
+                _gazetteer.append(None)
+        return _gazetteer[0]
+
+
+@timed("geocode")
+def get_coordinates(place, offline=True, url=GEOCODE_URL):
+    """Find latitude and longitude for any city/town: the offline gazetteer first, then OpenStreetMap."""
+    if offline:
+        gazetteer = get_gazetteer()
+        match = gazetteer.resolve(place) if gazetteer is not None else None
+        if match is not None:
+            return match
+
+    key = f"geocode:{url}:" + " ".join(str(place).casefold().split())
+    return _single_flight.do(key, lambda: _geocode_nominatim(place, url), name="geocode",
+                             codec=(lambda match: match, lambda value: tuple(value) if value else None))
+
+
+def _geocode_nominatim(place, url):
+    import requests
 
-def get_coordinates(place):
-    """Find latitude and longitude for any city/town using OpenStreetMap."""
     params = {"q": place, "format": "json", "limit": 1}
-    response = requests.get(GEOCODE_URL, params=params, headers={"User-Agent": "solar-cooling-app"})
+    response = requests.get(url, params=params, headers={"User-Agent": "solar-cooling-app"})
+    response.raise_for_status()
     data = response.json()
     if not data:
         return None
     return float(data[0]["lat"]), float(data[0]["lon"]), data[0]["display_name"]
 
 
-def fetch_weather_data(lat, lon, year, month, day, hour):
-    """Fetch real hourly temperature and irradiance data from NASA POWER."""
-    start = f"{year}{month:02d}{day:02d}"
-    end = start
+@timed("weather_fetch")
+def fetch_weather_range(lat, lon, start_date, end_date):
+    """Fetch hourly temperature and irradiance for an inclusive date range from NASA POWER.
+
+    The Quality column flags each hour as measured, gap-filled or missing (see data_quality).
+    Concurrent calls for the same point and range share one request.
+    """
+    key = f"weather:{lat:.4f}:{lon:.4f}:{start_date:%Y%m%d}:{end_date:%Y%m%d}"
+    return _single_flight.do(key, lambda: _fetch_weather_range(lat, lon, start_date, end_date),
+                             name="weather", share=lambda df: df.copy(),
+                             codec=(_frame_to_json, _frame_from_json))
+
+
+def _frame_to_json(df):
+    """Weather frame as {column: [dtype, values]}, datetimes as int64 nanoseconds."""
+    data = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        data[column] = [str(values.dtype), (values.view("int64") if values.dtype.kind == "M" else values).tolist()]
+    return data
+
+
+def _frame_from_json(data):
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame({
+        column: np.asarray(values, dtype="int64" if np.dtype(dtype).kind == "M" else None).astype(dtype)
+        for column, (dtype, values) in data.items()
+    })
+
+
+def _fetch_weather_range(lat, lon, start_date, end_date):
+    import requests
+    import pandas as pd
+    from data_quality import clean_weather_frame
 
     params = {
         "latitude": lat,
         "longitude": lon,
         "community": "re",
         "parameters": "T2M,ALLSKY_SFC_SW_DWN",
-        "start": start,
-        "end": end,
+        "start": start_date.strftime("%Y%m%d"),
+        "end": end_date.strftime("%Y%m%d"),
         "format": "JSON"
     }
 
-    response = requests.get(BASE_URL, params=params)
-    data = response.json()
+    with timed("weather_http"):
+        response = requests.get(BASE_URL, params=params)
+        data = response.json()
 
     if "properties" not in data or "parameter" not in data["properties"]:
         raise ValueError("Failed to fetch data from NASA POWER API.")
 
-    df = pd.DataFrame(data["properties"]["parameter"])
-    df = df.rename(columns={"T2M": "Temperature", "ALLSKY_SFC_SW_DWN": "Irradiance"})
-    df["Hour"] = range(len(df))
+    with timed("weather_parse"):
+        df = pd.DataFrame(data["properties"]["parameter"])
+        df = df.rename(columns={"T2M": "Temperature", "ALLSKY_SFC_SW_DWN": "Irradiance"})
+        df["Timestamp"] = pd.to_datetime(df.index, format="%Y%m%d%H")
+        df = df.reset_index(drop=True)
+
+    # -999 fill values and missing hours: short gaps are filled, long ones left as NaN
+    with timed("weather_quality"):
+        return clean_weather_frame(df, lat, start_date=start_date, end_date=end_date)
+
+
+def fetch_weather_day(lat, lon, year, month, day):
+    """Fetch all 24 hourly temperature and irradiance values for one day from NASA POWER."""
+    from datetime import date
+
+    df = fetch_weather_range(lat, lon, date(year, month, day), date(year, month, day))
+    return df[["Hour", "Temperature", "Irradiance", "Quality"]]
 
-    if hour not in df["Hour"].values:
+
+def fetch_weather_data(lat, lon, year, month, day, hour):
+    """Fetch real hourly temperature and irradiance data from NASA POWER."""
+    df = fetch_weather_day(lat, lon, year, month, day)
+    return select_hour(df, hour)
+
+
+def select_hour(day_df, hour):
+    """Pick one hour's temperature and irradiance out of a fetch_weather_day frame."""
+    from data_quality import QUALITY_MISSING
+
+    if hour not in day_df["Hour"].values:
         raise ValueError("Hour out of range for data (0–23).")
 
-    row = df[df["Hour"] == hour]
+    row = day_df[day_df["Hour"] == hour]
+    if "Quality" in row and row["Quality"].iloc[0] == QUALITY_MISSING:
+        raise ValueError("NASA POWER has no usable data for this hour.")
     return row[["Temperature", "Irradiance"]].iloc[0].to_dict()
 
 
+@timed("physics")
 def physics_based_check(T_amb, G):
     """Compute panel temp, energy gain, and whether cooling is beneficial."""
     panel_temp = T_amb + ((NOCT - 20) / 800) * G
@@ -87,12 +195,94 @@ def physics_based_check(T_amb, G):
     return panel_temp, energy_gain, cooling_cost, should_cool, P_unc, P_cool
 
 
-def predict_from_model(T_amb, G, hour, model_path="models/cooling_decision_model.pkl"):
-    """Load trained model and predict output, aligned with training features."""
-    try:
-        model = joblib.load(model_path)
-    except FileNotFoundError:
-        return None, "Model file not found"
+# Constants physics_based_check_batch accepts as keyword overrides
+PARAMETER_NAMES = ("A_panel", "eta_ref", "beta", "NOCT", "T_target", "pump_power_rated", "pump_efficiency")
+
+
+def panel_parameters(**overrides):
+    """The panel and pump constants above, with any non-None overrides applied."""
+    unknown = set(overrides) - set(PARAMETER_NAMES)
+    if unknown:
+        raise TypeError(f"Unknown panel parameter(s): {', '.join(sorted(unknown))}")
+    params = {name: globals()[name] for name in PARAMETER_NAMES}
+    params.update({name: value for name, value in overrides.items() if value is not None})
+    return params
+
+
+@timed("physics_batch")
+def physics_based_check_batch(T_amb, G, **overrides):
+    """Vectorized physics_based_check over arrays of temperature and irradiance.
+
+    Panel and pump constants can be overridden by keyword (see PARAMETER_NAMES);
+    overrides may be arrays that broadcast against the weather, e.g. shaped
+    (configs, 1) to evaluate many configurations in one call.
+    """
+    import numpy as np
+
+    p = panel_parameters(**overrides)
+
+    T_amb = np.asarray(T_amb, dtype=float)
+    G = np.asarray(G, dtype=float)
+    panel_temp = T_amb + ((p["NOCT"] - 20) / 800) * G
+
+    eta_unc = np.maximum(p["eta_ref"] * (1 - p["beta"] * (panel_temp - 25)), 0)
+    P_unc = eta_unc * G * p["A_panel"]
+
+    eta_cool = np.maximum(p["eta_ref"] * (1 - p["beta"] * (p["T_target"] - 25)), 0)
+    P_cool = eta_cool * G * p["A_panel"]
+
+    energy_gain = P_cool - P_unc
+    pump_power = p["pump_power_rated"] / p["pump_efficiency"]
+    cooling_cost = np.broadcast_to(pump_power, energy_gain.shape).astype(float)
+
+    should_cool = energy_gain > cooling_cost
+    return panel_temp, energy_gain, cooling_cost, should_cool, P_unc, P_cool
+
+
+def default_model_path():
+    """Prefer the compact artifact when it has been exported, else the legacy pickle."""
+    if os.path.exists(f"{COMPACT_MODEL_PATH}.npy"):
+        return COMPACT_MODEL_PATH
+    return MODEL_PATH
+
+
+def get_model(model_path=None):
+    """Return the model at model_path, loading it at most once per process."""
+    from model_format import load_model
+
+    path = model_path or default_model_path()
+    with _model_lock:
+        if path not in _model_cache:
+            with timed("model_load"):
+                _model_cache[path] = load_model(path)
+        return _model_cache[path]
+
+
+def warm_model_cache(model_path=None):
+    """Load the model on a background thread so the first prediction doesn't pay for it."""
+    global _warm_thread
+
+    def warm():
+        try:
+            get_model(model_path)
+        except FileNotFoundError:
+            pass
+
+    with _model_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=warm, name="warm-model-cache", daemon=True)
+            _warm_thread.start()
+        return _warm_thread
+
+
+@timed("predict")
+def predict_from_model(T_amb, G, hour, model_path=None, model=None):
+    """Load trained model (unless one is passed in) and predict output, aligned with training features."""
+    if model is None:
+        try:
+            model = get_model(model_path)
+        except FileNotFoundError:
+            return None, "Model file not found"
 
     panel_temp = T_amb + ((NOCT - 20) / 800) * G
 
@@ -103,7 +293,45 @@ def predict_from_model(T_amb, G, hour, model_path="models/cooling_decision_model
         "panel_temp": panel_temp
     }
 
+    from model_format import CompactForest
+
     feature_order = model.feature_names_in_
-    features_aligned = pd.DataFrame([[features_dict[f] for f in feature_order]], columns=feature_order)
+    features_aligned = [[features_dict[f] for f in feature_order]]
+    if not isinstance(model, CompactForest):
+        # scikit-learn models were fitted on a DataFrame and expect named columns
+        import pandas as pd
+        features_aligned = pd.DataFrame(features_aligned, columns=feature_order)
 
     return model.predict(features_aligned)[0], None
+
+
+@timed("predict_batch")
+def predict_from_model_batch(T_amb, G, hour, model_path=None, model=None):
+    """Vectorized predict_from_model: one model call for arrays of inputs."""
+    import numpy as np
+    from model_format import CompactForest
+
+    if model is None:
+        try:
+            model = get_model(model_path)
+        except FileNotFoundError:
+            return None, "Model file not found"
+
+    T_amb = np.asarray(T_amb, dtype=float)
+    G = np.asarray(G, dtype=float)
+    hour = np.broadcast_to(np.asarray(hour, dtype=float), T_amb.shape)
+
+    features_dict = {
+        "AmbientTemp_C": T_amb,
+        "Irradiance_Wm2": G,
+        "hour": hour,
+        "panel_temp": T_amb + ((NOCT - 20) / 800) * G
+    }
+
+    feature_order = model.feature_names_in_
+    features_aligned = np.column_stack([features_dict[f] for f in feature_order])
+    if not isinstance(model, CompactForest):
+        import pandas as pd
+        features_aligned = pd.DataFrame(features_aligned, columns=feature_order)
+
+    return np.asarray(model.predict(features_aligned)), None
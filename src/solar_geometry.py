@@ -0,0 +1,179 @@
+"""
+Solar Geometry
+Sun position, extraterrestrial irradiance and clear-sky GHI as pure NumPy,
+so every function broadcasts over arrays.
+
+NASA POWER hourly data is stamped in local solar time (its default LST time
+standard), so the solar hour is simply the clock hour of those timestamps.
+UTC timestamps are converted with the site longitude and the equation of
+time. Formulas are Spencer (1971) Fourier series for declination, Earth-Sun
+distance and the equation of time; clear-sky GHI is the Haurwitz (1945)
+model, which needs no atmospheric inputs.
+
+solar_position() evaluates a (sites, times) grid by computing everything that
+depends only on the time or only on the site once, leaving a few
+multiply-adds per pair, so it handles millions of pairs per second:
+
+    cos_z, azimuth = solar_position(lats, lons, times)
+    G = clear_sky_ghi(cos_z)
+    physics_based_check_batch(T_amb, G)
+"""
+
+import numpy as np
+
+SOLAR_CONSTANT = 1361.0     # W/m²
+
+
+# -----------------------------
+# CALENDAR HELPERS
+# -----------------------------
+
+def day_of_year(times):
+    """Day of year (1-366) of datetime64 values."""
+    times = np.asarray(times, dtype="datetime64[s]")
+    return (times.astype("datetime64[D]") - times.astype("datetime64[Y]")).astype(int) + 1
+
+
+def hour_of_day(times):
+    """Fractional hour of day (0-24) of datetime64 values."""
+    times = np.asarray(times, dtype="datetime64[s]")
+    return (times - times.astype("datetime64[D]")).astype(float) / 3600
+
+
+def _day_angle(doy):
+    return 2 * np.pi * (np.asarray(doy, dtype=float) - 1) / 365
+
+
+# -----------------------------
+# SUN POSITION
+# -----------------------------
+
+def declination(doy):
+    """Solar declination in radians."""
+    g = _day_angle(doy)
+    return (0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g)
+            - 0.006758 * np.cos(2 * g) + 0.000907 * np.sin(2 * g)
+            - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g))
+
+
+def eccentricity(doy):
+    """Earth-Sun distance correction factor (r0/r)²."""
+    g = _day_angle(doy)
+    return (1.000110 + 0.034221 * np.cos(g) + 0.001280 * np.sin(g)
+            + 0.000719 * np.cos(2 * g) + 0.000077 * np.sin(2 * g))
+
+
+def equation_of_time(doy):
+    """Equation of time in minutes (apparent minus mean solar time)."""
+    g = _day_angle(doy)
+    return 229.18 * (0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+                     - 0.014615 * np.cos(2 * g) - 0.040849 * np.sin(2 * g))
+
+
+def hour_angle(solar_hour):
+    """Hour angle in radians; zero at solar noon, positive in the afternoon."""
+    return np.radians(15.0 * (np.asarray(solar_hour, dtype=float) - 12.0))
+
+
+def cos_zenith(lat, doy, solar_hour):
+    """Cosine of the solar zenith angle (negative when the sun is below the horizon)."""
+    phi = np.radians(lat)
+    delta = declination(doy)
+    return np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(hour_angle(solar_hour))
+
+
+# -----------------------------
+# EXTRATERRESTRIAL IRRADIANCE
+# -----------------------------
+
+def extraterrestrial_horizontal(lat, doy, solar_hour):
+    """Instantaneous top-of-atmosphere irradiance on a horizontal plane, W/m²."""
+    return SOLAR_CONSTANT * eccentricity(doy) * np.maximum(cos_zenith(lat, doy, solar_hour), 0.0)
+
+
+def extraterrestrial_horizontal_mean(lat, doy, start_hour, end_hour):
+    """Mean top-of-atmosphere horizontal irradiance between two solar hours, W/m².
+
+    Integrates cos(zenith) analytically over the hour angle, clipped to
+    sunrise/sunset, so hourly averages near the horizon are exact.
+    """
+    phi = np.radians(lat)
+    delta = declination(doy)
+    sunset = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1.0, 1.0))
+
+    w1 = np.clip(hour_angle(start_hour), -sunset, sunset)
+    w2 = np.clip(hour_angle(end_hour), -sunset, sunset)
+    integral = (np.sin(phi) * np.sin(delta) * (w2 - w1)
+                + np.cos(phi) * np.cos(delta) * (np.sin(w2) - np.sin(w1)))
+    span = hour_angle(end_hour) - hour_angle(start_hour)
+    return SOLAR_CONSTANT * eccentricity(doy) * np.maximum(integral, 0.0) / span
+
+
+# -----------------------------
+# SITE × TIME GRIDS
+# -----------------------------
+
+def solar_position(lat, lon, times, utc=False, azimuth=True):
+    """Cosine of zenith and azimuth (degrees clockwise from north) on a (sites, times) grid.
+
+    lat and lon are scalars or (sites,) arrays; times is a datetime64 array in
+    local solar time, or UTC when utc=True. Returns (cos_zenith, azimuth),
+    with azimuth None when azimuth=False.
+    """
+    times = np.asarray(times, dtype="datetime64[s]").ravel()
+    lat = np.atleast_1d(np.asarray(lat, dtype=float))[:, None]
+    lon = np.atleast_1d(np.asarray(lon, dtype=float))[:, None]
+
+    # Per-time terms
+    doy = day_of_year(times)
+    solar_hour = hour_of_day(times)
+    if utc:
+        solar_hour = solar_hour + equation_of_time(doy) / 60
+    delta = declination(doy)
+    omega = hour_angle(solar_hour)
+    sin_delta, cos_delta = np.sin(delta), np.cos(delta)
+    cos_omega, sin_omega = np.cos(omega), np.sin(omega)
+
+    # Per-site terms
+    phi = np.radians(lat)
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+
+    if utc:
+        # Shift the hour angle by the longitude: cos(w + l) and sin(w + l) as outer products
+        lam = np.radians(lon)
+        cos_lam, sin_lam = np.cos(lam), np.sin(lam)
+        cos_w = cos_omega * cos_lam - sin_omega * sin_lam
+        sin_w = sin_omega * cos_lam + cos_omega * sin_lam
+    else:
+        cos_w = np.broadcast_to(cos_omega, (lat.shape[0], times.shape[0]))
+        sin_w = np.broadcast_to(sin_omega, (lat.shape[0], times.shape[0]))
+
+    cos_z = sin_phi * sin_delta + (cos_phi * cos_delta) * cos_w
+    if not azimuth:
+        return cos_z, None
+
+    az = np.degrees(np.arctan2(sin_w, cos_w * sin_phi - (sin_delta / cos_delta) * cos_phi)) + 180.0
+    return cos_z, az % 360.0
+
+
+def zenith(cos_z):
+    """Zenith angle in degrees from its cosine."""
+    return np.degrees(np.arccos(np.clip(cos_z, -1.0, 1.0)))
+
+
+# -----------------------------
+# CLEAR-SKY IRRADIANCE
+# -----------------------------
+
+def clear_sky_ghi(cos_z):
+    """Haurwitz clear-sky global horizontal irradiance in W/m² (0 when the sun is down)."""
+    cos_z = np.asarray(cos_z, dtype=float)
+    up = cos_z > 0.01
+    safe = np.where(up, cos_z, 1.0)
+    return np.where(up, 1098.0 * safe * np.exp(-0.057 / safe), 0.0)
+
+
+def clear_sky_grid(lat, lon, times, utc=False):
+    """Clear-sky GHI on a (sites, times) grid, ready for physics_based_check_batch."""
+    cos_z, _ = solar_position(lat, lon, times, utc=utc, azimuth=False)
+    return clear_sky_ghi(cos_z)
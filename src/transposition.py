@@ -0,0 +1,145 @@
+"""
+Plane-of-Array Transposition
+Converts horizontal irradiance (NASA POWER ALLSKY_SFC_SW_DWN) into the
+irradiance on tilted, oriented panels, for whole fleets at once.
+
+1. Solar position per site is computed once and cached (solar_geometry).
+2. GHI is split into beam and diffuse with the Erbs (1982) correlation,
+   also once per site.
+3. Each panel orientation then costs a few multiply-adds per time step:
+   beam on the plane via the angle of incidence, isotropic sky diffuse and
+   ground-reflected light.
+
+    components = site_components(lats, lons, times, ghi)          # (sites, times)
+    G_poa = plane_of_array(components, tilt, azimuth, site_index)   # (panels, times)
+    physics_based_check_batch(T_amb[site_index], G_poa)
+
+Azimuths are degrees clockwise from north (180 = facing south); tilt is
+degrees from horizontal.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from solar_geometry import SOLAR_CONSTANT, day_of_year, eccentricity, solar_position
+
+ALBEDO = 0.2
+MIN_COS_ZENITH = 0.065      # below ~86° zenith all irradiance is treated as diffuse
+POSITION_CACHE_SIZE = 64
+
+# NASA POWER hourly irradiance is the mean over the hour starting at the stamp,
+# so its sun position is taken at the middle of the hour
+HOUR_CENTER = np.timedelta64(30, "m")
+
+_position_cache = OrderedDict()
+_position_lock = threading.Lock()
+
+
+# -----------------------------
+# SOLAR POSITION CACHE
+# -----------------------------
+
+def cached_solar_position(lat, lon, times, utc=False):
+    """solar_position() for (sites, times), memoized on the exact inputs."""
+    lat = np.atleast_1d(np.asarray(lat, dtype=float))
+    lon = np.atleast_1d(np.asarray(lon, dtype=float))
+    times = np.asarray(times, dtype="datetime64[s]").ravel()
+    key = (lat.tobytes(), lon.tobytes(), times.tobytes(), utc)
+
+    with _position_lock:
+        if key in _position_cache:
+            _position_cache.move_to_end(key)
+            return _position_cache[key]
+
+    position = solar_position(lat, lon, times, utc=utc)
+    with _position_lock:
+        _position_cache[key] = position
+        while len(_position_cache) > POSITION_CACHE_SIZE:
+            _position_cache.popitem(last=False)
+    return position
+
+
+# -----------------------------
+# DECOMPOSITION
+# -----------------------------
+
+def erbs_diffuse_fraction(kt):
+    """Diffuse fraction of GHI from the clearness index (Erbs et al. 1982)."""
+    kt = np.clip(kt, 0.0, 1.0)
+    middle = 0.9511 - 0.1604 * kt + 4.388 * kt ** 2 - 16.638 * kt ** 3 + 12.336 * kt ** 4
+    return np.where(kt <= 0.22, 1.0 - 0.09 * kt, np.where(kt <= 0.80, middle, 0.165))
+
+
+def decompose(ghi, cos_z, doy):
+    """Split GHI into (DNI, DHI) in W/m²."""
+    ghi = np.maximum(np.asarray(ghi, dtype=float), 0.0)
+    sun_up = cos_z > MIN_COS_ZENITH
+    safe_cos = np.where(sun_up, cos_z, 1.0)
+
+    kt = ghi / (SOLAR_CONSTANT * eccentricity(doy) * safe_cos)
+    dhi = np.where(sun_up, ghi * erbs_diffuse_fraction(kt), ghi)
+    dni = np.where(sun_up, (ghi - dhi) / safe_cos, 0.0)
+    return dni, dhi
+
+
+def site_components(lat, lon, times, ghi, utc=False, hourly_means=True):
+    """Per-site irradiance components shared by every panel orientation at the site.
+
+    ghi is (times,) or (sites, times). Set hourly_means=False for instantaneous
+    (e.g. resampled sub-hourly) series. Returns a dict of (sites, times) arrays.
+    """
+    times = np.asarray(times, dtype="datetime64[s]").ravel()
+    if hourly_means:
+        times = times + HOUR_CENTER
+    cos_z, azimuth = cached_solar_position(lat, lon, times, utc=utc)
+    ghi = np.atleast_2d(np.asarray(ghi, dtype=float))
+
+    dni, dhi = decompose(ghi, cos_z, day_of_year(times))
+    sin_z = np.sqrt(np.maximum(1.0 - cos_z ** 2, 0.0))
+    az = np.radians(azimuth)
+    return {
+        "ghi": ghi,
+        "dni": dni,
+        "dhi": dhi,
+        # Sun direction, so cos(AOI) = cos_z·cos(tilt) + sin(tilt)·(east·sin(az_p) + north·cos(az_p))
+        "sun_up": np.maximum(cos_z, 0.0),
+        "sun_east": sin_z * np.sin(az),
+        "sun_north": sin_z * np.cos(az),
+    }
+
+
+# -----------------------------
+# TRANSPOSITION
+# -----------------------------
+
+def plane_of_array(components, tilt, azimuth, site_index=None, albedo=ALBEDO):
+    """Plane-of-array irradiance in W/m², shaped (panels, times).
+
+    tilt and azimuth are per-panel arrays (or scalars); site_index maps each
+    panel to its row in components (default: panel i sits at site i, or all
+    panels at the single site).
+    """
+    tilt = np.radians(np.atleast_1d(np.asarray(tilt, dtype=float)))
+    azimuth = np.radians(np.atleast_1d(np.asarray(azimuth, dtype=float)))
+    tilt, azimuth = np.broadcast_arrays(tilt, azimuth)
+
+    n_sites = components["ghi"].shape[0]
+    if site_index is None:
+        site_index = np.zeros(len(tilt), dtype=int) if n_sites == 1 else np.arange(n_sites)
+    site_index = np.asarray(site_index)
+    if n_sites == 1 and len(tilt) > 1:
+        # One site: keep the per-site rows as views and let broadcasting do the rest
+        pick = lambda name: components[name]
+    else:
+        pick = lambda name: components[name][site_index]
+
+    cos_t, sin_t = np.cos(tilt)[:, None], np.sin(tilt)[:, None]
+    cos_aoi = (pick("sun_up") * cos_t
+               + sin_t * (pick("sun_east") * np.sin(azimuth)[:, None] + pick("sun_north") * np.cos(azimuth)[:, None]))
+
+    beam = pick("dni") * np.maximum(cos_aoi, 0.0)
+    sky = pick("dhi") * (1 + cos_t) / 2
+    ground = pick("ghi") * albedo * (1 - cos_t) / 2
+    return beam + sky + ground
@@ -0,0 +1,197 @@
+"""
+Monte Carlo Uncertainty for Cooling Decisions
+physics_based_check gives one deterministic yes/no. This module draws
+thousands of samples of the sensor noise modelled in MLdataforsolar.py for
+each input and reports how likely cooling is to pay off, with intervals on
+the net gain:
+
+- irradiance sensor ±15 W/m² (clipped at 0)
+- ambient temperature sensor ±0.5 °C
+- panel temperature sensor ±2 °C
+- wind cooling of 0-5 m/s × 0.3 °C per m/s
+
+Each input gets its own child seed from numpy.random.SeedSequence(seed).spawn(),
+so results are identical however the inputs are chunked and however many
+worker processes are used.
+
+Usage:
+    python src/uncertainty.py --T-amb 38 --G 900
+    python src/uncertainty.py dev/data_raw/phoenix_data.csv --output phoenix_uncertainty.csv --workers 4
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from solar_cooling import NOCT, physics_based_check_batch
+
+# Sensor and environment noise, as in dev/data_generation/MLdataforsolar.py
+IRRADIANCE_SIGMA = 15.0         # W/m²
+AMBIENT_SIGMA = 0.5             # °C
+PANEL_SIGMA = 2.0               # °C
+WIND_SPEED_MAX = 5.0            # m/s
+WIND_COOLING = 0.3              # °C per m/s
+
+DEFAULT_SAMPLES = 2000
+CHUNK_INPUTS = 512              # inputs per chunk (and per child seed)
+
+
+# -----------------------------
+# SAMPLING
+# -----------------------------
+
+def sample_net_gain(T_amb, G, n_samples, rng):
+    """Net gain (W) for n_samples noisy draws of each input, shaped (inputs, n_samples).
+
+    rng is one Generator for all inputs, or a sequence with one Generator per input.
+    """
+    T_amb = np.asarray(T_amb, dtype=float)[:, None]
+    G = np.asarray(G, dtype=float)[:, None]
+    shape = (T_amb.shape[0], n_samples)
+
+    if isinstance(rng, np.random.Generator):
+        def draw(method, low, high):
+            return getattr(rng, method)(low, high, shape)
+    else:
+        def draw(method, low, high):
+            return np.stack([getattr(r, method)(low, high, n_samples) for r in rng]).reshape(shape)
+
+    G_s = np.maximum(G + draw("normal", 0.0, IRRADIANCE_SIGMA), 0.0)
+    T_s = T_amb + draw("normal", 0.0, AMBIENT_SIGMA)
+    # Panel sensor error and wind cooling shift the panel temperature directly;
+    # folding them into the ambient term leaves physics_based_check unchanged
+    T_s += draw("normal", 0.0, PANEL_SIGMA) - draw("uniform", 0.0, WIND_SPEED_MAX) * WIND_COOLING
+
+    _, energy_gain, cooling_cost, _, _, _ = physics_based_check_batch(T_s, G_s)
+    return energy_gain - cooling_cost
+
+
+def summarize(net, confidence=0.95):
+    """Probability that cooling pays off and intervals on net gain, per input row."""
+    n = net.shape[1]
+    p = (net > 0).mean(axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(net, [tail, 100 - tail], axis=1)
+
+    # Wilson score interval on the probability (Monte Carlo error)
+    z = {0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758}.get(confidence, 1.96)
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+
+    mean = net.mean(axis=1)
+    stderr = net.std(axis=1, ddof=1) / np.sqrt(n)
+    return {
+        "p_cool": p,
+        "p_cool_low": np.clip(centre - half, 0, 1),
+        "p_cool_high": np.clip(centre + half, 0, 1),
+        "net_gain_mean": mean,
+        "net_gain_mean_low": mean - z * stderr,
+        "net_gain_mean_high": mean + z * stderr,
+        "net_gain_low": low,
+        "net_gain_high": high,
+    }
+
+
+def _run_chunk(T_amb, G, n_samples, seeds, confidence):
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    return summarize(sample_net_gain(T_amb, G, n_samples, rngs), confidence)
+
+
+# -----------------------------
+# PUBLIC API
+# -----------------------------
+
+def cooling_uncertainty(T_amb, G, n_samples=DEFAULT_SAMPLES, seed=0, confidence=0.95,
+                        workers=1, chunk_inputs=CHUNK_INPUTS):
+    """Monte Carlo cooling decision for arrays of inputs; returns a dict of (inputs,) arrays.
+
+    Keys: p_cool (+ _low/_high Wilson interval), net_gain_mean (+ _low/_high
+    interval on the mean), net_gain_low/high (central `confidence` band of the
+    net gain itself) and should_cool (the deterministic decision).
+
+    Raises ValueError for empty inputs, T_amb and G of different lengths
+    (a single value is broadcast), fewer than 2 samples or chunk_inputs < 1.
+    """
+    T_amb = np.atleast_1d(np.asarray(T_amb, dtype=float))
+    G = np.atleast_1d(np.asarray(G, dtype=float))
+    if T_amb.ndim != 1 or G.ndim != 1:
+        raise ValueError("T_amb and G must be scalars or 1-D arrays.")
+    if len(T_amb) == 0 or len(G) == 0:
+        raise ValueError("T_amb and G must not be empty.")
+    if len(T_amb) != len(G) and 1 not in (len(T_amb), len(G)):
+        raise ValueError(f"T_amb and G have different lengths ({len(T_amb)} and {len(G)}).")
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2.")
+    if chunk_inputs < 1:
+        raise ValueError("chunk_inputs must be at least 1.")
+    T_amb, G = np.broadcast_arrays(T_amb, G)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(T_amb))
+    jobs = [(T_amb[s:s + chunk_inputs], G[s:s + chunk_inputs], n_samples, seeds[s:s + chunk_inputs], confidence)
+            for s in range(0, len(T_amb), chunk_inputs)]
+
+    if workers <= 1 or len(jobs) == 1:
+        parts = [_run_chunk(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, *zip(*jobs)))
+
+    result = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    result["should_cool"] = physics_based_check_batch(T_amb, G)[3]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo probability that cooling pays off.")
+    parser.add_argument("input", nargs="?", help="Region CSV (Hour, Irradiance_Wm2, AmbientTemp_C)")
+    parser.add_argument("--T-amb", type=float, help="Single ambient temperature (°C)")
+    parser.add_argument("--G", type=float, help="Single irradiance (W/m²)")
+    parser.add_argument("--output", help="CSV for per-row results")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.input:
+        from resample import read_hourly
+        times, T_amb, G = read_hourly(args.input)
+    elif args.T_amb is not None and args.G is not None:
+        times, T_amb, G = None, np.array([args.T_amb]), np.array([args.G])
+    else:
+        parser.error("Pass an input CSV or both --T-amb and --G.")
+
+    start = time.perf_counter()
+    result = cooling_uncertainty(T_amb, G, args.samples, args.seed, workers=args.workers)
+    seconds = time.perf_counter() - start
+
+    print("=" * 70)
+    print(f"🎲 COOLING UNCERTAINTY · {len(T_amb):,} inputs × {args.samples:,} samples")
+    print("=" * 70)
+    if len(T_amb) == 1:
+        print(f"Panel temperature:   {T_amb[0] + (NOCT - 20) / 800 * G[0]:.1f} °C (nominal)")
+        decision = "COOL" if result["should_cool"][0] else "DON'T COOL"
+        print(f"Deterministic:       {decision}")
+        print(f"P(cooling pays off): {result['p_cool'][0]:.1%} "
+              f"[{result['p_cool_low'][0]:.1%}, {result['p_cool_high'][0]:.1%}]")
+        print(f"Net gain:            {result['net_gain_mean'][0]:+.2f} W mean, "
+              f"95% band [{result['net_gain_low'][0]:+.2f}, {result['net_gain_high'][0]:+.2f}] W")
+    else:
+        uncertain = (result["p_cool"] > 0.05) & (result["p_cool"] < 0.95)
+        print(f"Deterministic cooling hours: {int(result['should_cool'].sum()):,}")
+        print(f"Expected cooling hours:      {result['p_cool'].sum():,.1f}")
+        print(f"Uncertain hours (5-95%):     {int(uncertain.sum()):,}")
+    print(f"\n⚡ {len(T_amb) * args.samples / seconds:,.0f} samples/s with {args.workers} worker(s)")
+
+    if args.output:
+        import pandas as pd
+        table = pd.DataFrame({"T_amb": T_amb, "G": G, **result})
+        if times is not None:
+            table.insert(0, "Timestamp", times)
+        table.to_csv(args.output, index=False)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
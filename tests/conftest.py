@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The modules under src/ import each other by bare name, as the app and scripts do
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Keep test runs away from the shared geocode checkpoint and single-flight directory
+_scratch = tempfile.TemporaryDirectory(prefix="solar-cooling-tests-")
+os.environ["SOLAR_GEOCODE_CHECKPOINT"] = os.path.join(_scratch.name, "geocode_cache.jsonl")
+os.environ["SOLAR_SINGLEFLIGHT_DIR"] = ""
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import benefit_map
+from benefit_map import DEFAULT_CACHE_DIR, DEFAULT_MAP_DIR, build_map, list_maps, load_map, resolve_output
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def fake_fetch(lat, lon, start, end):
+    hours = pd.date_range(start, periods=48, freq="h")
+    G = np.clip(800 * np.sin(np.pi * (hours.hour - 6) / 12), 0, None)
+    return pd.DataFrame({"Temperature": 25 + G / 100, "Irradiance": G}, index=hours)
+
+
+def test_default_dirs_are_anchored_to_the_repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert os.path.abspath(DEFAULT_MAP_DIR) == os.path.join(REPO_ROOT, "maps")
+    assert os.path.abspath(DEFAULT_CACHE_DIR) == os.path.join(REPO_ROOT, "weather_tiles")
+
+
+def test_bare_output_name_goes_into_the_map_dir(tmp_path):
+    assert resolve_output("arizona", str(tmp_path)) == os.path.join(str(tmp_path), "arizona")
+    assert resolve_output(os.path.join("elsewhere", "arizona"), str(tmp_path)) == os.path.join("elsewhere", "arizona")
+
+
+def test_built_map_is_listed_and_loads(tmp_path):
+    map_dir, cache_dir = tmp_path / "maps", tmp_path / "tiles"
+    output = resolve_output("box", str(map_dir))
+    raster, failed = build_map((33.0, -112.0, 33.6, -111.4), 2023, output, str(cache_dir),
+                               fetch=fake_fetch, max_workers=2)
+    assert failed == []
+    assert list_maps(str(map_dir)) == [output]
+    header, loaded, lats, lons = load_map(output)
+    assert loaded.shape == raster.shape == (len(benefit_map.LAYERS), len(lats), len(lons))
+    assert np.isfinite(loaded).all()
@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+
+import pytest
+
+from bulk_geocoder import BulkGeocoder, Checkpoint, normalize_place, shared_bucket
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "dev", "benchmarks"))
+from geocode_standin import start_standin, synthetic_places  # noqa: E402
+
+RATE = 20.0
+
+
+@pytest.fixture
+def standin():
+    # Generous arrival tolerance: the client paces requests, the stand-in only catches bursts
+    server = start_standin(0, RATE, tolerance=0.5)
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/search"
+    server.shutdown()
+    server.server_close()
+
+
+def test_normalize_place():
+    assert normalize_place("  Phoenix,AZ ") == normalize_place("phoenix ,  az") == "phoenix, az"
+
+
+def test_resumed_run_respects_rate_and_never_repeats(standin, tmp_path):
+    server, url = standin
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    places = synthetic_places(60) + ["Nowhere Junction, AZ", "  nowhere junction ,az"]
+    distinct = {normalize_place(p) for p in places}
+
+    first = []
+    for result in BulkGeocoder(checkpoint, url, RATE).geocode(places):
+        first.append(result)
+        if sum(r["source"] == "nominatim" for r in first) == 8:
+            break       # simulated crash
+    second = list(BulkGeocoder(checkpoint, url, RATE).geocode(places))
+
+    # Every distinct place exactly once per full run, whatever its spelling
+    assert sorted(r["key"] for r in second) == sorted(distinct)
+    assert not any(r["source"] == "error" for r in first + second)
+    looked_up = {r["key"] for r in first if r["source"] == "nominatim"}
+    assert all(r["source"] == "checkpoint" for r in second if r["key"] in looked_up)
+
+    assert server.rejected == 0
+    queried = [normalize_place(q) for q in server.queries]
+    assert len(queried) == len(set(queried))
+
+    # "Not found" answers are checkpointed too, so they aren't asked again
+    with open(checkpoint, encoding="utf-8") as f:
+        records = {r["key"]: r for r in map(json.loads, f)}
+    assert records["nowhere junction, az"]["lat"] is None
+    assert len(Checkpoint(checkpoint, url)) == len(records)
+    assert len(Checkpoint(checkpoint, "https://elsewhere.example/search")) == 0
+
+
+def test_shared_bucket_rejects_a_second_rate():
+    url = "http://127.0.0.1:9/rate-check"
+    assert shared_bucket(url, 5.0) is shared_bucket(url, 5.0)
+    with pytest.raises(ValueError):
+        shared_bucket(url, 2.0)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_quality import (FILL_VALUE, MIN_EXTRATERRESTRIAL, QUALITY_FILLED, QUALITY_MISSING, QUALITY_OK,
+                          clean_weather_frame, fill_gaps, run_lengths)
+from solar_cooling import select_hour
+from solar_geometry import day_of_year, extraterrestrial_horizontal_mean, hour_of_day
+
+LAT = 33.45
+TIMES = np.arange("2022-06-14T00", "2022-06-17T00", dtype="datetime64[h]")
+
+
+def weather():
+    start = hour_of_day(TIMES)
+    reference = extraterrestrial_horizontal_mean(LAT, day_of_year(TIMES), start, start + 1)
+    T_amb = 30 + 8 * np.sin((start - 9) / 24 * 2 * np.pi)
+    return T_amb, 0.7 * reference, reference > MIN_EXTRATERRESTRIAL
+
+
+def test_run_lengths():
+    mask = np.array([False, True, True, False, True, True, True])
+    np.testing.assert_array_equal(run_lengths(mask), [0, 2, 2, 0, 3, 3, 3])
+    # Runs never continue from one site's last hour into the next site's first
+    sites = np.array([[False, True, True], [True, True, False]])
+    np.testing.assert_array_equal(run_lengths(sites), [[0, 2, 2], [2, 2, 0]])
+    np.testing.assert_array_equal(run_lengths(np.ones((2, 2, 3), dtype=bool)), np.full((2, 2, 3), 3))
+    np.testing.assert_array_equal(run_lengths(np.zeros(4, dtype=bool)), np.zeros(4))
+
+
+def test_fill_gaps_with_leading_interior_and_trailing_gaps():
+    T_amb, G, sunlit = weather()
+    sunlit_hours = np.flatnonzero(sunlit)
+    T_in, G_in = T_amb.copy(), G.copy()
+
+    G_in[:3] = np.nan                                   # leading night gap
+    short = sunlit_hours[5:7]
+    G_in[short] = FILL_VALUE                            # interior 2-hour gap
+    long = sunlit_hours[20:26]
+    G_in[long] = FILL_VALUE                             # interior 6-hour gap
+    T_in[40:42] = np.nan                                # interior temperature gap
+    G_in[-8:] = FILL_VALUE                              # trailing gap into the last night
+    trailing_sunlit = np.arange(len(TIMES) - 8, len(TIMES))[sunlit[-8:]]
+    assert 0 < len(trailing_sunlit) <= 3
+
+    T_out, G_out, flags = fill_gaps(TIMES, T_in, G_in, LAT)
+
+    np.testing.assert_allclose(T_out[40:42], T_amb[40:42], atol=1.0)
+    np.testing.assert_allclose(G_out[short], G[short], rtol=1e-6)     # clear-sky index kept
+    assert (G_out[:3] == 0).all() and (G_out[-8:][~sunlit[-8:]] == 0).all()
+    np.testing.assert_allclose(G_out[trailing_sunlit], G[trailing_sunlit], rtol=1e-6)
+    assert np.isnan(G_out[long]).all()
+
+    expected = np.full(len(TIMES), QUALITY_OK)
+    expected[np.r_[0:3, short, 40:42, len(TIMES) - 8:len(TIMES)]] = QUALITY_FILLED
+    expected[long] = QUALITY_MISSING
+    np.testing.assert_array_equal(flags, expected)
+
+
+def test_trailing_night_hours_without_irradiance_are_usable():
+    T_amb, G, sunlit = weather()
+    df = pd.DataFrame({"Timestamp": pd.to_datetime(TIMES), "Temperature": T_amb,
+                       "Irradiance": np.where(TIMES >= TIMES[-6], FILL_VALUE, G)})
+    df = df.iloc[2:-1]                                  # first hours and the last one absent too
+    day = clean_weather_frame(df, LAT, start_date=TIMES[0], end_date=TIMES[-1])
+    assert len(day) == len(TIMES)
+
+    last_day = day[day["Timestamp"] >= pd.Timestamp("2022-06-16")].reset_index(drop=True)
+    assert select_hour(last_day, 22) == {"Temperature": pytest.approx(T_amb[-2]), "Irradiance": 0.0}
+    assert last_day["Quality"].iloc[-1] == QUALITY_FILLED           # absent, but within 3 hours of data
+    assert (day["Quality"].iloc[:2] == QUALITY_FILLED).all()
+    assert not (day["Quality"] == QUALITY_MISSING).any()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import decision_service
+from decision_service import BadRequest, DecisionService, parse_inputs
+
+
+@pytest.mark.parametrize("body", [
+    '{"T_amb": NaN, "G": 900, "hour": 12}',
+    '{"T_amb": 30, "G": Infinity, "hour": 12}',
+    '{"T_amb": 30, "G": 900, "hour": 24}',
+    '{"T_amb": 30, "G": 900, "hour": -1}',
+    '{"T_amb": 30, "G": true, "hour": 12}',
+    '{"T_amb": 30, "hour": 12}',
+    '{"inputs": []}',
+    'not json',
+])
+def test_parse_inputs_rejects(body):
+    with pytest.raises(BadRequest):
+        parse_inputs(body)
+
+
+def test_parse_inputs_accepts_single_and_batch():
+    assert parse_inputs('{"T_amb": 38.5, "G": 910, "hour": 23.5}') == ([{"T_amb": 38.5, "G": 910, "hour": 23.5}], False)
+    rows, is_batch = parse_inputs('{"inputs": [{"T_amb": 20, "G": 0, "hour": 0}, {"T_amb": 40, "G": 1000, "hour": 13}]}')
+    assert is_batch and len(rows) == 2
+
+
+async def _request(port, method, path, body=b"", headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = {"Content-Length": str(len(body)), "Connection": "close", **(headers or {})}
+    writer.write(f"{method} {path} HTTP/1.1\r\n".encode()
+                 + "".join(f"{k}: {v}\r\n" for k, v in head.items()).encode() + b"\r\n" + body)
+    response = await reader.read()
+    writer.close()
+    status_line, _, payload = response.partition(b"\r\n\r\n")
+    return int(status_line.split()[1]), payload
+
+
+def _with_service(scenario):
+    async def run():
+        service = DecisionService(model=None, max_wait_ms=1)
+        service.batcher.start()
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        try:
+            return await scenario(server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            await service.batcher.stop()
+    return asyncio.run(run())
+
+
+def test_service_answers_finite_json_and_rejects_bad_input():
+    async def scenario(port):
+        status, payload = await _request(port, "POST", "/decide", b'{"T_amb": 38.5, "G": 910, "hour": 14}')
+        assert status == 200
+        result = json.loads(payload)        # strict parse: no NaN/Infinity tokens
+        assert isinstance(result["should_cool"], bool) and result["ml_prediction"] is None
+
+        assert (await _request(port, "POST", "/decide", b'{"T_amb": NaN, "G": 910, "hour": 14}'))[0] == 400
+        assert (await _request(port, "POST", "/decide", b'{"T_amb": 30, "G": 910, "hour": 24}'))[0] == 400
+        assert (await _request(port, "POST", "/decide", b"", {"Content-Length": "-5"}))[0] == 400
+        assert (await _request(port, "POST", "/decide", b"", {"Content-Length": "abc"}))[0] == 400
+
+    _with_service(scenario)
+
+
+def test_large_batch_does_not_block_other_connections(monkeypatch):
+    score = decision_service.decide_batch
+
+    def slow_decide_batch(rows, model=None):
+        time.sleep(0.5)
+        return score(rows, model)
+
+    monkeypatch.setattr(decision_service, "decide_batch", slow_decide_batch)
+
+    async def scenario(port):
+        batch = json.dumps({"inputs": [{"T_amb": 35, "G": 900, "hour": 12}] * 1000}).encode()
+        start = time.perf_counter()
+        decide = asyncio.create_task(_request(port, "POST", "/decide", batch))
+        await asyncio.sleep(0.1)
+        status, _ = await _request(port, "GET", "/health")
+        # Answered while the 0.5 s batch is still being scored
+        assert status == 200 and time.perf_counter() - start < 0.4
+        status, payload = await decide
+        assert status == 200 and len(json.loads(payload)["results"]) == 1000
+
+    _with_service(scenario)
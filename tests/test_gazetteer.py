@@ -0,0 +1,94 @@
+import os
+import sys
+
+import pytest
+
+import solar_cooling
+from gazetteer import load_gazetteer, normalize_name, save_gazetteer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "dev", "benchmarks"))
+from geocode_standin import start_standin  # noqa: E402
+
+PLACES = [
+    {"name": "Phoenix", "label": "Phoenix, Arizona, United States", "country": "US", "admin1": "AZ",
+     "lat": 33.45, "lon": -112.07, "population": 1_600_000},
+    {"name": "Phoenix", "label": "Phoenix, Oregon, United States", "country": "US", "admin1": "OR",
+     "lat": 42.28, "lon": -122.82, "population": 4_500},
+    {"name": "Phoenixville", "label": "Phoenixville, Pennsylvania, United States", "country": "US",
+     "admin1": "PA", "lat": 40.13, "lon": -75.51, "population": 18_000},
+    {"name": "Paris", "label": "Paris, Île-de-France, France", "country": "FR", "admin1": "11",
+     "lat": 48.86, "lon": 2.35, "population": 2_100_000},
+    {"name": "Paris", "label": "Paris, Texas, United States", "country": "US", "admin1": "TX",
+     "lat": 33.66, "lon": -95.56, "population": 25_000},
+    {"name": "Zürich", "label": "Zürich, Zurich, Switzerland", "country": "CH", "admin1": "ZH",
+     "lat": 47.37, "lon": 8.54, "population": 400_000},
+]
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    base = str(tmp_path / "gazetteer")
+    save_gazetteer(base, PLACES, "test places")
+    return load_gazetteer(base)
+
+
+def test_normalize_name():
+    assert normalize_name("  Zürich!") == "zurich"
+    assert normalize_name("Winston-Salem") == "winston salem"
+
+
+def test_complete_orders_prefix_matches_by_population(gazetteer):
+    assert gazetteer.complete("pho") == ["Phoenix, Arizona, United States",
+                                         "Phoenixville, Pennsylvania, United States",
+                                         "Phoenix, Oregon, United States"]
+    assert gazetteer.complete("Phoenix, OR", limit=2) == ["Phoenix, Arizona, United States",
+                                                          "Phoenixville, Pennsylvania, United States"]
+    assert gazetteer.complete("zur") == ["Zürich, Zurich, Switzerland"]
+    assert gazetteer.complete("xyz") == gazetteer.complete("  ") == []
+
+
+@pytest.mark.parametrize("place, label", [
+    ("Phoenix", "Phoenix, Arizona, United States"),
+    ("Phoenix, AZ", "Phoenix, Arizona, United States"),
+    ("phoenix, arizona", "Phoenix, Arizona, United States"),
+    ("Phoenix, OR, USA", "Phoenix, Oregon, United States"),
+    ("Phoenix, Oregon", "Phoenix, Oregon, United States"),
+    ("Paris", "Paris, Île-de-France, France"),
+    ("Paris, TX", "Paris, Texas, United States"),
+    ("Paris, United States of America", "Paris, Texas, United States"),
+    ("Paris, France", "Paris, Île-de-France, France"),
+])
+def test_resolve_matches_qualifiers(gazetteer, place, label):
+    lat, lon, resolved = gazetteer.resolve(place)
+    assert resolved == label
+    row = next(p for p in PLACES if p["label"] == label)
+    assert (lat, lon) == pytest.approx((row["lat"], row["lon"]), abs=1e-4)
+
+
+@pytest.mark.parametrize("place", ["Phoenix, Texas", "Phoenixvil", "Tucson", ", AZ", ""])
+def test_resolve_misses(gazetteer, place):
+    assert gazetteer.resolve(place) is None
+
+
+def test_bundled_table_is_marked_as_placeholder():
+    assert load_gazetteer().placeholder
+
+
+def test_get_coordinates_falls_back_to_nominatim(gazetteer, monkeypatch):
+    monkeypatch.setattr(solar_cooling, "get_gazetteer", lambda: gazetteer)
+    server = start_standin(0, rate=1e6)     # no pacing needed for a handful of lookups
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    try:
+        assert solar_cooling.get_coordinates("Phoenix, AZ", url=url)[2] == "Phoenix, Arizona, United States"
+        assert server.queries == []
+
+        lat, lon, label = solar_cooling.get_coordinates("Tucson, AZ", url=url)
+        assert label == "Tucson, AZ (stand-in)"
+        assert server.queries == ["Tucson, AZ"]
+
+        assert solar_cooling.get_coordinates("Phoenix, AZ", offline=False, url=url)[2] == "Phoenix, AZ (stand-in)"
+        assert solar_cooling.get_coordinates("Nowhere, AZ", url=url) is None
+        assert server.queries == ["Tucson, AZ", "Phoenix, AZ", "Nowhere, AZ"]
+    finally:
+        server.shutdown()
+        server.server_close()
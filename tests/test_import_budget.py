@@ -0,0 +1,17 @@
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Loaded only on the code paths that need them (see dev/benchmarks/import_budget.py)
+DEFERRED = ["pandas", "numpy", "requests", "joblib", "sklearn"]
+
+
+def test_solar_cooling_defers_heavy_imports():
+    # A fresh interpreter, since this test session has imported all of them already
+    code = (f"import json, sys; sys.path.insert(0, {os.path.abspath(SRC)!r}); import solar_cooling; "
+            f"print(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
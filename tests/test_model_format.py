@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from model_format import CompactForest, _random_features, export_compact_model, load_model
+
+FEATURES = ["AmbientTemp_C", "Irradiance_Wm2", "hour", "panel_temp"]
+
+
+def training_frame(n=2000, seed=1):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "AmbientTemp_C": rng.uniform(-10, 50, n),
+        "Irradiance_Wm2": rng.uniform(0, 1200, n),
+        "hour": rng.integers(0, 24, n).astype(float),
+    })
+    X["panel_temp"] = X["AmbientTemp_C"] + (25 / 800) * X["Irradiance_Wm2"] + rng.normal(0, 2, n)
+    y = (X["panel_temp"] > 45) & (X["Irradiance_Wm2"] > 300 + rng.normal(0, 100, n))
+    return X[FEATURES], y.astype(int)
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0),
+    DecisionTreeClassifier(max_depth=10, random_state=0),
+])
+def test_compact_model_matches_sklearn(tmp_path, model):
+    X, y = training_frame()
+    model.fit(X, y)
+    base = str(tmp_path / "model")
+    export_compact_model(model, base)
+
+    compact = load_model(base)
+    assert isinstance(compact, CompactForest)
+    assert list(compact.feature_names_in_) == FEATURES
+
+    features = _random_features(model)
+    expected = model.predict_proba(pd.DataFrame(features, columns=FEATURES))
+    np.testing.assert_allclose(compact.predict_proba(features), expected, atol=1e-6)
+    np.testing.assert_array_equal(compact.predict(features), model.predict(pd.DataFrame(features, columns=FEATURES)))
+    np.testing.assert_array_equal(compact.predict(X), model.predict(X))
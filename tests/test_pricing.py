@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from pricing import HOURS_PER_YEAR, fleet_value, net_cooling_energy, rate_table, time_index
+
+TIMES = np.arange("2023-07-01T00", "2023-07-15T00", dtype="datetime64[h]")
+TARIFFS = {
+    "flat": {"rate": 0.20},
+    "tou": {
+        "rate": 0.25,
+        "export": 0.05,
+        "periods": [{"months": [7], "days": "weekday", "hours": [16, 21], "rate": 0.50},
+                    {"hours": [22, 2], "rate": 0.10}],
+    },
+}
+
+
+def weather(sites=3):
+    rng = np.random.default_rng(5)
+    hour = (TIMES - TIMES.astype("datetime64[D]")).astype(int)
+    G = np.clip(1000 * np.sin(np.pi * (hour - 6) / 12), 0, None) * rng.uniform(0.6, 1.0, (sites, len(TIMES)))
+    T_amb = 30 + 10 * np.sin(np.pi * (hour - 9) / 12) + rng.normal(0, 2, (sites, len(TIMES)))
+    return T_amb, G
+
+
+def reference_rate(tariff, stamp, self_consumption):
+    """$/kWh at one timestamp, read straight off the tariff definition."""
+    stamp = stamp.astype(datetime)
+    weekend = stamp.weekday() >= 5
+
+    def rate(base, periods):
+        for period in periods:
+            start, end = period.get("hours", (0, 24))
+            in_hours = start <= stamp.hour < end if end > start else (stamp.hour >= start or stamp.hour < end)
+            day_ok = {"all": True, "weekday": not weekend, "weekend": weekend}[period.get("days", "all")]
+            if stamp.month in period.get("months", range(1, 13)) and day_ok and in_hours:
+                base = period["rate"]
+        return base
+
+    import_rate = rate(tariff["rate"], tariff.get("periods", []))
+    export_rate = rate(tariff.get("export", tariff["rate"]), tariff.get("export_periods", []))
+    return self_consumption * import_rate + (1 - self_consumption) * export_rate
+
+
+def test_time_index_and_wrapping_periods():
+    # 2023-01-07 was a Saturday
+    assert time_index(np.array(["2023-01-07T14"], dtype="datetime64[h]"))[0] == (0 * 2 + 1) * 24 + 14
+    assert time_index(np.array(["2023-07-03T16"], dtype="datetime64[h]"))[0] == (6 * 2 + 0) * 24 + 16
+    table = rate_table(TARIFFS["tou"])
+    assert table[6, 0, 16] == 0.50 and table[6, 1, 16] == 0.25 and table[5, 0, 16] == 0.25
+    assert table[0, 1, 23] == table[0, 1, 1] == 0.10 and table[0, 1, 2] == 0.25
+
+
+@pytest.mark.parametrize("self_consumption", [1.0, 0.4])
+def test_fleet_value_matches_an_hour_by_hour_sum(self_consumption):
+    T_amb, G = weather()
+    site_index = np.array([2, 0, 0, 1])
+    value, payback = fleet_value(T_amb, G, TIMES, TARIFFS, site_index, kit_cost=120.0,
+                                 self_consumption=self_consumption)
+    assert value.shape == payback.shape == (4, 2)
+    assert (value > 0).all()
+
+    net_Wh = net_cooling_energy(T_amb, G)[site_index]
+    for t, tariff in enumerate(TARIFFS.values()):
+        rates = np.array([reference_rate(tariff, stamp, self_consumption) for stamp in TIMES])
+        expected = (net_Wh * rates).sum(axis=1) / 1000 * HOURS_PER_YEAR / len(TIMES)
+        np.testing.assert_allclose(value[:, t], expected, rtol=1e-12)
+    np.testing.assert_allclose(payback, 120.0 / value)
+    np.testing.assert_array_equal(value[1], value[2])      # two panels on the same site
+
+
+def test_fleet_value_per_panel_parameters_and_costs():
+    T_amb, G = weather(sites=2)
+    NOCT = np.array([40.0, 52.0])
+    costs = np.array([100.0, 300.0])
+    value, payback = fleet_value(T_amb, G, TIMES, TARIFFS, kit_cost=costs, NOCT=NOCT)
+    for p in range(2):
+        single, _ = fleet_value(T_amb[p], G[p], TIMES, TARIFFS, NOCT=NOCT[p])
+        np.testing.assert_allclose(value[p], single[0])
+    np.testing.assert_allclose(payback, costs[:, None] / value)
+
+    # No weather where cooling pays: no value, and the kit never pays back
+    value, payback = fleet_value(np.full((1, len(TIMES)), 10.0), np.zeros((1, len(TIMES))), TIMES, TARIFFS)
+    assert (value == 0).all() and np.isinf(payback).all()
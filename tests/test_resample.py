@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from resample import resample, resample_chunks
+from solar_geometry import day_of_year, extraterrestrial_horizontal_mean, hour_of_day
+
+LATS = np.array([33.45, 47.61])
+
+
+def hourly_weather(days=3):
+    times = np.arange("2022-06-14T00", np.datetime64("2022-06-14T00") + np.timedelta64(24 * days, "h"),
+                      dtype="datetime64[h]")
+    start = hour_of_day(times)
+    reference = extraterrestrial_horizontal_mean(LATS[:, None], day_of_year(times), start, start + 1)
+    rng = np.random.default_rng(0)
+    G = reference * rng.uniform(0.3, 0.8, reference.shape)
+    T_amb = 25 + 10 * np.sin((start - 9) / 24 * 2 * np.pi) + rng.normal(0, 1, reference.shape)
+    return times, T_amb, G
+
+
+@pytest.mark.parametrize("step_seconds", [1, 60, 600, 3600])
+def test_irradiance_keeps_hourly_means(step_seconds):
+    times, T_amb, G = hourly_weather()
+    _, _, G_fine = resample(times, T_amb, G, LATS, step_seconds)
+
+    hourly = G_fine.reshape(len(LATS), len(times), -1).mean(axis=-1)
+    np.testing.assert_allclose(hourly, G, rtol=1e-9, atol=1e-9)
+    assert G_fine.min() >= 0
+
+
+def test_edge_hour_with_no_clear_sky_shape_keeps_its_energy():
+    times, T_amb, G = hourly_weather(days=1)
+    start = hour_of_day(times)
+    reference = extraterrestrial_horizontal_mean(LATS[0], day_of_year(times), start, start + 1)
+    edge = int(np.flatnonzero(reference > 0)[0])      # first hour with any sun
+    G = np.zeros_like(reference)
+    G[edge] = 5.0                                       # the sunnier hours after it read 0
+    _, _, G_fine = resample(times, T_amb[0], G, LATS[0], 60)
+
+    hourly = G_fine.reshape(len(times), -1).mean(axis=-1)
+    np.testing.assert_allclose(hourly, G, atol=1e-9)
+
+
+def test_temperature_passes_through_hours_without_overshoot():
+    times, T_amb, G = hourly_weather()
+    _, T_fine, _ = resample(times, T_amb, G, LATS, 60)
+
+    blocks = T_fine.reshape(len(LATS), len(times), -1)
+    np.testing.assert_allclose(blocks[..., 0], T_amb)
+    # Between two hourly values the curve stays within them
+    low = np.minimum(T_amb[:, :-1], T_amb[:, 1:])[..., None]
+    high = np.maximum(T_amb[:, :-1], T_amb[:, 1:])[..., None]
+    inner = blocks[:, :-1]
+    assert np.all(inner >= low - 1e-9) and np.all(inner <= high + 1e-9)
+
+
+def test_chunks_match_whole_series():
+    times, T_amb, G = hourly_weather()
+    whole = resample(times, T_amb[0], G[0], LATS[0], 300)
+    parts = list(resample_chunks(times, T_amb[0], G[0], LATS[0], 300, chunk_hours=5))
+    for expected, got in zip(whole, zip(*parts)):
+        np.testing.assert_array_equal(np.concatenate(got), expected)
@@ -0,0 +1,45 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from schedule_optimizer import count_starts, optimize_rewards, optimize_schedule
+
+
+def run_lengths(schedule):
+    return [len(list(group)) for on, group in itertools.groupby(schedule) if on]
+
+
+def brute_force(reward, min_steps, max_starts):
+    """Best total over every on/off schedule meeting the constraints."""
+    best = 0.0
+    for schedule in itertools.product([False, True], repeat=len(reward)):
+        runs = run_lengths(schedule)
+        if len(runs) <= max_starts and all(run >= min_steps for run in runs):
+            best = max(best, float(np.dot(reward, schedule)))
+    return best
+
+
+@pytest.mark.parametrize("min_steps, max_starts", [(1, 1), (1, 3), (2, 2), (3, 1), (3, 4), (5, 2)])
+def test_dynamic_programming_matches_brute_force(min_steps, max_starts):
+    rng = np.random.default_rng(min_steps * 10 + max_starts)
+    reward = rng.normal(0, 1, (8, 12))
+    schedule, total = optimize_rewards(reward, min_steps, max_starts)
+
+    for panel in range(len(reward)):
+        assert total[panel] == pytest.approx(brute_force(reward[panel], min_steps, max_starts))
+        # The returned schedule is feasible and achieves the total
+        runs = run_lengths(schedule[panel])
+        assert len(runs) <= max_starts and all(run >= min_steps for run in runs)
+        assert np.dot(reward[panel], schedule[panel]) == pytest.approx(total[panel])
+
+
+def test_schedule_respects_min_runtime_on_weather():
+    hours = np.arange(24)
+    G = np.clip(1000 * np.sin((hours - 6) / 12 * np.pi), 0, None)
+    T_amb = 30 + 8 * np.sin((hours - 9) / 24 * 2 * np.pi)
+    schedule, net, starts = optimize_schedule(T_amb, G, step_minutes=60, min_runtime_minutes=180, max_starts=1)
+
+    assert starts[0] == count_starts(schedule)[0] <= 1
+    assert all(run >= 3 for run in run_lengths(schedule[0]))
+    assert net[0] > 0
@@ -0,0 +1,31 @@
+import numpy as np
+
+from sensitivity import (PARAMETER_RANGES, grid_configs, run_sweep, spearman_correlation, tornado,
+                         tornado_configs)
+
+
+def test_constant_column_has_zero_correlation():
+    y = np.array([3.0, 1.0, 4.0, 1.5, 5.0, 9.0])
+    X = np.column_stack([np.full(len(y), 2.0), y * 10, -y, [1, 1, 2, 2, 3, 3]])
+    rho = spearman_correlation(X, y)
+
+    assert rho[0] == 0.0
+    np.testing.assert_allclose(rho[1:3], [1.0, -1.0])
+    # Tied values share their average rank instead of being ordered arbitrarily
+    assert 0 < rho[3] < 1
+
+
+def test_grid_sweep_ranks_only_varied_parameters():
+    rng = np.random.default_rng(0)
+    hours = np.arange(24 * 3)
+    G = np.clip(1000 * np.sin((hours % 24 - 6) / 12 * np.pi), 0, None)[None, :] * rng.uniform(0.8, 1, (2, 1))
+    T_amb = 32 + 8 * np.sin((hours % 24 - 9) / 24 * 2 * np.pi)[None, :] + np.zeros((2, 1))
+
+    configs = grid_configs({"beta": [0.003, 0.004, 0.005, 0.006]})
+    _, net_Wh = run_sweep(configs, T_amb, G)
+    _, tornado_net = run_sweep(tornado_configs(), T_amb, G)
+    table = tornado(tornado_net.sum(axis=1), tornado_configs(), net_Wh.sum(axis=1), configs)
+
+    rho = dict(zip(table["parameter"], table["spearman_rho"]))
+    assert rho["beta"] == 1.0
+    assert all(rho[name] == 0.0 for name in PARAMETER_RANGES if name != "beta")
@@ -0,0 +1,48 @@
+import numpy as np
+
+from setpoint_optimizer import pareto_front, pv_power, replay, search_space
+from solar_cooling import NOCT, pump_power_Wh
+
+STEP_MINUTES = 5.0
+
+
+def constant_weather(T_amb=35.0, G=1000.0, steps=12 * 6):
+    return np.full((1, steps), T_amb), np.full((1, steps), G)
+
+
+def test_target_below_ambient_gains_nothing_more():
+    T_amb, G = constant_weather()
+    # (threshold, target, min_runtime, band); ambient is 35 °C
+    setpoints = [(45.0, 34.0, 6.0, 0.0), (45.0, 28.0, 6.0, 0.0), (45.0, 20.0, 6.0, 0.0)]
+    net_Wh, starts, pump_hours = replay(T_amb, G, setpoints, STEP_MINUTES)
+
+    np.testing.assert_allclose(net_Wh, np.broadcast_to(net_Wh[:1], net_Wh.shape))
+    np.testing.assert_allclose(pump_hours, np.broadcast_to(pump_hours[:1], pump_hours.shape))
+    # The panel can at best be held at ambient
+    equilibrium = T_amb + ((NOCT - 20) / 800) * G
+    best_gain = ((pv_power(T_amb, G) - pv_power(equilibrium, G)) * STEP_MINUTES / 60).sum()
+    assert np.all(net_Wh + pump_hours * pump_power_Wh <= best_gain)
+
+
+def test_target_below_the_night_wastes_pump_energy():
+    hours = np.arange(0, 48, STEP_MINUTES / 60)
+    G = np.clip(1000 * np.sin((hours % 24 - 6) / 12 * np.pi), 0, None)[None, :]
+    T_amb = (28 + 8 * np.sin((hours % 24 - 9) / 24 * 2 * np.pi))[None, :]      # 20–36 °C
+    setpoints = [(45.0, 30.0, 6.0, 0.0), (45.0, 18.0, 6.0, 0.0)]
+    net_Wh, _, pump_hours = replay(T_amb, G, setpoints, STEP_MINUTES)
+
+    assert net_Wh[0, 0] > net_Wh[1, 0]
+    assert pump_hours[1, 0] > pump_hours[0, 0]
+
+
+def test_optimum_is_not_the_lowest_target():
+    hours = np.arange(0, 72, STEP_MINUTES / 60)
+    G = np.clip(1000 * np.sin((hours % 24 - 6) / 12 * np.pi), 0, None)[None, :]
+    T_amb = (32 + 8 * np.sin((hours % 24 - 9) / 24 * 2 * np.pi))[None, :]
+    setpoints = search_space(thresholds=np.arange(36.0, 56.0, 2.0), runtimes=(6.0, 30.0), bands=(0.0, 4.0))
+    net_Wh, starts, _ = replay(T_amb, G, setpoints, STEP_MINUTES)
+
+    best = setpoints[net_Wh[:, 0].argmax()]
+    assert setpoints[:, 1].min() < best[1] < setpoints[:, 1].max()
+    front = pareto_front(net_Wh[:, 0], starts[:, 0])
+    assert np.all(np.diff(net_Wh[front, 0]) > 0) and np.all(np.diff(starts[front, 0]) >= 0)
@@ -0,0 +1,98 @@
+import glob
+import os
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, coalesced_counts
+
+CODEC = (lambda value: value, lambda data: data)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def run_threads(n, target):
+    results = [None] * n
+
+    def call(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight(directory="")
+    release, calls = threading.Event(), []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"lat": 33.45}
+
+    threads, results = run_threads(8, lambda: flight.do("phoenix", fetch, name="test_threads", share=dict))
+    wait_until(lambda: coalesced_counts().get("test_threads", {}).get("coalesced_thread") == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(r == {"lat": 33.45} for r in results)
+    assert len({id(r) for r in results}) == 8               # waiters get their own copy via share
+    assert coalesced_counts()["test_threads"] == {"executed": 1, "coalesced_thread": 7}
+
+    # Only calls in flight are shared: the next call runs again
+    assert flight.do("phoenix", lambda: {"lat": 0.0}) == {"lat": 0.0}
+
+
+def test_waiting_threads_get_the_exception_and_other_keys_run_separately():
+    flight = SingleFlight(directory="")
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ConnectionError("upstream down")
+
+    threads, results = run_threads(4, lambda: flight.do("tucson", failing, name="test_errors"))
+    wait_until(lambda: coalesced_counts().get("test_errors", {}).get("coalesced_thread") == 3)
+    assert flight.do("flagstaff", lambda: "other key", name="test_errors") == "other key"
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="process coalescing needs fcntl")
+def test_instances_sharing_a_directory_coalesce_like_processes(tmp_path):
+    directory = str(tmp_path / "flights")
+    leader, follower = SingleFlight(directory), SingleFlight(directory)
+    release, calls = threading.Event(), []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return [33.45, -112.07]
+
+    threads, results = run_threads(1, lambda: leader.do("key", fetch, name="test_process", codec=CODEC))
+    wait_until(lambda: calls)
+    waiter, waiter_results = run_threads(1, lambda: follower.do("key", fetch, name="test_process", codec=CODEC))
+    wait_until(lambda: glob.glob(os.path.join(directory, "*.waiting")))
+    release.set()
+    for thread in threads + waiter:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == waiter_results == [[33.45, -112.07]]
+    assert coalesced_counts()["test_process"] == {"executed": 1, "coalesced_process": 1}
+    assert os.stat(directory).st_mode & 0o777 == 0o700
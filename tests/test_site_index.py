@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import site_index
+from power_grid import distance_km
+from site_index import SiteIndex, describe_cell
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(site_index.time, "monotonic", clock)
+    return clock
+
+
+def test_nearby_point_is_reused_only_for_the_same_key():
+    index = SiteIndex()
+    index.add(33.4484, -112.0740, key="2023-07-01")         # Phoenix
+    lat, lon, d, reused = index.resolve(33.4255, -111.9400, key="2023-07-01", max_km=15)    # Tempe
+    assert reused and (lat, lon) == (33.4484, -112.0740) and d == pytest.approx(12.7, abs=0.5)
+    assert index.resolve(33.4255, -111.9400, key="2023-07-01", max_km=10) == (33.4255, -111.9400, 0.0, False)
+    assert index.nearest(33.4255, -111.9400, key="2023-07-02", max_km=50) is None
+
+
+def test_ttl_expires_entries_and_re_adding_renews_them(clock):
+    index = SiteIndex(ttl=60)
+    index.add(33.45, -112.07)
+    index.add(32.22, -110.97)
+    clock.now += 40
+    index.add(33.45, -112.07)                               # renewed
+    clock.now += 30
+    assert len(index) == 1
+    assert index.nearest(33.45, -112.07) is not None
+    assert index.nearest(32.22, -110.97) is None
+    clock.now += 61
+    assert len(index) == 0 and index._cells == {}
+
+
+def test_max_entries_evicts_the_oldest(clock):
+    index = SiteIndex(max_entries=2)
+    points = [(33.45, -112.07), (32.22, -110.97), (35.20, -111.65)]
+    for lat, lon in points:
+        clock.now += 1
+        index.add(lat, lon, key="day")
+    assert len(index) == 2
+    assert index.nearest(*points[0], key="day") is None
+    assert all(index.nearest(*p, key="day") is not None for p in points[1:])
+
+    index.add(*points[1], key="day")                        # renew, so points[2] is now oldest
+    index.add(*points[0], key="day")
+    assert index.nearest(*points[2], key="day") is None
+    assert len(index) == 2
+
+
+@pytest.mark.parametrize("center, max_km", [
+    ((33.45, -112.07), 10.0),
+    ((33.45, -112.07), 120.0),                              # several rings of cells
+    ((78.2, 15.6), 60.0),                                   # cells narrow towards the pole
+    ((-16.5, 179.8), 80.0),                                 # across the antimeridian
+])
+def test_ring_search_matches_brute_force(center, max_km):
+    rng = np.random.default_rng(11)
+    points = np.column_stack([
+        np.clip(center[0] + rng.uniform(-2.5, 2.5, 400), -90, 90),
+        (center[1] + rng.uniform(-6, 6, 400) + 180) % 360 - 180,
+    ])
+    index = SiteIndex()
+    for lat, lon in points:
+        index.add(float(lat), float(lon))
+
+    for lat, lon in points[:60] + rng.normal(0, 0.3, (60, 2)):
+        lat, lon = float(np.clip(lat, -90, 90)), float((lon + 180) % 360 - 180)
+        distances = [distance_km(lat, lon, p_lat, p_lon) for p_lat, p_lon in points]
+        best = int(np.argmin(distances))
+        match = index.nearest(lat, lon, max_km=max_km)
+        if distances[best] > max_km:
+            assert match is None
+        else:
+            assert match[2] == pytest.approx(distances[best])
+
+
+def test_describe_cell():
+    assert describe_cell(33.45, -112.07) == "cell 33.50, -111.875"
@@ -0,0 +1,33 @@
+import numpy as np
+
+from solar_geometry import clear_sky_grid, declination, day_of_year, solar_position
+
+LATS = np.array([33.45, 47.61, -33.87, 0.0])
+LONS = np.array([-112.07, -122.33, 151.21, 10.0])
+TIMES = np.arange("2022-06-21T00", "2022-06-23T00", np.timedelta64(20, "m"), dtype="datetime64[s]")
+
+
+def test_grid_matches_one_site_at_a_time():
+    for utc in (False, True):
+        cos_z, azimuth = solar_position(LATS, LONS, TIMES, utc=utc)
+        for i in range(len(LATS)):
+            site_cos_z, site_azimuth = solar_position(LATS[i], LONS[i], TIMES, utc=utc)
+            np.testing.assert_allclose(cos_z[i], site_cos_z[0], atol=1e-12)
+            np.testing.assert_allclose(azimuth[i], site_azimuth[0], atol=1e-9)
+
+
+def test_local_solar_noon():
+    noon = np.array(["2022-06-21T12:00"], dtype="datetime64[s]")
+    cos_z, azimuth = solar_position(LATS, LONS, noon)
+    delta = declination(day_of_year(noon))
+    np.testing.assert_allclose(cos_z[:, 0], np.cos(np.radians(LATS) - delta), atol=1e-9)
+    # North of the sun it stands due south at noon, south of it due north
+    np.testing.assert_allclose(azimuth[:2, 0], 180.0, atol=1e-6)
+    np.testing.assert_allclose(azimuth[2:, 0] % 360.0, 0.0, atol=1e-6)
+
+
+def test_clear_sky_is_zero_at_night_and_bounded():
+    ghi = clear_sky_grid(LATS, LONS, TIMES)
+    cos_z, _ = solar_position(LATS, LONS, TIMES, azimuth=False)
+    assert np.all(ghi[cos_z <= 0] == 0)
+    assert np.all((ghi >= 0) & (ghi < 1098.0))
@@ -0,0 +1,36 @@
+import numpy as np
+
+from transposition import plane_of_array, site_components
+
+LATS = np.array([33.45, 47.61, -33.87])
+LONS = np.array([-112.07, -122.33, 151.21])
+
+
+def hourly_ghi(times):
+    rng = np.random.default_rng(0)
+    hour = (times - times.astype("datetime64[D]")).astype(int)
+    daylight = np.clip(np.sin((hour - 6) / 12 * np.pi), 0, None)
+    return 900 * daylight * rng.uniform(0.2, 1.0, (len(LATS), len(times)))
+
+
+def test_flat_panels_receive_ghi():
+    times = np.arange("2022-03-20T00", "2022-03-23T00", dtype="datetime64[h]")
+    ghi = hourly_ghi(times)
+    components = site_components(LATS, LONS, times, ghi)
+
+    # Any azimuth: a horizontal panel sees exactly the horizontal irradiance
+    for azimuth in (0, 90, 180, 270):
+        G_poa = plane_of_array(components, tilt=0, azimuth=np.full(len(LATS), azimuth))
+        np.testing.assert_allclose(G_poa, ghi, atol=1e-9)
+
+
+def test_site_index_picks_each_panels_site():
+    times = np.arange("2022-06-21T00", "2022-06-22T00", dtype="datetime64[h]")
+    ghi = hourly_ghi(times)
+    components = site_components(LATS, LONS, times, ghi)
+
+    site_index = np.array([2, 0, 0, 1])
+    G_poa = plane_of_array(components, tilt=[0, 0, 30, 0], azimuth=180, site_index=site_index)
+    np.testing.assert_allclose(G_poa[[0, 1, 3]], ghi[[2, 0, 1]], atol=1e-9)
+    assert G_poa.shape == (4, len(times))
+    assert np.all(G_poa >= 0)
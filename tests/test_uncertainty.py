@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from uncertainty import cooling_uncertainty, summarize
+
+RNG = np.random.default_rng(3)
+T_AMB = RNG.uniform(15, 45, 50)
+G = RNG.uniform(0, 1000, 50)
+
+
+def test_wilson_interval_matches_reference_values():
+    # 30 of 100 samples positive: the 95% Wilson interval is [0.2189, 0.3958]
+    net = np.where(np.arange(100) < 30, 1.0, -1.0)[None, :]
+    result = summarize(net)
+    assert result["p_cool"][0] == pytest.approx(0.3)
+    assert result["p_cool_low"][0] == pytest.approx(0.2189, abs=1e-4)
+    assert result["p_cool_high"][0] == pytest.approx(0.3958, abs=1e-4)
+
+    # No positive samples: the interval still has width, z² / (n + z²) above 0
+    result = summarize(-np.ones((1, 100)))
+    assert result["p_cool_low"][0] == 0
+    assert result["p_cool_high"][0] == pytest.approx(1.96 ** 2 / (100 + 1.96 ** 2))
+
+
+def test_same_seed_is_reproducible_across_chunk_sizes_and_workers():
+    reference = cooling_uncertainty(T_AMB, G, n_samples=200, seed=7, chunk_inputs=512)
+    for chunk_inputs, workers in ((1, 1), (7, 1), (16, 2)):
+        result = cooling_uncertainty(T_AMB, G, n_samples=200, seed=7, chunk_inputs=chunk_inputs, workers=workers)
+        for key in reference:
+            np.testing.assert_array_equal(result[key], reference[key], err_msg=key)
+
+    other = cooling_uncertainty(T_AMB, G, n_samples=200, seed=8)
+    assert not np.array_equal(other["net_gain_mean"], reference["net_gain_mean"])
+
+
+def test_scalar_inputs_broadcast():
+    result = cooling_uncertainty(38.0, G[:5], n_samples=50)
+    assert result["p_cool"].shape == (5,)
+    assert ((result["p_cool_low"] <= result["p_cool"]) & (result["p_cool"] <= result["p_cool_high"])).all()
+
+
+@pytest.mark.parametrize("T_amb, G_in, kwargs", [
+    ([], [], {}),
+    ([30.0, 31.0], [800.0, 900.0, 1000.0], {}),
+    ([[30.0]], [800.0], {}),
+    (30.0, 800.0, {"n_samples": 1}),
+    (30.0, 800.0, {"chunk_inputs": 0}),
+])
+def test_invalid_inputs_raise_value_error(T_amb, G_in, kwargs):
+    with pytest.raises(ValueError):
+        cooling_uncertainty(T_amb, G_in, **kwargs)